@@ -74,6 +74,14 @@ except ImportError:
             return config.get('llm', {}).get('model', 'meta-llama/llama-3.3-70b-instruct')
 
 
+_SLUG_TABLE = str.maketrans({' ': '-', ',': None, ':': None})
+
+
+def _slugify(title: str) -> str:
+    """Convert a problem title to its LeetCode URL slug"""
+    return title.lower().translate(_SLUG_TABLE)
+
+
 class LeetCodeGraphQLClient:
     """GraphQL client for accessing LeetCode API"""
     
@@ -549,6 +557,9 @@ class LeetCodeAgent:
         # Load memory
         self.sent_questions = self._load_memory()
         
+        # Pre-drawn placeholder problem numbers for generated questions
+        self._fake_number_pool = iter(random.sample(range(1, 3001), 1024))
+        
         # DSA topic structure for structured plans
         self.dsa_curriculum = {
             "beginner": [
@@ -1534,10 +1545,9 @@ class LeetCodeAgent:
         if 'title' not in result:
             result['title'] = f"{topic.title()} Problem"
         if 'number' not in result:
-            result['number'] = str(random.randint(1, 3000))
+            result['number'] = self._next_fake_number()
         if 'link' not in result:
-            slug = result['title'].lower().replace(' ', '-').replace(',', '').replace(':', '')
-            result['link'] = f"https://leetcode.com/problems/{slug}/"
+            result['link'] = f"https://leetcode.com/problems/{_slugify(result['title'])}/"
         
         # Mark as LLM generated
         result['data_source'] = 'llm_generated'
@@ -1557,12 +1567,11 @@ class LeetCodeAgent:
         }
         
         title = emergency_questions.get(topic, "Basic Coding Problem")
-        slug = title.lower().replace(' ', '-').replace(',', '').replace(':', '')
         
         return {
             "title": title,
             "number": str(random.randint(1, 100)),
-            "link": f"https://leetcode.com/problems/{slug}/",
+            "link": f"https://leetcode.com/problems/{_slugify(title)}/",
             "difficulty": difficulty,
             "topic": topic,
             "description": f"This is an emergency fallback problem for {topic}. Please check LeetCode for similar problems.",
@@ -1597,12 +1606,10 @@ class LeetCodeAgent:
         topic_questions = fallback_questions.get(topic, fallback_questions["arrays"])
         question_info = topic_questions.get(difficulty, topic_questions["medium"])
         
-        slug = question_info["title"].lower().replace(' ', '-')
-        
         return {
             "title": question_info["title"],
             "number": question_info["number"],
-            "link": f"https://leetcode.com/problems/{slug}/",
+            "link": f"https://leetcode.com/problems/{_slugify(question_info['title'])}/",
             "difficulty": difficulty,
             "topic": topic,
             "description": f"Solve the {question_info['title']} problem on LeetCode.",
@@ -1614,6 +1621,15 @@ class LeetCodeAgent:
             "data_source": "curated_fallback"
         }
     
+    def _next_fake_number(self) -> str:
+        """Get a placeholder problem number from the pre-drawn pool, refilling when exhausted"""
+        
+        try:
+            return str(next(self._fake_number_pool))
+        except StopIteration:
+            self._fake_number_pool = iter(random.sample(range(1, 3001), 1024))
+            return str(next(self._fake_number_pool))
+    
     def _select_difficulty_by_distribution(self, distribution: Dict[str, float]) -> str:
         """Select difficulty based on distribution"""
         
@@ -1643,8 +1659,8 @@ class LeetCodeAgent:
             for priority_q in priority_questions[:count]:
                 question = {
                     "title": priority_q,
-                    "number": str(random.randint(1, 3000)),
-                    "link": f"https://leetcode.com/problems/{priority_q.lower().replace(' ', '-')}/",
+                    "number": self._next_fake_number(),
+                    "link": f"https://leetcode.com/problems/{_slugify(priority_q)}/",
                     "difficulty": "medium",
                     "topic": topic,
                     "priority": True,
@@ -5,27 +5,151 @@ Logger Agent: Handles logging and data storage across multiple backends
 import os
 import json
 import csv
+import io
+import mmap
+import tarfile
+import atexit
+import copy
+import importlib
+import itertools
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from types import ModuleType
+from typing import Dict, Iterable, List, Any, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
 
-# Google Sheets integration (optional)
+# Vectorized statistics (optional)
 try:
-    from google.oauth2.credentials import Credentials
-    from googleapiclient.discovery import build
-    SHEETS_AVAILABLE = True
+    import pandas as pd
+    PANDAS_AVAILABLE = True
 except ImportError:
-    SHEETS_AVAILABLE = False
+    PANDAS_AVAILABLE = False
 
-# AWS S3 integration (optional)
+# Fast JSON serialization (optional)
 try:
-    import boto3
-    from botocore.exceptions import ClientError
-    S3_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    S3_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# Compressed detailed-log archives (optional; gzip is used otherwise)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from backend.utils import ensure_directory_exists
+
+# Columns of the execution summary CSV
+CSV_FIELDS = [
+    "execution_id",
+    "timestamp",
+    "prompt",
+    "task_count",
+    "success",
+    "retry_count",
+    "duration"
+]
+
+# Name prefix of the daily detailed-log archives (archive_YYYY-MM-DD[.N].tar.zst|.tar.gz)
+ARCHIVE_PREFIX = "archive_"
+ARCHIVE_EXTENSIONS = (".tar.zst", ".tar.gz")
+
+
+# Reused stdlib encoders; json.dumps builds a new JSONEncoder per call when given options
+_JSON_ENCODER = json.JSONEncoder(default=str, ensure_ascii=False)
+_JSON_ENCODER_INDENTED = json.JSONEncoder(default=str, ensure_ascii=False, indent=2)
+
+
+def _dump_json_bytes(data: Any, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when available"""
+    
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, default=str, option=option)
+        except TypeError:
+            # orjson rejects some inputs the stdlib accepts (e.g. integers over 64 bits)
+            pass
+    
+    encoder = _JSON_ENCODER_INDENTED if indent else _JSON_ENCODER
+    return encoder.encode(data).encode('utf-8')
+
+
+def _load_json_bytes(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when available"""
+    
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _try_import(module_name: str) -> Optional[ModuleType]:
+    """Import an optional dependency, returning None if it is not installed"""
+    
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+def _csv_escape(value: str) -> str:
+    """Quote a CSV field per RFC 4180, only when it needs it"""
+    
+    if ',' in value or '"' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _format_csv_line(values: Sequence[str]) -> str:
+    """Format one CSV record of string fields the way csv.writer's default dialect would"""
+    
+    return ",".join([_csv_escape(value) for value in values]) + "\r\n"
+
+
+def _execution_day(execution_id: str) -> Optional[str]:
+    """Recover the local date (YYYY-MM-DD) encoded in a generated execution ID"""
+    
+    parts = execution_id.split("_")
+    try:
+        if len(parts) == 3:
+            # exec_<hex microseconds>_<hex sequence>
+            return datetime.fromtimestamp(int(parts[1], 16) / 1_000_000).date().isoformat()
+        if len(parts) == 4:
+            # exec_YYYYMMDD_HHMMSS_NNNN (older IDs)
+            return datetime.strptime(parts[1], "%Y%m%d").date().isoformat()
+    except (ValueError, OverflowError, OSError):
+        pass
+    return None
+
+
+def _parse_timestamp(value: Optional[str]) -> float:
+    """Convert an ISO timestamp to POSIX seconds (NaN if unparseable, so it never matches a date range)"""
+    
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return float('nan')
 
-from backend.utils import ensure_directory_exists, save_json_file
+
+def _close_open_agents() -> None:
+    """Close every logger agent still open at interpreter exit"""
+    for agent in list(_OPEN_AGENTS):
+        agent.close()
+
+
+# Day each detailed-log directory was last rotated, shared by every agent in this process
+_ROTATED_ON: Dict[str, date] = {}
+_ROTATION_LOCK = threading.Lock()
+
+# Agents not closed yet; held weakly so agents dropped without close() can still be collected
+_OPEN_AGENTS: "weakref.WeakSet[LoggerAgent]" = weakref.WeakSet()
+atexit.register(_close_open_agents)
 
 
 class LoggerAgent:
@@ -35,16 +159,47 @@ class LoggerAgent:
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.LoggerAgent")
         
-        # Storage backends
-        self.use_sheets = SHEETS_AVAILABLE and config.get("logging", {}).get("use_sheets", False)
-        self.use_s3 = S3_AVAILABLE and config.get("logging", {}).get("use_s3", False)
+        # Storage backends (Google Sheets / AWS S3 clients are imported only when enabled)
+        self.use_sheets = config.get("logging", {}).get("use_sheets", False)
+        self.use_s3 = config.get("logging", {}).get("use_s3", False)
         self.use_local = config.get("logging", {}).get("use_local", True)
         
+        # Google Sheets rows waiting for the next batched append
+        self.sheets_service = None
+        self._sheets_buffer: List[List[Any]] = []
+        self._sheets_lock = threading.Lock()
+        self._sheets_flush_threshold = 50
+        self._sheets_columns: List[str] = list(CSV_FIELDS)
+        
+        # Per-process sequence that keeps execution IDs unique within one timestamp tick
+        self._execution_seq = itertools.count()
+        
+        # Pending background S3 uploads
+        self._s3_executor: Optional[ThreadPoolExecutor] = None
+        self._s3_pending: List[Future] = []
+        
         # Local storage paths
         self.logs_dir = "data/logs"
         self.execution_log_file = os.path.join(self.logs_dir, "execution_log.csv")
         self.detailed_logs_dir = os.path.join(self.logs_dir, "detailed")
         
+        # Buffered CSV rows; other processes read the CSV, so by default every row is written at once
+        self._csv_buffer: List[str] = []
+        self._csv_flush_threshold = max(1, int(config.get("logging", {}).get("csv_flush_rows", 1)))
+        self._csv_lock = threading.Lock()
+        
+        # Parsed CSV rows (oldest first) and their POSIX timestamps, keyed by file mtime and size
+        self._history_cache: Optional[List[Dict[str, str]]] = None
+        self._history_timestamps: List[float] = []
+        self._history_cache_key = None
+        
+        # Parsed CSV for statistics, keyed by file mtime and size
+        self._history_frame = None
+        self._history_frame_key = None
+        
+        # Set by close(); the agent writes nothing afterwards
+        self._closed = False
+        
         # Initialize storage backends
         self._initialize_local_storage()
         
@@ -53,22 +208,53 @@ class LoggerAgent:
         
         if self.use_s3:
             self._initialize_s3()
+        
+        # Background dispatch: log_execution only enqueues, a worker thread does the I/O (stop it with close())
+        self.background = config.get("logging", {}).get("background", False)
+        self._log_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=10000)
+        self._log_thread: Optional[threading.Thread] = None
+        if self.background:
+            self._log_thread = threading.Thread(target=self._drain_log_queue, name="logger-agent", daemon=True)
+            self._log_thread.start()
+        
+        # Archive earlier days' detailed logs once at startup rather than on the logging path
+        self._rotate_if_new_day()
     
     def _initialize_local_storage(self) -> None:
         """Initialize local file storage"""
         ensure_directory_exists(self.logs_dir)
         ensure_directory_exists(self.detailed_logs_dir)
         
-        # Create CSV header if file doesn't exist
-        if not os.path.exists(self.execution_log_file):
-            self._create_csv_header()
+        # Keep the CSV open for appends; rows are flushed every csv_flush_rows executions
+        self._csv_fh = open(self.execution_log_file, 'ab', buffering=1 << 16)
+        
+        # Create CSV header if file is new
+        if self._csv_fh.tell() == 0:
+            self._csv_fh.write(_format_csv_line(CSV_FIELDS).encode('utf-8'))
+            self._csv_fh.flush()
+        
+        _OPEN_AGENTS.add(self)
     
     def _initialize_sheets(self) -> None:
         """Initialize Google Sheets integration"""
+        self._sheets_discovery = _try_import("googleapiclient.discovery")
+        if self._sheets_discovery is None or _try_import("google.oauth2.credentials") is None:
+            self.logger.warning("Google API client not installed; Sheets logging disabled")
+            self.use_sheets = False
+            return
+        
         try:
+            sheets_config = self.config.get("logging", {}).get("backends", {}).get("google_sheets", {})
+            self.sheets_spreadsheet_id = sheets_config.get("spreadsheet_id", "")
+            self.sheets_worksheet = sheets_config.get("worksheet_name", "AutoTasker_Logs")
+            
             # This would need proper OAuth setup
             # For now, we'll just mark as available
             self.sheets_service = None
+            
+            if self.sheets_service:
+                self._load_sheets_columns()
+            
             self.logger.info("Google Sheets integration initialized")
         except Exception as e:
             self.logger.warning(f"Failed to initialize Google Sheets: {e}")
@@ -76,12 +262,22 @@ class LoggerAgent:
     
     def _initialize_s3(self) -> None:
         """Initialize AWS S3 integration"""
+        self._boto3 = _try_import("boto3")
+        botocore_config = _try_import("botocore.config")
+        if self._boto3 is None or botocore_config is None:
+            self.logger.warning("boto3 not installed; S3 logging disabled")
+            self.use_s3 = False
+            return
+        
         try:
-            self.s3_client = boto3.client(
+            # One shared client: boto3 clients are thread-safe and reuse their connection pool
+            self.s3_client = self._boto3.client(
                 's3',
-                region_name=self.config.get("aws", {}).get("region", "us-east-1")
+                region_name=self.config.get("aws", {}).get("region", "us-east-1"),
+                config=botocore_config.Config(max_pool_connections=32)
             )
             self.s3_bucket = self.config.get("aws", {}).get("s3_bucket", "autotasker-logs")
+            self._s3_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="s3-log")
             self.logger.info("AWS S3 integration initialized")
         except Exception as e:
             self.logger.warning(f"Failed to initialize AWS S3: {e}")
@@ -95,23 +291,98 @@ class LoggerAgent:
             log_entry: Execution data to log
             
         Returns:
-            Logging results
+            Logging results; with background logging, success is None and nothing is
+            written yet (queued is True and pending lists the backends still to write)
         """
         
+        now = datetime.now()
+        
+        # Add unique ID if not present
+        if "execution_id" not in log_entry:
+            log_entry["execution_id"] = self._generate_execution_id(now)
+        
+        if self._log_thread is not None:
+            # The worker writes later, so queue a snapshot the caller can keep mutating
+            queued_entry = copy.deepcopy(log_entry)
+            try:
+                self._log_queue.put_nowait((queued_entry, now))
+            except queue.Full:
+                # Worker is far behind; log on the caller's thread rather than drop the entry
+                self.logger.warning("Log queue full, logging synchronously")
+                return self._dispatch_log(queued_entry, now)
+            
+            return {
+                "success": None,
+                "results": {
+                    "timestamp": now.isoformat(),
+                    "logged_to": [],
+                    "pending": [name for name, enabled in (("local", self.use_local),
+                                                           ("sheets", self.use_sheets),
+                                                           ("s3", self.use_s3)) if enabled],
+                    "errors": [],
+                    "queued": True
+                },
+                "execution_id": log_entry["execution_id"]
+            }
+        
+        return self._dispatch_log(log_entry, now)
+    
+    def _drain_log_queue(self) -> None:
+        """Worker loop: write queued log entries to the configured backends in batches"""
+        
+        stopping = False
+        while not stopping:
+            batch = [self._log_queue.get()]
+            while len(batch) < 64:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for item in batch:
+                try:
+                    if item is None:
+                        # Sentinel from close(); finish this batch, then exit
+                        stopping = True
+                        continue
+                    log_entry, now = item
+                    self._dispatch_log(log_entry, now)
+                except Exception as e:
+                    self.logger.error(f"Background logging failed: {e}")
+                finally:
+                    self._log_queue.task_done()
+            
+            # Archiving is off the caller's path here, so a long-running worker rotates on day change
+            self._rotate_if_new_day()
+    
+    def _wait_for_queued_logs(self, timeout: Optional[float] = None) -> bool:
+        """Block until the worker has written every queued entry; False if the timeout expired"""
+        
+        if self._log_thread is None or threading.current_thread() is self._log_thread:
+            return True
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._log_queue.all_tasks_done:
+            while self._log_queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._log_queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def _dispatch_log(self, log_entry: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Write one log entry to every configured backend"""
+        
         results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "logged_to": [],
             "errors": []
         }
         
-        # Add unique ID if not present
-        if "execution_id" not in log_entry:
-            log_entry["execution_id"] = self._generate_execution_id()
-        
         # Log to local storage
         if self.use_local:
             try:
-                self._log_to_local(log_entry)
+                self._log_to_local(log_entry, now)
                 results["logged_to"].append("local")
             except Exception as e:
                 self.logger.error(f"Local logging failed: {e}")
@@ -129,7 +400,7 @@ class LoggerAgent:
         # Log to S3
         if self.use_s3:
             try:
-                self._log_to_s3(log_entry)
+                self._log_to_s3(log_entry, now)
                 results["logged_to"].append("s3")
             except Exception as e:
                 self.logger.error(f"S3 logging failed: {e}")
@@ -148,32 +419,70 @@ class LoggerAgent:
             "execution_id": log_entry["execution_id"]
         }
     
-    def _log_to_local(self, log_entry: Dict[str, Any]) -> None:
+    def _log_to_local(self, log_entry: Dict[str, Any], now: datetime) -> None:
         """Log to local CSV and JSON files"""
         
         # Log summary to CSV
-        csv_row = {
-            "execution_id": log_entry["execution_id"],
-            "timestamp": log_entry["timestamp"],
-            "prompt": log_entry["prompt"][:100],  # Truncate for CSV
-            "task_count": len(log_entry.get("task_plan", {}).get("tasks", [])),
-            "success": len(log_entry.get("errors", [])) == 0,
-            "retry_count": log_entry.get("retry_count", 0),
-            "duration": log_entry.get("duration", "unknown")
-        }
+        summary = self._build_summary_row(log_entry)
         
-        # Append to CSV
-        file_exists = os.path.exists(self.execution_log_file)
-        with open(self.execution_log_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=csv_row.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(csv_row)
+        # Buffer the CSV row; written out once the batch fills up
+        with self._csv_lock:
+            self._csv_buffer.append(_format_csv_line(summary))
+            if self._history_cache is not None:
+                # Keep cached history in step, in the shape csv.DictReader returns
+                self._history_cache.append(dict(zip(CSV_FIELDS, summary)))
+                self._history_timestamps.append(_parse_timestamp(summary[1]))
+            if len(self._csv_buffer) >= self._csv_flush_threshold:
+                self._flush_csv()
         
         # Save detailed JSON
+        self._write_detailed_log(log_entry)
+    
+    def _rotate_if_new_day(self) -> None:
+        """Archive earlier days' detailed logs unless that already ran today"""
+        
+        if not self.use_local:
+            return
+        
+        # Claim today's rotation first so other agents in this process skip the directory scan
+        today = datetime.now().date()
+        rotation_key = os.path.abspath(self.detailed_logs_dir)
+        with _ROTATION_LOCK:
+            if _ROTATED_ON.get(rotation_key) == today:
+                return
+            _ROTATED_ON[rotation_key] = today
+        
+        try:
+            self.rotate_daily(today)
+        except Exception as e:
+            self.logger.warning(f"Detailed log rotation failed: {e}")
+    
+    def _build_summary_row(self, log_entry: Dict[str, Any]) -> Tuple[str, ...]:
+        """Build the one-line execution summary (CSV_FIELDS order) shared by the CSV and Sheets logs"""
+        
+        task_plan = log_entry.get("task_plan") or {}
+        
+        return (
+            str(log_entry["execution_id"]),
+            str(log_entry["timestamp"]),
+            log_entry["prompt"][:100],  # Truncate for CSV
+            str(len(task_plan.get("tasks") or ())),
+            str(not log_entry.get("errors")),
+            str(log_entry.get("retry_count", 0)),
+            str(log_entry.get("duration", "unknown"))
+        )
+    
+    def _write_detailed_log(self, log_entry: Dict[str, Any]) -> None:
+        """Write the detailed JSON log for one execution"""
+        
         json_filename = f"execution_{log_entry['execution_id']}.json"
         json_filepath = os.path.join(self.detailed_logs_dir, json_filename)
-        save_json_file(log_entry, json_filepath)
+        
+        # Serialize up front so the file is written with a single write() call;
+        # the directory is created once in _initialize_local_storage
+        payload = _dump_json_bytes(log_entry, indent=True)
+        with open(json_filepath, 'wb') as f:
+            f.write(payload)
     
     def _log_to_sheets(self, log_entry: Dict[str, Any]) -> None:
         """Log to Google Sheets"""
@@ -181,50 +490,164 @@ class LoggerAgent:
         if not self.sheets_service:
             raise Exception("Google Sheets service not initialized")
         
-        # This would implement the actual Sheets API calls
-        # For now, we'll simulate success
-        self.logger.info("Would log to Google Sheets (implementation needed)")
+        # Queue the row; Sheets allows ~60 writes/minute, so rows are appended in batches
+        summary = self._build_summary_row(log_entry)
+        if self._sheets_columns != CSV_FIELDS:
+            # Worksheet has its own header order
+            summary_by_column = dict(zip(CSV_FIELDS, summary))
+            summary = [summary_by_column.get(column, "") for column in self._sheets_columns]
+        
+        with self._sheets_lock:
+            self._sheets_buffer.append(list(summary))
+            
+            if len(self._sheets_buffer) >= self._sheets_flush_threshold:
+                self._flush_sheets()
     
-    def _log_to_s3(self, log_entry: Dict[str, Any]) -> None:
-        """Log to AWS S3"""
+    def _load_sheets_columns(self) -> None:
+        """Read the worksheet header once per session, writing it if the sheet is empty"""
+        
+        values = self.sheets_service.spreadsheets().values()
+        header = values.get(
+            spreadsheetId=self.sheets_spreadsheet_id,
+            range=f"{self.sheets_worksheet}!1:1"
+        ).execute().get("values", [])
         
-        # Generate S3 key
-        date_prefix = datetime.now().strftime("%Y/%m/%d")
+        if header and header[0]:
+            self._sheets_columns = header[0]
+        else:
+            values.update(
+                spreadsheetId=self.sheets_spreadsheet_id,
+                range=f"{self.sheets_worksheet}!A1",
+                valueInputOption="RAW",
+                body={"values": [self._sheets_columns]}
+            ).execute()
+    
+    def _flush_sheets(self) -> None:
+        """Append all queued rows to the worksheet in a single API call (caller must hold _sheets_lock)"""
+        
+        if not self._sheets_buffer or not self.sheets_service:
+            return
+        
+        self.sheets_service.spreadsheets().values().append(
+            spreadsheetId=self.sheets_spreadsheet_id,
+            range=f"{self.sheets_worksheet}!A:{chr(ord('A') + len(self._sheets_columns) - 1)}",
+            valueInputOption="RAW",
+            body={"values": self._sheets_buffer}
+        ).execute()
+        
+        self._sheets_buffer = []
+    
+    def _log_to_s3(self, log_entry: Dict[str, Any], now: datetime) -> None:
+        """Log to AWS S3 (upload runs in the background, see flush())"""
+        
+        # Generate S3 key from the time log_execution was called
+        date_prefix = f"{now.year:04d}/{now.month:02d}/{now.day:02d}"
         s3_key = f"autotasker-logs/{date_prefix}/execution_{log_entry['execution_id']}.json"
         
-        # Upload to S3
-        self.s3_client.put_object(
+        # Upload to S3 off the caller's thread
+        future = self._s3_executor.submit(
+            self.s3_client.put_object,
             Bucket=self.s3_bucket,
             Key=s3_key,
-            Body=json.dumps(log_entry, default=str),
+            Body=_dump_json_bytes(log_entry),
             ContentType='application/json'
         )
+        future.add_done_callback(self._on_s3_upload_done)
+        
+        # Drop references to uploads that already finished
+        self._s3_pending = [f for f in self._s3_pending if not f.done()]
+        self._s3_pending.append(future)
+    
+    def _on_s3_upload_done(self, future: Future) -> None:
+        """Report failures of background S3 uploads"""
+        
+        error = future.exception()
+        if error is not None:
+            self.logger.error(f"S3 logging failed: {error}")
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Write queued and buffered log entries and wait for pending background uploads
+        
+        Args:
+            timeout: Maximum seconds to wait for the log queue and for uploads (None waits indefinitely)
+        """
+        
+        if not self._wait_for_queued_logs(timeout):
+            self.logger.warning("Timed out waiting for queued log entries")
+        
+        with self._csv_lock:
+            self._flush_csv()
+        
+        try:
+            with self._sheets_lock:
+                self._flush_sheets()
+        except Exception as e:
+            self.logger.error(f"Sheets logging failed: {e}")
+        
+        # The worker prunes finished uploads itself; only wait on a snapshot here
+        pending = list(self._s3_pending)
+        if pending:
+            wait(pending, timeout=timeout)
     
-    def _create_csv_header(self) -> None:
-        """Create CSV header row"""
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Write everything still queued or buffered, stop the worker thread and close the CSV
         
-        headers = [
-            "execution_id",
-            "timestamp", 
-            "prompt",
-            "task_count",
-            "success",
-            "retry_count",
-            "duration"
-        ]
+        Args:
+            timeout: Maximum seconds to wait for the worker and for uploads (None waits indefinitely)
+        """
+        
+        if self._closed:
+            return
+        self._closed = True
+        _OPEN_AGENTS.discard(self)
+        
+        if self._log_thread is not None:
+            self._log_queue.put(None)
+            self._log_thread.join(timeout)
+            self._log_thread = None
+        
+        self.flush(timeout)
         
-        with open(self.execution_log_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
+        if self._s3_executor is not None:
+            self._s3_executor.shutdown(wait=False)
+        
+        with self._csv_lock:
+            self._csv_fh.close()
     
-    def _generate_execution_id(self) -> str:
-        """Generate unique execution ID"""
+    def _flush_csv(self) -> None:
+        """Write buffered CSV rows to disk (caller must hold _csv_lock)"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        import random
-        random_suffix = random.randint(1000, 9999)
+        if self._csv_buffer:
+            # Cached history already holds these rows; keep it valid across our own write
+            cache_in_sync = self._history_cache_is_current()
+            
+            self._csv_fh.write("".join(self._csv_buffer).encode('utf-8'))
+            self._csv_fh.flush()
+            self._csv_buffer.clear()
+            
+            if cache_in_sync:
+                self._history_cache_key = self._csv_stat_key()
+    
+    def _history_cache_is_current(self) -> bool:
+        """Check whether the history cache matches the CSV on disk"""
+        
+        return self._history_cache is not None and self._history_cache_key == self._csv_stat_key()
+    
+    def _csv_stat_key(self) -> Optional[tuple]:
+        """Get (mtime, size) of the execution CSV, or None if it is missing"""
+        
+        try:
+            stat = os.stat(self.execution_log_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _generate_execution_id(self, now: datetime) -> str:
+        """Generate unique execution ID from the microsecond timestamp and a sequence number"""
         
-        return f"exec_{timestamp}_{random_suffix}"
+        return f"exec_{int(now.timestamp() * 1_000_000):x}_{next(self._execution_seq):x}"
     
     def get_execution_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -237,25 +660,80 @@ class LoggerAgent:
             List of execution records
         """
         
+        self._wait_for_queued_logs()
+        
         history = []
         
         try:
-            if os.path.exists(self.execution_log_file):
-                with open(self.execution_log_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    history = list(reader)
+            with self._csv_lock:
+                self._flush_csv()
+                
+                if limit <= 0:
+                    return history
+                
+                # Without a warm cache, parse just the end of the file when that covers the request
+                if not self._history_cache_is_current():
+                    tail = self._read_history_tail(limit)
+                    if tail is not None:
+                        return list(reversed(tail))
                 
-                # Sort by timestamp (most recent first)
-                history.sort(key=lambda x: x['timestamp'], reverse=True)
+                self._refresh_history_cache()
                 
-                # Limit results
-                history = history[:limit]
+                # Rows are appended chronologically, so the newest are at the end
+                history = [dict(row) for row in reversed(self._history_cache[-limit:])]
             
         except Exception as e:
             self.logger.error(f"Failed to get execution history: {e}")
         
         return history
     
+    def _read_history_tail(self, limit: int) -> Optional[List[Dict[str, str]]]:
+        """
+        Parse the last `limit` rows from the end of the CSV without reading the whole file
+        
+        Returns:
+            Rows oldest first, or None when the whole file should be parsed instead
+        """
+        
+        with open(self.execution_log_file, 'rb') as f:
+            header = f.readline()
+            size = os.fstat(f.fileno()).st_size
+            if size <= len(header) or not header.endswith(b'\r\n'):
+                return None
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Walk back over `limit` record terminators (\r\n); rfind scans the mapping in C
+                position = size - 2 if mm[size - 2:size] == b'\r\n' else size
+                for _ in range(limit):
+                    position = mm.rfind(b'\r\n', len(header) - 2, position)
+                    if position <= len(header) - 2:
+                        # The request covers the whole file; let the caller load and cache it
+                        return None
+                chunk = mm[position + 2:size]
+        
+        fieldnames = next(csv.reader([header.decode('utf-8')]))
+        rows = list(csv.reader(io.StringIO(chunk.decode('utf-8'), newline='')))
+        
+        # A \r\n inside a quoted multi-line prompt throws the count off; detect that and fall back
+        if len(rows) < limit or any(len(row) != len(fieldnames) for row in rows):
+            return None
+        
+        return [dict(zip(fieldnames, row)) for row in rows[-limit:]]
+    
+    def _refresh_history_cache(self) -> None:
+        """Re-read the CSV into the history cache if it changed outside this agent (caller must hold _csv_lock)"""
+        
+        cache_key = self._csv_stat_key()
+        if cache_key is None:
+            self._history_cache = []
+            self._history_timestamps = []
+        elif self._history_cache is None or self._history_cache_key != cache_key:
+            with open(self.execution_log_file, 'r', newline='', encoding='utf-8') as f:
+                self._history_cache = list(csv.DictReader(f))
+            # Parse each timestamp once so date filters are plain float comparisons
+            self._history_timestamps = [_parse_timestamp(row.get('timestamp')) for row in self._history_cache]
+        self._history_cache_key = cache_key
+    
     def get_detailed_log(self, execution_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed log for specific execution
@@ -267,19 +745,166 @@ class LoggerAgent:
             Detailed execution data or None
         """
         
+        self._wait_for_queued_logs()
+        
         json_filename = f"execution_{execution_id}.json"
         json_filepath = os.path.join(self.detailed_logs_dir, json_filename)
         
         try:
-            with open(json_filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
+            try:
+                with open(json_filepath, 'rb') as f:
+                    return _load_json_bytes(f.read())
+            except FileNotFoundError:
+                # Logs from earlier days live in the daily archives
+                archived = self._read_from_archives(json_filename, _execution_day(execution_id))
+                if archived is not None:
+                    return _load_json_bytes(archived)
+            
             self.logger.warning(f"Detailed log not found for execution {execution_id}")
             return None
         except Exception as e:
             self.logger.error(f"Failed to read detailed log: {e}")
             return None
     
+    def rotate_daily(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Pack detailed logs from days before `today` into one compressed archive per day
+        
+        Args:
+            today: Logs written on this date (default: now) stay in place
+            
+        Returns:
+            Rotation results
+        """
+        
+        self._wait_for_queued_logs()
+        
+        today = today or datetime.now().date()
+        
+        # Group finished days' logs by the local date they were written
+        by_day: Dict[str, List[os.DirEntry]] = {}
+        with os.scandir(self.detailed_logs_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("execution_") and entry.name.endswith(".json")):
+                    continue
+                day = datetime.fromtimestamp(entry.stat().st_mtime).date()
+                if day < today:
+                    by_day.setdefault(day.isoformat(), []).append(entry)
+        
+        archived_files = 0
+        errors = []
+        
+        for day, day_entries in sorted(by_day.items()):
+            try:
+                self._write_archive(day, day_entries)
+            except Exception as e:
+                errors.append(f"Failed to archive logs for {day}: {e}")
+                continue
+            
+            # Originals are removed only once their archive is complete
+            for entry in day_entries:
+                try:
+                    os.unlink(entry.path)
+                    archived_files += 1
+                except OSError as e:
+                    errors.append(f"Failed to remove {entry.name}: {e}")
+        
+        with _ROTATION_LOCK:
+            _ROTATED_ON[os.path.abspath(self.detailed_logs_dir)] = today
+        
+        if archived_files:
+            self.logger.info(f"Archived {archived_files} detailed logs into {len(by_day)} daily archives")
+        
+        return {
+            "archived_files": archived_files,
+            "archives": len(by_day),
+            "errors": errors
+        }
+    
+    def _write_archive(self, day: str, entries: List[os.DirEntry]) -> str:
+        """Write the given detailed logs to a new archive for `day` and return its path"""
+        
+        extension = ARCHIVE_EXTENSIONS[0] if ZSTD_AVAILABLE else ARCHIVE_EXTENSIONS[1]
+        base_path = os.path.join(self.detailed_logs_dir, f"{ARCHIVE_PREFIX}{day}")
+        
+        # Archives are write-once, so late logs for an archived day get a numbered sibling.
+        # The name is claimed with an exclusive create, so concurrent rotations never clobber each other
+        archive_path = base_path + extension
+        suffix = 1
+        while True:
+            try:
+                open(archive_path, 'xb').close()
+                break
+            except FileExistsError:
+                archive_path = f"{base_path}.{suffix}{extension}"
+                suffix += 1
+        
+        # Write under a temporary name so a crash never leaves a truncated archive (readers skip the empty claim)
+        tmp_path = archive_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as raw:
+                if ZSTD_AVAILABLE:
+                    with zstandard.ZstdCompressor(level=3).stream_writer(raw) as compressed, \
+                            tarfile.open(fileobj=compressed, mode='w|') as tar:
+                        for entry in entries:
+                            tar.add(entry.path, arcname=entry.name)
+                else:
+                    with tarfile.open(fileobj=raw, mode='w:gz') as tar:
+                        for entry in entries:
+                            tar.add(entry.path, arcname=entry.name)
+            os.replace(tmp_path, archive_path)
+        except Exception:
+            for path in (tmp_path, archive_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            raise
+        
+        return archive_path
+    
+    def _read_from_archives(self, member_name: str, day: Optional[str] = None) -> Optional[bytes]:
+        """Find a detailed log inside the daily archives, checking archives for `day` first"""
+        
+        with os.scandir(self.detailed_logs_dir) as entries:
+            archive_names = sorted(
+                (entry.name for entry in entries
+                 if entry.name.startswith(ARCHIVE_PREFIX) and entry.name.endswith(ARCHIVE_EXTENSIONS)
+                 and entry.stat().st_size > 0),
+                reverse=True
+            )
+        
+        if day:
+            archive_names.sort(key=lambda name: not name.startswith(f"{ARCHIVE_PREFIX}{day}"))
+        
+        for archive_name in archive_names:
+            data = self._extract_archive_member(os.path.join(self.detailed_logs_dir, archive_name), member_name)
+            if data is not None:
+                return data
+        
+        return None
+    
+    def _extract_archive_member(self, archive_path: str, member_name: str) -> Optional[bytes]:
+        """Read one file out of a detailed-log archive, or None if it is not there"""
+        
+        if archive_path.endswith(".tar.zst"):
+            if not ZSTD_AVAILABLE:
+                self.logger.warning(f"zstandard not installed; cannot read {archive_path}")
+                return None
+            with open(archive_path, 'rb') as raw, \
+                    zstandard.ZstdDecompressor().stream_reader(raw) as decompressed, \
+                    tarfile.open(fileobj=decompressed, mode='r|') as tar:
+                for member in tar:
+                    if member.name == member_name:
+                        return tar.extractfile(member).read()
+            return None
+        
+        with tarfile.open(archive_path, 'r:gz') as tar:
+            try:
+                return tar.extractfile(member_name).read()
+            except KeyError:
+                return None
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get execution statistics
@@ -288,6 +913,10 @@ class LoggerAgent:
             Statistics summary
         """
         
+        history_frame = self._get_history_frame() if PANDAS_AVAILABLE else None
+        if history_frame is not None:
+            return self._statistics_from_frame(history_frame.tail(1000))
+        
         history = self.get_execution_history(1000)  # Get more records for stats
         
         if not history:
@@ -318,6 +947,60 @@ class LoggerAgent:
             }
         }
     
+    def _get_history_frame(self) -> Optional["pd.DataFrame"]:
+        """Load the execution CSV as a DataFrame (oldest first), reusing it while the file is unchanged"""
+        
+        try:
+            self._wait_for_queued_logs()
+            with self._csv_lock:
+                self._flush_csv()
+            
+            cache_key = self._csv_stat_key()
+            
+            if self._history_frame is None or self._history_frame_key != cache_key:
+                # Rows are appended chronologically, so no sort is needed
+                self._history_frame = pd.read_csv(self.execution_log_file, dtype=str, keep_default_na=False)
+                self._history_frame_key = cache_key
+            
+            return self._history_frame
+        
+        except Exception as e:
+            self.logger.error(f"Failed to load execution history frame: {e}")
+            return None
+    
+    def _statistics_from_frame(self, history_frame: "pd.DataFrame") -> Dict[str, Any]:
+        """Compute execution statistics from a DataFrame of recent executions"""
+        
+        if history_frame.empty:
+            return {
+                "total_executions": 0,
+                "success_rate": 0,
+                "average_tasks": 0,
+                "most_recent": None
+            }
+        
+        total = len(history_frame)
+        successful = int((history_frame['success'] == 'True').sum())
+        
+        # Non-numeric task counts become NaN and are skipped by mean()
+        avg_tasks = pd.to_numeric(history_frame['task_count'], errors='coerce').mean()
+        avg_tasks = 0 if pd.isna(avg_tasks) else float(avg_tasks)
+        
+        most_recent = history_frame.iloc[-1].to_dict()
+        
+        return {
+            "total_executions": total,
+            "success_rate": successful / total * 100,
+            "successful_executions": successful,
+            "failed_executions": total - successful,
+            "average_tasks": round(avg_tasks, 1),
+            "most_recent": most_recent,
+            "date_range": {
+                "oldest": history_frame.iloc[0]['timestamp'],
+                "newest": most_recent.get('timestamp')
+            }
+        }
+    
     def cleanup_old_logs(self, days_to_keep: int = 30) -> Dict[str, Any]:
         """
         Clean up old log files
@@ -329,24 +1012,54 @@ class LoggerAgent:
             Cleanup results
         """
         
+        self._wait_for_queued_logs()
+        
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+        cutoff_ts = cutoff_date.timestamp()
         
         cleaned_files = []
         errors = []
         
         try:
-            # Clean detailed JSON logs
+            # Collect expired detailed JSON logs and daily archives; scandir caches each entry's stat
+            cutoff_day = cutoff_date.date().isoformat()
+            expired = []
             if os.path.exists(self.detailed_logs_dir):
-                for filename in os.listdir(self.detailed_logs_dir):
-                    filepath = os.path.join(self.detailed_logs_dir, filename)
-                    
-                    try:
-                        file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                        if file_time < cutoff_date:
-                            os.remove(filepath)
-                            cleaned_files.append(filename)
-                    except Exception as e:
-                        errors.append(f"Failed to remove {filename}: {e}")
+                with os.scandir(self.detailed_logs_dir) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(ARCHIVE_PREFIX):
+                            # Archives are dated by the day their logs were written
+                            archive_day = entry.name[len(ARCHIVE_PREFIX):len(ARCHIVE_PREFIX) + 10]
+                            if archive_day < cutoff_day:
+                                expired.append(entry)
+                            continue
+                        if not entry.name.startswith("execution_"):
+                            continue
+                        try:
+                            if entry.stat().st_mtime < cutoff_ts:
+                                expired.append(entry)
+                        except OSError as e:
+                            errors.append(f"Failed to remove {entry.name}: {e}")
+            
+            def remove(entry: os.DirEntry) -> Optional[str]:
+                try:
+                    os.unlink(entry.path)
+                    return None
+                except OSError as e:
+                    return f"Failed to remove {entry.name}: {e}"
+            
+            # Unlinking is I/O bound, so spread large cleanups over a few threads
+            if len(expired) > 256:
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    outcomes = list(executor.map(remove, expired))
+            else:
+                outcomes = [remove(entry) for entry in expired]
+            
+            for entry, error in zip(expired, outcomes):
+                if error:
+                    errors.append(error)
+                else:
+                    cleaned_files.append(entry.name)
         
         except Exception as e:
             errors.append(f"Failed to access logs directory: {e}")
@@ -373,40 +1086,67 @@ class LoggerAgent:
             Export file path
         """
         
-        history = self.get_execution_history(10000)  # Get large number for export
+        self._wait_for_queued_logs()
         
-        # Filter by date if specified
-        if start_date or end_date:
-            filtered_history = []
-            for record in history:
-                record_date = datetime.fromisoformat(record['timestamp'])
-                
-                if start_date and record_date < datetime.fromisoformat(start_date):
-                    continue
-                if end_date and record_date > datetime.fromisoformat(end_date):
-                    continue
-                
-                filtered_history.append(record)
-            
-            history = filtered_history
+        if format_type not in ("json", "csv"):
+            raise ValueError(f"Unsupported export format: {format_type}")
+        
+        # Parse date bounds once; records are compared as POSIX timestamps
+        start_ts = datetime.fromisoformat(start_date).timestamp() if start_date else float('-inf')
+        end_ts = datetime.fromisoformat(end_date).timestamp() if end_date else float('inf')
         
         # Generate export filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         export_filename = f"autotasker_export_{timestamp}.{format_type}"
         export_path = os.path.join(self.logs_dir, export_filename)
         
-        # Export data
-        if format_type == "json":
-            save_json_file(history, export_path)
-        elif format_type == "csv":
-            if history:
-                with open(export_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=history[0].keys())
-                    writer.writeheader()
-                    writer.writerows(history)
+        cached_records = None
+        
+        with self._csv_lock:
+            self._flush_csv()
+            
+            # A warm cache holds every row, so a date-range export can filter it in memory;
+            # snapshot row references so writing happens outside the lock
+            if (start_date or end_date) and self._history_cache_is_current():
+                cached_records = [row for row, row_ts in zip(self._history_cache, self._history_timestamps)
+                                  if start_ts <= row_ts <= end_ts]
+        
+        if cached_records is not None:
+            exported = self._write_export(export_path, format_type, cached_records, CSV_FIELDS)
         else:
-            raise ValueError(f"Unsupported export format: {format_type}")
+            # Full exports and cold caches stream the CSV rather than load it whole (oldest first)
+            with open(self.execution_log_file, 'r', newline='', encoding='utf-8') as src:
+                reader = csv.DictReader(src)
+                records = reader
+                if start_date or end_date:
+                    records = (record for record in reader
+                               if start_ts <= _parse_timestamp(record.get('timestamp')) <= end_ts)
+                exported = self._write_export(export_path, format_type, records, reader.fieldnames or CSV_FIELDS)
         
-        self.logger.info(f"Exported {len(history)} records to {export_path}")
+        self.logger.info(f"Exported {exported} records to {export_path}")
         
         return export_path
+    
+    def _write_export(self, export_path: str, format_type: str,
+                      records: Iterable[Dict[str, str]], fieldnames: Sequence[str]) -> int:
+        """Write records (oldest first) to the export file and return how many were written"""
+        
+        exported = 0
+        
+        if format_type == "json":
+            with open(export_path, 'wb') as dst:
+                dst.write(b"[")
+                for record in records:
+                    dst.write(b",\n  " if exported else b"\n  ")
+                    dst.write(_dump_json_bytes(record))
+                    exported += 1
+                dst.write(b"\n]\n" if exported else b"]\n")
+        else:
+            with open(export_path, 'w', newline='', encoding='utf-8') as dst:
+                writer = csv.DictWriter(dst, fieldnames=list(fieldnames))
+                writer.writeheader()
+                for record in records:
+                    writer.writerow(record)
+                    exported += 1
+        
+        return exported
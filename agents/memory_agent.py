@@ -3,13 +3,147 @@ Memory Agent: Manages task history and prevents duplicate executions
 """
 
 import os
+import re
+import copy
 import json
 import hashlib
+import time
+import heapq
+import atexit
+import sqlite3
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import functools
+import threading
+from array import array
+from collections import Counter, deque
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from datetime import datetime
 
-from backend.utils import save_json_file, load_json_file
+from backend.utils import load_json_file
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    VECTOR_STORE_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    VECTOR_STORE_AVAILABLE = False
+
+try:
+    from datasketch import MinHash, MinHashLSH
+    DATASKETCH_AVAILABLE = True
+except ImportError:
+    DATASKETCH_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Substrings of execution result keys that reveal which agent ran, in priority order
+AGENT_TOKENS = ("gmail", "github", "dsa", "email")
+
+try:
+    import ahocorasick
+    _AGENT_AUTOMATON = ahocorasick.Automaton()
+    for _priority, _token in enumerate(AGENT_TOKENS):
+        _AGENT_AUTOMATON.add_word(_token, (_priority, _token))
+    _AGENT_AUTOMATON.make_automaton()
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Signatures carry the hash name and normalization version so records written
+# by another hash or an older normalization can be migrated on load
+NORMALIZATION_VERSION = 2
+SIGNATURE_PREFIX = f"{'xxh3' if XXHASH_AVAILABLE else 'blake2b'}-n{NORMALIZATION_VERSION}:"
+
+# Phrases folded during prompt normalization: "every/each day" -> "daily";
+# the word "at" and clock times ("9:00", "9am", "9:30 pm") are dropped
+_NORMALIZE_PATTERN = (
+    r'\b(?:every|each) day\b'
+    r'|\bat\b'
+    r'|\b\d{1,2}(?::\d{2})?\s{0,3}(?:am|pm)\b'
+    r'|\b\d{1,2}:\d{2}\b'
+)
+_NORMALIZE_RE = re.compile(_NORMALIZE_PATTERN)
+# Same pattern over bytes for the ASCII fast path
+_NORMALIZE_RE_ASCII = re.compile(_NORMALIZE_PATTERN.encode("ascii"))
+
+# Number of nearest neighbours pulled from the ANN index per lookup
+ANN_SEARCH_K = 5
+
+# Below this many records the plain Python scan beats the vectorized word matrix
+WORD_MATRIX_MIN_ROWS = 64
+
+# Entries kept in the check_recent_execution result cache
+CHECK_CACHE_SIZE = 1024
+
+# MinHash permutations and the Jaccard level LSH candidates are tuned for
+# (the minimum similarity considered a match)
+LSH_NUM_PERM = 128
+LSH_THRESHOLD = 0.5
+
+
+def _digest(data: bytes) -> str:
+    """128-bit hex digest used for prompt signatures and task plan hashes"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _normalize_replacement(match: "re.Match") -> str:
+    """Replacement text for a _NORMALIZE_RE match"""
+    return "daily" if match.group().endswith("day") else ""
+
+
+def _normalize_replacement_ascii(match: "re.Match") -> bytes:
+    """Replacement bytes for a _NORMALIZE_RE_ASCII match"""
+    return b"daily" if match.group().endswith(b"day") else b""
+
+
+def _normalize_prompt(prompt: str) -> bytes:
+    """Normalize a prompt for signature hashing, returning UTF-8 bytes"""
+    
+    # Task prompts are nearly always ASCII; bytes lowercasing and matching skip
+    # the Unicode machinery and the result can be hashed without re-encoding
+    if prompt.isascii():
+        normalized = _NORMALIZE_RE_ASCII.sub(_normalize_replacement_ascii, prompt.encode("ascii").lower())
+        return b" ".join(normalized.split())
+    
+    return _normalize_prompt_unicode(prompt)
+
+
+def _normalize_prompt_unicode(prompt: str) -> bytes:
+    """General normalization path for prompts containing non-ASCII text"""
+    
+    normalized = _NORMALIZE_RE.sub(_normalize_replacement, prompt.lower())
+    return " ".join(normalized.split()).encode()
+
+
+def _record_epoch(record: Dict[str, Any]) -> float:
+    """Epoch seconds of a record, backfilled from its ISO timestamp for records saved before ts_epoch (0.0 if unknown)"""
+    
+    ts_epoch = record.get("ts_epoch")
+    if ts_epoch is None:
+        try:
+            ts_epoch = datetime.fromisoformat(record["timestamp"]).timestamp()
+        except (ValueError, KeyError, TypeError):
+            return 0.0
+        record["ts_epoch"] = ts_epoch
+    return ts_epoch
 
 
 class MemoryAgent:
@@ -22,52 +156,388 @@ class MemoryAgent:
         # Memory configuration
         self.retention_days = config.get("memory", {}).get("retention_days", 30)
         self.similarity_threshold = config.get("memory", {}).get("similarity_threshold", 0.8)
+        # Cosine scores of related prompts run far higher than word Jaccard, so embeddings get their own threshold
+        self.embedding_similarity_threshold = config.get("memory", {}).get("embedding_similarity_threshold", 0.9)
         self.use_vector_store = config.get("memory", {}).get("use_vector_store", False)
+        self.use_lsh = config.get("memory", {}).get("use_lsh", False)
+        self.check_cache_ttl = config.get("memory", {}).get("check_cache_ttl_seconds", 300)
+        self.embedding_model = config.get("memory", {}).get("embedding_model", "all-MiniLM-L6-v2")
+        self.max_records = config.get("memory", {}).get("max_records", 10000)
+        self.max_signatures = config.get("memory", {}).get("max_signatures", 5000)
+        self.background_save = config.get("memory", {}).get("background_save", False)
+        self.save_delay = config.get("memory", {}).get("save_delay_seconds", 1.0)
         
         # Store full config for per-agent settings
         self.config = config
         
-        # Storage paths
+        # Storage paths (the JSON files are only read to import pre-SQLite memory)
         self.memory_dir = "memory"
+        self.memory_db_file = os.path.join(self.memory_dir, "memory.db")
         self.execution_history_file = os.path.join(self.memory_dir, "execution_history.json")
         self.prompt_signatures_file = os.path.join(self.memory_dir, "prompt_signatures.json")
+        self.ann_index_file = os.path.join(self.memory_dir, "ann.index")
+        self.task_plans_file = os.path.join(self.memory_dir, "task_plans.ndjson")
+        
+        # Full task plans are only kept (append-only) in debug mode
+        self.keep_task_plans = config.get("app", {}).get("debug", False)
         
-        # In-memory cache
-        self.recent_executions = []
+        # In-memory cache (newest first; the oldest record is evicted once full)
+        self.recent_executions = deque(maxlen=self.max_records)
         self.prompt_signatures = {}
+        self._sig_to_exec: Dict[str, Dict[str, Any]] = {}
+        self._prompt_words: Dict[str, frozenset] = {}
+        self._reset_word_matrix()
+        
+        # Recent check_recent_execution results: (prompt, agent_name) -> (expires_at, result)
+        self._check_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Dict[str, Any]]] = {}
+        
+        # MinHash LSH shortlist for word similarity (keyed by id() of the record)
+        self._lsh = None
+        self._lsh_records: Dict[int, Dict[str, Any]] = {}
+        
+        # Embedding index for similarity search (rows keyed by record "ann_id")
+        self._embedder = None
+        self._ann_index = None
+        self._ann_records: Dict[int, Dict[str, Any]] = {}
+        self._next_ann_id = 0
+        self._embed_prompt = functools.lru_cache(maxsize=1024)(self._encode_prompt)
+        
+        # Write-back persistence: mutations happen under _memory_lock and mark the
+        # state dirty; a background thread batches them into one save
+        self._memory_lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._closing = threading.Event()
+        self._save_thread: Optional[threading.Thread] = None
+        
+        # Changes not yet written to the database
+        self._db = None
+        self._pending_records: List[Dict[str, Any]] = []
+        self._dirty_signatures = set()
+        self._removed_signatures = set()
+        self._rewrite_store = False
         
         # Initialize storage
         self._initialize_memory_storage()
         self._load_memory_data()
+        self._initialize_ann_index()
+        
+        if self.background_save:
+            self._save_thread = threading.Thread(target=self._save_worker, name="memory-save", daemon=True)
+            self._save_thread.start()
+        atexit.register(self.close)
     
     def _initialize_memory_storage(self) -> None:
-        """Initialize memory storage directories and files"""
+        """Initialize the memory directory and SQLite database"""
         
         os.makedirs(self.memory_dir, exist_ok=True)
         
-        # Create empty files if they don't exist
+        # Writes come from the save worker as well as the caller's thread; _save_lock serializes them
+        self._db = sqlite3.connect(self.memory_db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS executions (
+                    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execution_id TEXT,
+                    ts_epoch REAL NOT NULL,
+                    prompt TEXT,
+                    signature TEXT,
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_executions_signature ON executions(signature);
+                CREATE INDEX IF NOT EXISTS idx_executions_ts ON executions(ts_epoch);
+                CREATE TABLE IF NOT EXISTS signatures (
+                    signature TEXT PRIMARY KEY,
+                    stats TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+        
+        if self._db.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is None:
+            self._import_legacy_json()
+    
+    def _import_legacy_json(self) -> None:
+        """Copy execution history and signatures from the old JSON files into SQLite"""
+        
+        signatures = load_json_file(self.prompt_signatures_file) or {}
+        
+        with self._db:
+            # Records are streamed straight into the insert; expired ones are never kept
+            self._insert_records(self._iter_legacy_history())
+            self._db.executemany(
+                "INSERT OR REPLACE INTO signatures (signature, stats) VALUES (?, ?)",
+                [(signature, json.dumps(stats, default=str)) for signature, stats in signatures.items()]
+            )
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                             (datetime.now().isoformat(),))
+        
+        imported = self._db.execute("SELECT COUNT(*) FROM executions").fetchone()[0]
+        if imported or signatures:
+            self.logger.info(f"Imported {imported} execution records and {len(signatures)} signatures from JSON memory")
+    
+    def _iter_legacy_history(self) -> Iterator[Dict[str, Any]]:
+        """Stream retained records from the old execution_history.json"""
+        
         if not os.path.exists(self.execution_history_file):
-            save_json_file([], self.execution_history_file)
+            return
         
-        if not os.path.exists(self.prompt_signatures_file):
-            save_json_file({}, self.prompt_signatures_file)
+        cutoff_epoch = self._cutoff_epoch()
+        try:
+            if IJSON_AVAILABLE:
+                with open(self.execution_history_file, "rb") as f:
+                    for execution in self._iter_valid_records(ijson.items(f, "item", use_float=True)):
+                        if execution["ts_epoch"] >= cutoff_epoch:
+                            yield execution
+            else:
+                for execution in self._iter_valid_records(load_json_file(self.execution_history_file) or []):
+                    if execution["ts_epoch"] >= cutoff_epoch:
+                        yield execution
+        except Exception as e:
+            self.logger.error(f"Failed to read legacy execution history: {e}")
+    
+    def _insert_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Insert execution records (caller manages the transaction)"""
+        
+        self._db.executemany(
+            "INSERT INTO executions (execution_id, ts_epoch, prompt, signature, payload) VALUES (?, ?, ?, ?, ?)",
+            (
+                (record.get("execution_id"), _record_epoch(record), record.get("prompt"),
+                 record.get("prompt_signature"), json.dumps(record, default=str, ensure_ascii=False))
+                for record in records
+            )
+        )
     
     def _load_memory_data(self) -> None:
         """Load memory data from storage"""
         
         try:
-            self.recent_executions = load_json_file(self.execution_history_file) or []
-            self.prompt_signatures = load_json_file(self.prompt_signatures_file) or {}
+            rows = self._db.execute(
+                "SELECT payload FROM executions WHERE ts_epoch >= ? ORDER BY ts_epoch DESC LIMIT ?",
+                (self._cutoff_epoch(), self.max_records)
+            )
+            self.recent_executions = deque((json.loads(payload) for (payload,) in rows), maxlen=self.max_records)
+            self.prompt_signatures = {
+                signature: json.loads(stats)
+                for signature, stats in self._db.execute("SELECT signature, stats FROM signatures")
+            }
             
-            # Clean old data
+            # Re-key signatures written by older versions, then clean old data
+            if self._migrate_prompt_signatures():
+                self._rewrite_store = True
             self._cleanup_old_memory_data()
+            self._rebuild_lookup_indexes()
             
             self.logger.info(f"Loaded {len(self.recent_executions)} execution records from memory")
             
         except Exception as e:
             self.logger.error(f"Failed to load memory data: {e}")
-            self.recent_executions = []
+            self.recent_executions = deque(maxlen=self.max_records)
             self.prompt_signatures = {}
+            self._sig_to_exec = {}
+            self._prompt_words = {}
+            self._reset_word_matrix()
+    
+    def _iter_valid_records(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield loaded records, backfilling epoch timestamps and skipping invalid entries"""
+        
+        for execution in records:
+            if "ts_epoch" not in execution:
+                try:
+                    execution["ts_epoch"] = datetime.fromisoformat(execution["timestamp"]).timestamp()
+                except (ValueError, KeyError, TypeError):
+                    continue
+            yield execution
+    
+    def _migrate_prompt_signatures(self) -> bool:
+        """Regenerate signatures produced by a different hash; returns True if any changed"""
+        
+        renamed = {}
+        for execution in self.recent_executions:
+            signature = execution.get("prompt_signature", "")
+            if signature.startswith(SIGNATURE_PREFIX):
+                continue
+            
+            new_signature = self._generate_prompt_signature(execution.get("prompt", ""))
+            execution["prompt_signature"] = new_signature
+            renamed[signature] = new_signature
+        
+        for signature in [sig for sig in self.prompt_signatures if not sig.startswith(SIGNATURE_PREFIX)]:
+            stats = self.prompt_signatures.pop(signature)
+            new_signature = renamed.get(signature)
+            if new_signature is None:
+                continue
+            
+            # Several legacy signatures may collapse into one; merge their stats
+            merged = self.prompt_signatures.get(new_signature)
+            if merged is None:
+                self.prompt_signatures[new_signature] = stats
+            else:
+                merged["first_seen"] = min(merged.get("first_seen", ""), stats.get("first_seen", ""))
+                merged["last_seen"] = max(merged.get("last_seen", ""), stats.get("last_seen", ""))
+                merged["count"] = merged.get("count", 0) + stats.get("count", 0)
+                merged["success_count"] = merged.get("success_count", 0) + stats.get("success_count", 0)
+        
+        if renamed:
+            self.logger.info(f"Migrated {len(renamed)} prompt signatures to {SIGNATURE_PREFIX.rstrip(':')}")
+        return bool(renamed)
+    
+    def _rebuild_lookup_indexes(self) -> None:
+        """Rebuild the signature and word-set lookups from retained executions"""
+        
+        self._sig_to_exec = {}
+        self._prompt_words = {}
+        
+        # recent_executions is newest-first, so keep the first record per signature
+        for execution in self.recent_executions:
+            signature = execution.get("prompt_signature")
+            if signature:
+                self._sig_to_exec.setdefault(signature, execution)
+        
+        self._rebuild_word_matrix()
+        self._rebuild_lsh()
+    
+    def _rebuild_lsh(self) -> None:
+        """Rebuild the MinHash LSH shortlist index from retained executions"""
+        
+        self._lsh = None
+        self._lsh_records = {}
+        
+        if not self.use_lsh:
+            return
+        
+        if not DATASKETCH_AVAILABLE:
+            self.logger.warning("LSH shortlist requested but datasketch not installed, scanning all history")
+            self.use_lsh = False
+            return
+        
+        self._lsh = MinHashLSH(threshold=LSH_THRESHOLD, num_perm=LSH_NUM_PERM)
+        for execution in self.recent_executions:
+            self._add_to_lsh(execution)
+    
+    def _minhash(self, words: frozenset) -> "MinHash":
+        """MinHash sketch of a word set"""
+        
+        minhash = MinHash(num_perm=LSH_NUM_PERM)
+        minhash.update_batch([word.encode() for word in words])
+        return minhash
+    
+    def _add_to_lsh(self, execution: Dict[str, Any]) -> None:
+        """Insert an execution record's word sketch into the LSH index"""
+        
+        key = id(execution)
+        self._lsh.insert(key, self._minhash(self._words_for(execution.get("prompt", ""))))
+        self._lsh_records[key] = execution
+    
+    def _rebuild_word_matrix(self) -> None:
+        """Rebuild the word matrix and word-set cache from retained executions"""
+        
+        # Word matrix rows are kept oldest-first so new records append at the end
+        self._prompt_words = {}
+        self._reset_word_matrix()
+        for execution in reversed(self.recent_executions):
+            self._add_to_word_matrix(execution)
+    
+    def _reset_word_matrix(self) -> None:
+        """Clear the sparse word-presence matrix used for vectorized Jaccard"""
+        
+        # CSR-style layout: one (row, word id) pair per distinct word of each record
+        self._vocab: Dict[str, int] = {}
+        self._matrix_records: List[Dict[str, Any]] = []
+        self._matrix_row_ids = array("i")
+        self._matrix_word_ids = array("i")
+        self._matrix_sizes = array("i")
+        self._matrix_epochs = array("d")
+        # Rows before this offset belong to records evicted from recent_executions
+        self._matrix_evicted = 0
+    
+    def _add_to_word_matrix(self, execution: Dict[str, Any]) -> None:
+        """Append an execution record as a new row of the word matrix"""
+        
+        words = self._words_for(execution.get("prompt", ""))
+        row = len(self._matrix_records)
+        
+        self._matrix_records.append(execution)
+        self._matrix_word_ids.extend(self._vocab.setdefault(word, len(self._vocab)) for word in words)
+        self._matrix_row_ids.extend([row] * len(words))
+        self._matrix_sizes.append(len(words))
+        self._matrix_epochs.append(execution.get("ts_epoch", 0.0))
+    
+    def _words_for(self, prompt: str) -> frozenset:
+        """Lowercased word set of a prompt, cached per distinct prompt"""
+        
+        words = self._prompt_words.get(prompt)
+        if words is None:
+            words = frozenset(prompt.lower().split())
+            self._prompt_words[prompt] = words
+        return words
+    
+    def _initialize_ann_index(self) -> None:
+        """Load or build the embedding index used for similarity search"""
+        
+        if not self.use_vector_store:
+            return
+        
+        if not VECTOR_STORE_AVAILABLE:
+            self.logger.warning("Vector store requested but faiss/sentence-transformers not installed, using word similarity")
+            return
+        
+        try:
+            self._embedder = SentenceTransformer(self.embedding_model)
+            dimension = self._embedder.get_sentence_embedding_dimension()
+            
+            if os.path.exists(self.ann_index_file):
+                self._ann_index = faiss.read_index(self.ann_index_file)
+            else:
+                self._ann_index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            
+            # Reconcile index rows with the retained execution records
+            self._ann_records = {
+                execution["ann_id"]: execution
+                for execution in self.recent_executions
+                if "ann_id" in execution
+            }
+            indexed_ids = faiss.vector_to_array(self._ann_index.id_map)
+            stale_ids = [int(ann_id) for ann_id in indexed_ids if int(ann_id) not in self._ann_records]
+            if stale_ids:
+                self._ann_index.remove_ids(np.asarray(stale_ids, dtype="int64"))
+            
+            indexed = set(int(ann_id) for ann_id in indexed_ids)
+            self._next_ann_id = max(list(self._ann_records) + list(indexed), default=-1) + 1
+            
+            for execution in self.recent_executions:
+                if execution.get("ann_id") not in indexed:
+                    execution.pop("ann_id", None)
+                    self._add_to_ann_index(execution)
+            
+            self.logger.info(f"Loaded embedding index with {self._ann_index.ntotal} vectors")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to initialize embedding index: {e}")
+            self._embedder = None
+            self._ann_index = None
+            self._ann_records = {}
+    
+    def _encode_prompt(self, prompt: str) -> "np.ndarray":
+        """Embed a prompt as a normalized float32 row vector"""
+        
+        vector = self._embedder.encode([prompt], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+    
+    def _add_to_ann_index(self, execution: Dict[str, Any]) -> None:
+        """Add an execution record's prompt embedding to the index"""
+        
+        ann_id = self._next_ann_id
+        self._next_ann_id += 1
+        
+        vector = self._embed_prompt(execution.get("prompt", ""))
+        self._ann_index.add_with_ids(vector, np.asarray([ann_id], dtype="int64"))
+        
+        execution["ann_id"] = ann_id
+        self._ann_records[ann_id] = execution
     
     def check_recent_execution(self, prompt: str, agent_name: str = None) -> Dict[str, Any]:
         """
@@ -81,6 +551,26 @@ class MemoryAgent:
             Memory check results
         """
         
+        key = (prompt, agent_name)
+        now = time.monotonic()
+        cached = self._check_cache.get(key)
+        if cached is not None and cached[0] > now:
+            # Callers keep and edit the result (the runner stores it in its state), so never hand out the cached dict
+            return copy.deepcopy(cached[1])
+        
+        result = self._check_recent_execution(prompt, agent_name)
+        
+        if self.check_cache_ttl > 0 and not result.get("error"):
+            if len(self._check_cache) >= CHECK_CACHE_SIZE:
+                # Drop the oldest entry (dicts keep insertion order)
+                del self._check_cache[next(iter(self._check_cache))]
+            self._check_cache[key] = (now + self.check_cache_ttl, copy.deepcopy(result))
+        
+        return result
+    
+    def _check_recent_execution(self, prompt: str, agent_name: str = None) -> Dict[str, Any]:
+        """Run the exact and similar match checks for check_recent_execution"""
+        
         try:
             # Check if similarity detection is enabled for this agent
             if not self.should_check_similarity(agent_name):
@@ -97,8 +587,11 @@ class MemoryAgent:
             # Generate prompt signature
             prompt_signature = self._generate_prompt_signature(prompt)
             
+            # One retention cutoff shared by both lookups
+            cutoff_epoch = self._cutoff_epoch()
+            
             # Check for exact matches first
-            exact_match = self._find_exact_match(prompt_signature)
+            exact_match = self._find_exact_match(prompt_signature, cutoff_epoch)
             if exact_match:
                 return {
                     "should_skip": True,
@@ -109,10 +602,13 @@ class MemoryAgent:
                 }
             
             # Check for similar prompts
-            similar_match = self._find_similar_execution(prompt)
+            similar_match = self._find_similar_execution(prompt, threshold, cutoff_epoch)
             if similar_match:
                 similarity = similar_match["similarity"]
                 
+                # Embedding matches are judged against the embedding threshold
+                threshold = similar_match.get("threshold", threshold)
+                
                 if similarity >= threshold:
                     return {
                         "should_skip": True,
@@ -159,108 +655,256 @@ class MemoryAgent:
             prompt = execution_data.get("prompt", "")
             prompt_signature = self._generate_prompt_signature(prompt)
             
-            # Create memory record
+            # Create memory record; the plan is reduced to a digest and its task types
+            now = datetime.now()
+            task_plan = execution_data.get("task_plan", {})
+            task_plan_json = json.dumps(task_plan, sort_keys=True, default=str)
             memory_record = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
+                "ts_epoch": now.timestamp(),
                 "prompt": prompt,
                 "prompt_signature": prompt_signature,
-                "task_plan": execution_data.get("task_plan", {}),
+                "task_plan_hash": _digest(task_plan_json.encode()),
+                "task_types": [task.get("type") for task in task_plan.get("tasks", [])],
                 "success": len(execution_data.get("errors", [])) == 0,
                 "execution_id": execution_data.get("execution_id", "unknown"),
                 "duration": execution_data.get("duration", "unknown"),
                 "agent_types": self._extract_agent_types(execution_data)
             }
             
-            # Add to recent executions
-            self.recent_executions.insert(0, memory_record)
+            with self._memory_lock:
+                # Add to recent executions, forgetting the oldest record when full
+                if len(self.recent_executions) == self.recent_executions.maxlen:
+                    self._forget_execution(self.recent_executions.pop())
+                self.recent_executions.appendleft(memory_record)
+                self._sig_to_exec[prompt_signature] = memory_record
+                self._add_to_word_matrix(memory_record)
+                
+                if self._lsh is not None:
+                    self._add_to_lsh(memory_record)
+                
+                if self._ann_index is not None:
+                    self._add_to_ann_index(memory_record)
+                
+                # Update prompt signatures, keeping the last two access times for LRU-2 eviction
+                previous = self.prompt_signatures.get(prompt_signature, {})
+                self.prompt_signatures[prompt_signature] = {
+                    "first_seen": previous.get("first_seen", memory_record["timestamp"]),
+                    "last_seen": memory_record["timestamp"],
+                    "count": previous.get("count", 0) + 1,
+                    "success_count": previous.get("success_count", 0) + (1 if memory_record["success"] else 0),
+                    "access_times": previous.get("access_times", [])[-1:] + [memory_record["ts_epoch"]]
+                }
+                
+                self._pending_records.append(memory_record)
+                self._dirty_signatures.add(prompt_signature)
+                
+                if len(self.prompt_signatures) > self.max_signatures:
+                    self._evict_cold_signatures()
+                
             
-            # Update prompt signatures
-            self.prompt_signatures[prompt_signature] = {
-                "first_seen": memory_record["timestamp"],
-                "last_seen": memory_record["timestamp"],
-                "count": self.prompt_signatures.get(prompt_signature, {}).get("count", 0) + 1,
-                "success_count": self.prompt_signatures.get(prompt_signature, {}).get("success_count", 0) + (1 if memory_record["success"] else 0)
-            }
+            if self.keep_task_plans:
+                self._append_task_plan(memory_record, task_plan)
             
-            # Save to storage
-            self._save_memory_data()
+            # Any cached check could now be answered differently
+            self._check_cache.clear()
+            
+            # Save to storage (batched by the background writer)
+            self._mark_dirty()
             
             self.logger.info(f"Recorded execution in memory: {execution_data.get('execution_id', 'unknown')}")
             
         except Exception as e:
             self.logger.error(f"Failed to record execution: {e}")
     
+    def _append_task_plan(self, memory_record: Dict[str, Any], task_plan: Dict[str, Any]) -> None:
+        """Append the full task plan to the debug task plan log"""
+        
+        try:
+            entry = json.dumps({
+                "timestamp": memory_record["timestamp"],
+                "execution_id": memory_record["execution_id"],
+                "task_plan_hash": memory_record["task_plan_hash"],
+                "task_plan": task_plan
+            }, default=str, ensure_ascii=False)
+            with open(self.task_plans_file, "a", encoding="utf-8") as f:
+                f.write(entry + "\n")
+        except Exception as e:
+            self.logger.error(f"Failed to append task plan: {e}")
+    
+    def _forget_execution(self, execution: Dict[str, Any]) -> None:
+        """Drop lookup entries for the oldest execution once it has been evicted"""
+        
+        signature = execution.get("prompt_signature")
+        if self._sig_to_exec.get(signature) is execution:
+            del self._sig_to_exec[signature]
+        
+        ann_id = execution.get("ann_id")
+        if self._ann_index is not None and ann_id in self._ann_records:
+            del self._ann_records[ann_id]
+            self._ann_index.remove_ids(np.asarray([ann_id], dtype="int64"))
+        
+        if self._lsh_records.pop(id(execution), None) is not None:
+            self._lsh.remove(id(execution))
+        
+        # The oldest execution is always the first live word matrix row;
+        # compact once dead rows make up half the matrix
+        self._matrix_evicted += 1
+        if self._matrix_evicted * 2 > len(self._matrix_records):
+            self._rebuild_word_matrix()
+    
     def _generate_prompt_signature(self, prompt: str) -> str:
         """Generate a signature for prompt matching"""
         
-        # Normalize prompt
-        normalized = prompt.lower().strip()
-        
-        # Remove common variations
-        normalized = normalized.replace("every day", "daily")
-        normalized = normalized.replace("each day", "daily")
-        normalized = normalized.replace(" at ", " ")
-        normalized = normalized.replace("am", "")
-        normalized = normalized.replace("pm", "")
-        
-        # Remove time patterns
-        import re
-        normalized = re.sub(r'\d{1,2}:\d{2}', '', normalized)
-        normalized = re.sub(r'\d{1,2}\s*(am|pm)', '', normalized)
+        # Normalize prompt: fold common variations and drop times in one pass
+        data = _normalize_prompt(prompt)
         
         # Generate hash
-        return hashlib.md5(normalized.encode()).hexdigest()
+        return SIGNATURE_PREFIX + _digest(data)
     
-    def _find_exact_match(self, prompt_signature: str) -> Optional[Dict[str, Any]]:
+    def _find_exact_match(self, prompt_signature: str, cutoff_epoch: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """Find exact prompt signature match in recent history"""
         
-        cutoff_time = datetime.now() - timedelta(days=self.retention_days)
+        execution = self._sig_to_exec.get(prompt_signature)
+        if execution is None:
+            return None
         
-        for execution in self.recent_executions:
-            execution_time = datetime.fromisoformat(execution["timestamp"])
-            
-            if execution_time < cutoff_time:
-                continue
-            
-            if execution.get("prompt_signature") == prompt_signature:
-                return execution
+        if cutoff_epoch is None:
+            cutoff_epoch = self._cutoff_epoch()
+        
+        if execution.get("ts_epoch", 0.0) < cutoff_epoch:
+            return None
+        
+        return execution
+    
+    def _find_similar_execution(self, prompt: str, threshold: Optional[float] = None,
+                                cutoff_epoch: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Find similar executions using text similarity; stops at the first match reaching threshold"""
+        
+        if cutoff_epoch is None:
+            cutoff_epoch = self._cutoff_epoch()
+        
+        if self._ann_index is not None and self._ann_index.ntotal > 0:
+            return self._find_similar_by_embedding(prompt, cutoff_epoch)
+        
+        query_words = frozenset(prompt.lower().split())
+        threshold = self.similarity_threshold if threshold is None else threshold
+        
+        if self._lsh is not None:
+            # Exact Jaccard only over the LSH shortlist, newest first for tie-breaking
+            candidates = sorted((self._lsh_records[key] for key in self._lsh.query(self._minhash(query_words))),
+                                key=lambda execution: execution["ts_epoch"], reverse=True)
+            best_match, best_similarity = self._best_match_by_scan(query_words, cutoff_epoch, threshold, candidates)
+        elif NUMPY_AVAILABLE and len(self._matrix_records) - self._matrix_evicted >= WORD_MATRIX_MIN_ROWS:
+            best_match, best_similarity = self._best_match_by_word_matrix(query_words, cutoff_epoch)
+        else:
+            best_match, best_similarity = self._best_match_by_scan(query_words, cutoff_epoch, threshold)
+        
+        if best_match and best_similarity > 0.5:  # Minimum similarity for consideration
+            return {
+                "execution": best_match,
+                "similarity": best_similarity
+            }
         
         return None
     
-    def _find_similar_execution(self, prompt: str) -> Optional[Dict[str, Any]]:
-        """Find similar executions using text similarity"""
+    def _best_match_by_scan(self, query_words: frozenset, cutoff_epoch: float,
+                            threshold: float = float("inf"),
+                            executions: Optional[Iterable[Dict[str, Any]]] = None) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Best Jaccard match found by comparing against each record (or the given ones) in turn"""
         
-        cutoff_time = datetime.now() - timedelta(days=self.retention_days)
         best_match = None
         best_similarity = 0.0
+        query_size = len(query_words)
         
-        for execution in self.recent_executions:
-            execution_time = datetime.fromisoformat(execution["timestamp"])
+        for execution in self.recent_executions if executions is None else executions:
+            if execution.get("ts_epoch", 0.0) < cutoff_epoch:
+                continue
+            
+            words = self._words_for(execution.get("prompt", ""))
             
-            if execution_time < cutoff_time:
+            # Jaccard is at most min/max of the set sizes; skip records that cannot beat the best
+            if query_size and words and min(query_size, len(words)) / max(query_size, len(words)) <= best_similarity:
                 continue
             
-            # Calculate similarity
-            similarity = self._calculate_text_similarity(prompt, execution.get("prompt", ""))
+            # Calculate similarity against the cached word set
+            similarity = self._jaccard_similarity(query_words, words)
             
             if similarity > best_similarity:
                 best_similarity = similarity
                 best_match = execution
+                
+                # Any match at the threshold is enough for the caller to skip
+                if similarity >= threshold:
+                    break
         
-        if best_match and best_similarity > 0.5:  # Minimum similarity for consideration
-            return {
-                "execution": best_match,
-                "similarity": best_similarity
-            }
+        return best_match, best_similarity
+    
+    def _best_match_by_word_matrix(self, query_words: frozenset, cutoff_epoch: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Best Jaccard match computed for all records at once with NumPy"""
+        
+        row_count = len(self._matrix_records)
+        query_ids = [self._vocab[word] for word in query_words if word in self._vocab]
+        
+        word_ids = np.frombuffer(self._matrix_word_ids, dtype=np.int32)
+        row_ids = np.frombuffer(self._matrix_row_ids, dtype=np.int32)
+        sizes = np.frombuffer(self._matrix_sizes, dtype=np.int32)
+        epochs = np.frombuffer(self._matrix_epochs, dtype=np.float64)
+        
+        # Intersection size per row, then |A ∪ B| = |A| + |B| - |A ∩ B|
+        intersections = np.bincount(row_ids[np.isin(word_ids, query_ids)], minlength=row_count)
+        unions = sizes + len(query_words) - intersections
+        scores = np.where(unions > 0, intersections / np.maximum(unions, 1), 1.0)
+        scores[epochs < cutoff_epoch] = -1.0
+        scores[:self._matrix_evicted] = -1.0
+        
+        # Rows are oldest-first; search from the newest so ties favour recent records
+        newest_offset = int(np.argmax(scores[::-1]))
+        best_row = row_count - 1 - newest_offset
+        best_similarity = float(scores[best_row])
+        
+        if best_similarity <= 0.0:
+            return None, 0.0
+        return self._matrix_records[best_row], best_similarity
+    
+    def _find_similar_by_embedding(self, prompt: str, cutoff_epoch: float) -> Optional[Dict[str, Any]]:
+        """Find the nearest recent execution by cosine similarity of embeddings"""
+        
+        k = min(ANN_SEARCH_K, self._ann_index.ntotal)
+        scores, ann_ids = self._ann_index.search(self._embed_prompt(prompt), k)
+        
+        # Results are ordered by descending similarity, so the first live hit is the best
+        for score, ann_id in zip(scores[0], ann_ids[0]):
+            execution = self._ann_records.get(int(ann_id))
+            if execution is None:
+                continue
+            
+            if execution.get("ts_epoch", 0.0) < cutoff_epoch:
+                continue
+            
+            if score > 0.5:  # Minimum similarity for consideration
+                return {
+                    "execution": execution,
+                    "similarity": float(score),
+                    "threshold": self.embedding_similarity_threshold
+                }
+            break
         
         return None
     
+    def _cutoff_epoch(self) -> float:
+        """Epoch seconds before which executions fall outside the retention window"""
+        
+        return time.time() - self.retention_days * 86400
+    
     def _calculate_text_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two text strings"""
         
         # Simple word-based similarity
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        return self._jaccard_similarity(set(text1.lower().split()), set(text2.lower().split()))
+    
+    def _jaccard_similarity(self, words1: frozenset, words2: frozenset) -> float:
+        """Jaccard similarity of two word sets"""
         
         if not words1 and not words2:
             return 1.0
@@ -268,9 +912,9 @@ class MemoryAgent:
         if not words1 or not words2:
             return 0.0
         
-        # Jaccard similarity
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
+        # Jaccard similarity; the union size follows from the intersection
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
         
         return intersection / union if union > 0 else 0.0
     
@@ -290,39 +934,31 @@ class MemoryAgent:
         
         # Check execution results for agent evidence
         execution_results = execution_data.get("execution_results", {})
-        for key in execution_results.keys():
-            if "gmail" in key:
-                agent_types.add("gmail")
-            elif "github" in key:
-                agent_types.add("github")
-            elif "dsa" in key:
-                agent_types.add("dsa")
-            elif "email" in key:
-                agent_types.add("email")
+        for key in execution_results:
+            # Each key maps to its highest-priority token only
+            if AHOCORASICK_AVAILABLE:
+                matches = [match for _, match in _AGENT_AUTOMATON.iter(key)]
+                token = min(matches)[1] if matches else None
+            else:
+                token = next((token for token in AGENT_TOKENS if token in key), None)
+            
+            if token:
+                agent_types.add(token)
         
         return list(agent_types)
     
     def _cleanup_old_memory_data(self) -> None:
         """Clean up old memory data"""
         
-        cutoff_time = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_epoch = self._cutoff_epoch()
         
-        # Filter recent executions
-        filtered_executions = []
-        for execution in self.recent_executions:
-            try:
-                execution_time = datetime.fromisoformat(execution["timestamp"])
-                if execution_time >= cutoff_time:
-                    filtered_executions.append(execution)
-            except (ValueError, KeyError):
-                # Skip invalid entries
-                continue
+        # History is newest-first, so expired records are all at the right end
+        old_count = len(self.recent_executions)
+        while self.recent_executions and _record_epoch(self.recent_executions[-1]) < cutoff_epoch:
+            self.recent_executions.pop()
         
-        # Update if anything was cleaned
-        if len(filtered_executions) != len(self.recent_executions):
-            old_count = len(self.recent_executions)
-            self.recent_executions = filtered_executions
-            self.logger.info(f"Cleaned up {old_count - len(filtered_executions)} old memory records")
+        if len(self.recent_executions) != old_count:
+            self.logger.info(f"Cleaned up {old_count - len(self.recent_executions)} old memory records")
         
         # Clean up prompt signatures that are no longer referenced
         active_signatures = {exec.get("prompt_signature") for exec in self.recent_executions}
@@ -330,16 +966,131 @@ class MemoryAgent:
         
         for signature in old_signatures:
             del self.prompt_signatures[signature]
+        self._removed_signatures.update(old_signatures)
+        
+        if len(self.prompt_signatures) > self.max_signatures:
+            self._evict_cold_signatures()
+    
+    def _evict_cold_signatures(self) -> None:
+        """Evict prompt signatures by LRU-2 so one-off prompts go before repeated ones"""
+        
+        # Evict down to 90% of the limit so eviction is not repeated on every record
+        excess = len(self.prompt_signatures) - int(self.max_signatures * 0.9)
+        
+        # Rank by second-most-recent access; signatures seen only once rank as 0
+        def lru2_key(item):
+            access_times = item[1].get("access_times", [])
+            return (access_times[-2] if len(access_times) >= 2 else 0.0,
+                    access_times[-1] if access_times else 0.0)
+        
+        for signature, _ in heapq.nsmallest(excess, self.prompt_signatures.items(), key=lru2_key):
+            del self.prompt_signatures[signature]
+            self._removed_signatures.add(signature)
+        
+        self.logger.info(f"Evicted {excess} cold prompt signatures")
+    
+    def _mark_dirty(self) -> None:
+        """Schedule a save, or save immediately when background saving is off"""
+        
+        if self.background_save:
+            self._dirty.set()
+        else:
+            self._save_memory_data()
+    
+    def _save_worker(self) -> None:
+        """Background loop that coalesces changes into one save per delay window"""
+        
+        while True:
+            self._dirty.wait()
+            # close() cuts the delay short and writes the final batch itself
+            if self._closing.wait(self.save_delay):
+                return
+            self._dirty.clear()
+            self._save_memory_data()
+    
+    def flush(self) -> None:
+        """Write any pending memory changes to storage"""
+        
+        self._dirty.clear()
+        self._save_memory_data()
+    
+    def close(self) -> None:
+        """Write pending changes, stop the save thread and close the database"""
+        
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        atexit.unregister(self.close)
+        
+        if self._save_thread is not None:
+            # Wake the worker if it is idle so it sees _closing and exits
+            self._dirty.set()
+            self._save_thread.join()
+            self._save_thread = None
+        
+        self.flush()
+        
+        if self._db is not None:
+            self._db.close()
+            self._db = None
     
     def _save_memory_data(self) -> None:
         """Save memory data to storage"""
         
         try:
-            save_json_file(self.recent_executions, self.execution_history_file)
-            save_json_file(self.prompt_signatures, self.prompt_signatures_file)
+            with self._save_lock:
+                # Snapshot pending changes under the memory lock, write outside it
+                with self._memory_lock:
+                    rewrite = self._rewrite_store
+                    if rewrite:
+                        # Oldest first so row order follows execution order
+                        records = list(reversed(self.recent_executions))
+                        changed = dict(self.prompt_signatures)
+                    else:
+                        records = self._pending_records
+                        changed = {sig: self.prompt_signatures[sig]
+                                   for sig in self._dirty_signatures if sig in self.prompt_signatures}
+                    removed = list(self._removed_signatures - set(changed))
+                    oldest_epoch = _record_epoch(self.recent_executions[-1]) if self.recent_executions else None
+                    index_bytes = faiss.serialize_index(self._ann_index) if self._ann_index is not None else None
+                    
+                    self._rewrite_store = False
+                    self._pending_records = []
+                    self._dirty_signatures = set()
+                    self._removed_signatures = set()
+                
+                with self._db:
+                    if rewrite:
+                        self._db.execute("DELETE FROM executions")
+                        self._db.execute("DELETE FROM signatures")
+                    
+                    self._insert_records(records)
+                    
+                    # Rows older than the oldest retained record were evicted or expired
+                    if oldest_epoch is None:
+                        self._db.execute("DELETE FROM executions")
+                    else:
+                        self._db.execute("DELETE FROM executions WHERE ts_epoch < ?", (oldest_epoch,))
+                    
+                    self._db.executemany("DELETE FROM signatures WHERE signature = ?", [(sig,) for sig in removed])
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO signatures (signature, stats) VALUES (?, ?)",
+                        [(sig, json.dumps(stats, default=str)) for sig, stats in changed.items()]
+                    )
+                
+                if index_bytes is not None:
+                    self._write_atomic(self.ann_index_file, index_bytes.tobytes())
         except Exception as e:
             self.logger.error(f"Failed to save memory data: {e}")
     
+    def _write_atomic(self, file_path: str, content: bytes) -> None:
+        """Write a file via a temporary sibling so readers never see a partial file"""
+        
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    
     def get_execution_patterns(self) -> Dict[str, Any]:
         """
         Analyze execution patterns from memory
@@ -354,107 +1105,96 @@ class MemoryAgent:
                 "patterns": []
             }
         
-        # Analyze patterns
-        patterns = {
-            "most_common_agents": self._analyze_agent_usage(),
-            "success_patterns": self._analyze_success_patterns(),
-            "time_patterns": self._analyze_time_patterns(),
-            "prompt_patterns": self._analyze_prompt_patterns()
-        }
-        
         return {
             "total_executions": len(self.recent_executions),
-            "patterns": patterns,
+            "patterns": self._analyze_all(),
             "retention_period_days": self.retention_days
         }
     
-    def _analyze_agent_usage(self) -> Dict[str, int]:
-        """Analyze which agents are used most frequently"""
+    def _analyze_all(self) -> Dict[str, Any]:
+        """Compute agent, success, time and prompt patterns in a single pass over history"""
         
-        agent_counts = {}
+        agent_counts = Counter()
+        hour_counts = Counter()
+        word_counts = Counter()
+        total_words = 0
+        successful = 0
         
         for execution in self.recent_executions:
-            for agent_type in execution.get("agent_types", []):
-                agent_counts[agent_type] = agent_counts.get(agent_type, 0) + 1
-        
-        # Sort by usage
-        return dict(sorted(agent_counts.items(), key=lambda x: x[1], reverse=True))
-    
-    def _analyze_success_patterns(self) -> Dict[str, Any]:
-        """Analyze success/failure patterns"""
+            agent_counts.update(execution.get("agent_types", ()))
+            
+            if execution.get("success", False):
+                successful += 1
+            
+            ts_epoch = execution.get("ts_epoch")
+            if ts_epoch is not None:
+                hour_counts[datetime.fromtimestamp(ts_epoch).hour] += 1
+            
+            words = execution.get("prompt", "").lower().split()
+            total_words += len(words)
+            word_counts.update(word for word in words if len(word) > 3)  # Only count meaningful words
         
         total = len(self.recent_executions)
-        successful = len([e for e in self.recent_executions if e.get("success", False)])
         
         return {
-            "total_executions": total,
-            "successful_executions": successful,
-            "success_rate": (successful / total * 100) if total > 0 else 0,
-            "failure_rate": ((total - successful) / total * 100) if total > 0 else 0
+            "most_common_agents": dict(agent_counts.most_common()),
+            "success_patterns": {
+                "total_executions": total,
+                "successful_executions": successful,
+                "success_rate": (successful / total * 100) if total > 0 else 0,
+                "failure_rate": ((total - successful) / total * 100) if total > 0 else 0
+            },
+            "time_patterns": {
+                "executions_by_hour": dict(hour_counts),
+                "peak_hours": hour_counts.most_common(3),
+                "total_unique_hours": len(hour_counts)
+            } if total > 0 else {},
+            "prompt_patterns": {
+                "total_words": total_words,
+                "unique_words": len(word_counts),
+                "most_common_words": word_counts.most_common(10),
+                "unique_prompt_signatures": len(self.prompt_signatures)
+            }
         }
     
+    def _analyze_agent_usage(self) -> Dict[str, int]:
+        """Analyze which agents are used most frequently"""
+        return self._analyze_all()["most_common_agents"]
+    
+    def _analyze_success_patterns(self) -> Dict[str, Any]:
+        """Analyze success/failure patterns"""
+        return self._analyze_all()["success_patterns"]
+    
     def _analyze_time_patterns(self) -> Dict[str, Any]:
         """Analyze execution time patterns"""
-        
-        if not self.recent_executions:
-            return {}
-        
-        # Group by hour of day
-        hour_counts = {}
-        
-        for execution in self.recent_executions:
-            try:
-                timestamp = datetime.fromisoformat(execution["timestamp"])
-                hour = timestamp.hour
-                hour_counts[hour] = hour_counts.get(hour, 0) + 1
-            except (ValueError, KeyError):
-                continue
-        
-        # Find peak hours
-        sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        return {
-            "executions_by_hour": hour_counts,
-            "peak_hours": sorted_hours[:3] if sorted_hours else [],
-            "total_unique_hours": len(hour_counts)
-        }
+        return self._analyze_all()["time_patterns"]
     
     def _analyze_prompt_patterns(self) -> Dict[str, Any]:
         """Analyze prompt patterns and frequencies"""
-        
-        # Analyze most common words
-        all_words = []
-        for execution in self.recent_executions:
-            prompt = execution.get("prompt", "").lower()
-            words = prompt.split()
-            all_words.extend(words)
-        
-        # Count word frequencies
-        word_counts = {}
-        for word in all_words:
-            if len(word) > 3:  # Only count meaningful words
-                word_counts[word] = word_counts.get(word, 0) + 1
-        
-        # Get most common words
-        common_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        return {
-            "total_words": len(all_words),
-            "unique_words": len(word_counts),
-            "most_common_words": common_words,
-            "unique_prompt_signatures": len(self.prompt_signatures)
-        }
+        return self._analyze_all()["prompt_patterns"]
     
     def force_cleanup(self) -> Dict[str, Any]:
         """Force cleanup of all memory data"""
         
-        old_executions = len(self.recent_executions)
-        old_signatures = len(self.prompt_signatures)
-        
-        self.recent_executions = []
-        self.prompt_signatures = {}
+        with self._memory_lock:
+            old_executions = len(self.recent_executions)
+            old_signatures = len(self.prompt_signatures)
+            
+            self.recent_executions.clear()
+            self.prompt_signatures = {}
+            self._sig_to_exec = {}
+            self._prompt_words = {}
+            self._reset_word_matrix()
+            self._rebuild_lsh()
+            
+            if self._ann_index is not None:
+                self._ann_index.reset()
+                self._ann_records = {}
+            
+            self._rewrite_store = True
+            self._check_cache.clear()
         
-        self._save_memory_data()
+        self.flush()
         
         return {
             "cleaned_executions": old_executions,
@@ -2,119 +2,115 @@
 Planner Agent: Converts natural language prompts into structured task plans
 """
 
+import asyncio
+import copy
+import hashlib
 import json
 import logging
 import os
+import random
+import re
 import sys
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, ClassVar, Dict, List, Any, Optional, Tuple, Union
+from datetime import datetime, timedelta
 
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv("config/.env")
-except ImportError:
-    # Try loading without dotenv
-    env_path = "config/.env"
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
+# Load environment variables from .env file (once per process tree; child processes inherit os.environ)
+if not os.environ.get("_AUTOTASKER_ENV_LOADED"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv("config/.env")
+    except ImportError:
+        # Try loading without dotenv
+        env_path = "config/.env"
+        if os.path.exists(env_path):
+            with open(env_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            for line in lines:
+                if line.startswith('#'):
+                    continue
+                key, sep, value = line.strip().partition('=')
+                if sep:
                     os.environ[key] = value.strip('"')
+    os.environ["_AUTOTASKER_ENV_LOADED"] = "1"
 
 # Add project root to Python path for direct execution
 if __name__ == "__main__":
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     sys.path.insert(0, project_root)
 
-from backend.utils import retry_on_failure
-from backend.llm_factory import create_llm_client, get_chat_completion, LLMClientFactory
+try:
+    import numpy as np
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
 
+# Fast JSON parsing for plan responses (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-class PlannerAgent:
-    """Converts natural language into structured, executable task plans"""
-    
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
-        self.logger = logging.getLogger(f"{__name__}.PlannerAgent")
-        
-        # Initialize LLM client (supports both OpenAI and OpenRouter)
-        self.client = create_llm_client(config)
-        
-        # Get appropriate model for this agent
-        self.model = LLMClientFactory.get_model_name(config, "planner")
-        self.temperature = config.get("agents", {}).get("planner", {}).get("temperature", 0.3)
-        
-    @retry_on_failure(max_retries=3)
-    def create_task_plan(self, prompt: str) -> Dict[str, Any]:
-        """
-        Convert natural language prompt into structured task plan
-        
-        Args:
-            prompt: Natural language description of what to do
-            
-        Returns:
-            Structured task plan with steps and metadata
-        """
-        
-        # CRITICAL: Pre-process common patterns that LLM often gets wrong
-        prompt_lower = prompt.lower()
-        
-        # Pattern 1: List/Show repositories
-        if any(word in prompt_lower for word in ['list', 'show', 'get', 'fetch']) and \
-           any(word in prompt_lower for word in ['repositories', 'repos', 'repository']):
-            # Check if it's asking for ALL repos (not a specific one)
-            if not any(word in prompt_lower for word in ['commits', 'issues', 'info about', 'details', 'status']):
-                self.logger.info("🎯 Detected 'list repositories' pattern - creating direct plan")
-                return self._create_list_repos_plan(prompt)
-        
-        # Otherwise, use LLM to plan
-        system_prompt = self._get_planning_system_prompt()
-        user_prompt = self._format_user_prompt(prompt)
-        
-        try:
-            # Use unified chat completion interface
-            plan_text = get_chat_completion(
-                client=self.client,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                model=self.model,
-                temperature=self.temperature,
-                max_tokens=2000
-            )
-            task_plan = self._parse_plan_response(plan_text)
-            
-            self.logger.info(f"Created task plan with {len(task_plan.get('tasks', []))} steps")
-            
-            return task_plan
-            
-        except Exception as e:
-            self.logger.error(f"Failed to create task plan: {e}")
-            return self._create_fallback_plan(prompt)
-    
-    def _get_planning_system_prompt(self) -> str:
-        """Get the system prompt for task planning"""
-        return """You are AutoTasker AI's Task Planner. Your job is to convert natural language requests into structured, executable task plans.
+# Incremental JSON parsing for streamed plans (optional)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+    TENACITY_AVAILABLE = True
+except ImportError:
+    TENACITY_AVAILABLE = False
 
-Available Task Types:
-- gmail: Fetch, filter, or process emails from Gmail
-- github: Get repository data, commits, or issues (requires 'repository' parameter in 'owner/repo' format)
-- dsa: Generate Data Structures & Algorithms coding questions
-- leetcode: Get LeetCode problems, study plans, and recommendations
+from backend.utils import retry_on_failure, save_json_file, load_json_file
+from backend.llm_factory import (
+    create_llm_client, create_async_llm_client, aclose_async_llm_clients, get_chat_completion,
+    aget_chat_completion, astream_chat_completion, LLMClientFactory, TRANSIENT_LLM_ERRORS
+)
+
+# Default size and lifetime of the exact-match plan cache
+PLAN_CACHE_SIZE = 512
+PLAN_CACHE_TTL_SECONDS = 3600
+
+# Batch planning fsyncs its JSONL checkpoint after this many new plans
+CHECKPOINT_FSYNC_EVERY = 50
+
+# Output budget for a plan; typical plans are 200-400 tokens
+PLAN_MAX_TOKENS = 800
+
+# Short single-agent prompts go to the optional fast model with a smaller budget
+SIMPLE_PLAN_MAX_TOKENS = 500
+SIMPLE_PROMPT_MAX_WORDS = 12
+
+# Async LLM calls in flight per event loop, and backoff for transient failures
+CONCURRENCY_LIMIT = 32
+RETRY_ATTEMPTS = 5
+RETRY_MIN_WAIT_SECONDS = 1
+RETRY_MAX_WAIT_SECONDS = 30
+
+# Cosine similarity a previous prompt needs to reuse its plan
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+# System prompt for task planning; kept byte-identical across calls so
+# providers can reuse the cached prefix
+_PLANNING_SYSTEM_PROMPT = """You are AutoTasker AI's Task Planner. Your job is to convert natural language requests into structured, executable task plans.
+
+Task Types:
+- gmail: Fetch/filter emails (query, max_results, time_range)
+- github: Repository data, commits, issues (see GitHub parameters below)
+- dsa: Custom coding questions and algorithm explanations (count)
+- leetcode: LeetCode problems, study plans, daily challenges, interview prep (count)
 - summarize: Summarize content from other tasks
 - email: Send final results via email
 - schedule: Set up recurring tasks
-- calendar: Create, update, or fetch Google Calendar events (use for scheduling meetings and viewing existing events)
-
-Task Type Details:
-- leetcode: Use for LeetCode problems, study plans, daily coding challenges, interview prep (use "count" parameter for number of questions)
-- dsa: Use for custom coding questions and algorithm explanations (use "count" parameter for number of questions)
-- gmail: For email fetching and processing (use 'query', 'max_results', 'time_range' parameters)
-- github: For repository analysis and commit tracking
-- calendar: For CREATING new events (with start_time/end_time) OR LISTING/FETCHING existing events (with operation parameter)
+- calendar: CREATE events (start_time/end_time) or LIST/FETCH existing events (operation)
 
 CRITICAL LeetCode Parameters:
 When creating a leetcode task, use:
@@ -270,48 +266,29 @@ Example: Get Single Repo Info
   }
 }
 
-For each task, specify:
-1. type: The task type from above
-2. description: What this step does
-3. parameters: Specific parameters needed (follow the format above!)
-4. dependencies: Which previous tasks this depends on (if any)
-5. priority: 1 (high) to 3 (low)
-
+Each task has: id, type, description, parameters, dependencies (ids of earlier tasks) and priority (1 high to 3 low).
 Always include an email task at the end to send results.
+Top-level fields: intent, schedule (daily|weekly|once|custom), time (HH:MM if scheduled), tasks, estimated_duration.
 
-Respond with ONLY a JSON object in this format:
+Respond with ONLY a JSON object shaped like this example:
+<example>
+User says: "Every morning at 8am summarize my unread emails and send me 2 medium coding questions"
 {
-  "intent": "Brief description of user's goal",
-  "schedule": "daily|weekly|once|custom",
-  "time": "HH:MM format if scheduled",
+  "intent": "Daily email summary with coding practice",
+  "schedule": "daily",
+  "time": "08:00",
   "tasks": [
-    {
-      "id": "unique_task_id",
-      "type": "task_type",
-      "description": "What this task does",
-      "parameters": {
-        "key": "value"
-      },
-      "dependencies": ["task_id1"],
-      "priority": 1
-    }
+    {"id": "fetch_emails", "type": "gmail", "description": "Fetch unread emails", "parameters": {"query": "is:unread"}, "dependencies": [], "priority": 1},
+    {"id": "summarize_emails", "type": "summarize", "description": "Summarize the emails", "parameters": {}, "dependencies": ["fetch_emails"], "priority": 2},
+    {"id": "coding_questions", "type": "dsa", "description": "Generate coding questions", "parameters": {"count": 2, "difficulty": "medium"}, "dependencies": [], "priority": 2},
+    {"id": "send_results", "type": "email", "description": "Email the summary and questions", "parameters": {}, "dependencies": ["summarize_emails", "coding_questions"], "priority": 1}
   ],
-  "estimated_duration": "X minutes"
-}"""
-    
-    def _format_user_prompt(self, prompt: str) -> str:
-        """Format the user prompt with additional context"""
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Extract and normalize time from prompt for better planning
-        extracted_time = self._extract_time_from_prompt(prompt)
-        time_context = f"\nExtracted time: {extracted_time}" if extracted_time else ""
-        
-        return f"""Current time: {current_time}{time_context}
-
-User request: "{prompt}"
+  "estimated_duration": "3 minutes"
+}
+</example>"""
 
-Please create a structured task plan for this request. Consider:
+# Static planning instructions that open every user prompt
+_USER_PROMPT_STATIC = """Please create a structured task plan for the user request below. Consider:
 1. What data needs to be fetched (emails, GitHub data, etc.)
 2. What processing is needed (summarization, generation, etc.)
 3. How results should be delivered (email)
@@ -322,25 +299,867 @@ CRITICAL: If the user specifies an exact time (like "11:47pm"), use that time in
 If user says "now" with repetitions, use immediate execution with intervals.
 
 Create the most efficient plan possible."""
+
+# Lowercase word tokens used for keyword matching
+_WORD_RE = re.compile(r"[a-z]+")
+
+# "List repositories" prompts are planned directly, unless they ask about one repository
+_LIST_VERBS = frozenset({"list", "show", "get", "fetch"})
+_REPO_NOUNS = frozenset({"repositories", "repos", "repository"})
+_REPO_DETAIL_WORDS = frozenset({"commits", "issues", "details", "status"})
+_REPO_DETAIL_PHRASES = re.compile(r"info about")
+
+# Keyword routing for prompts simple enough to plan without the LLM
+_DOMAIN_WORDS = {
+    "gmail": frozenset({"gmail", "inbox", "emails", "unread"}),
+    "github": frozenset({"github", "commit", "commits", "repository", "repositories", "repo", "repos", "issues"}),
+    "leetcode": frozenset({"leetcode"}),
+    "dsa": frozenset({"dsa", "coding", "algorithm", "algorithms"}),
+    "calendar": frozenset({"calendar", "meeting", "meetings", "event", "events"}),
+    "summarize": frozenset({"summarize", "summarise", "summary", "digest"})
+}
+_SCHEDULE_WORDS = frozenset({
+    "daily", "weekly", "monthly", "every", "each", "schedule", "scheduled", "remind", "reminder",
+    "repeat", "times", "gap", "min", "mins", "minute", "minutes", "hour", "hours", "later",
+    "tomorrow", "tonight", "morning", "evening", "night", "week", "weekend", "weekdays"
+})
+_VIEW_VERBS = frozenset({"show", "list", "view", "what", "whats", "check", "see", "display", "fetch", "get"})
+_CALENDAR_CHANGE_VERBS = frozenset({
+    "schedule", "create", "add", "book", "set", "make", "cancel", "delete", "remove", "move", "reschedule", "update"
+})
+_GMAIL_FILTER_WORDS = frozenset({
+    "from", "about", "subject", "label", "reply", "send", "draft", "search", "with", "important",
+    "starred", "attachment", "attachments", "since", "days", "yesterday"
+})
+_QUESTION_WORDS = frozenset({"question", "questions", "problem", "problems"})
+
+# Words whose meaning moves with the clock; plans for such prompts are never cached
+_TIME_RELATIVE_WORDS = frozenset({
+    "now", "today", "tonight", "tomorrow", "yesterday", "morning", "afternoon", "evening",
+    "week", "weekend", "month", "year", "recent", "recently", "latest", "last", "past", "next",
+    "upcoming", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"
+})
+_DIFFICULTIES = ("easy", "medium", "hard")
+
+# Topics named in coding prompts, as the topic slugs the LeetCode agent looks problems up by
+_TOPIC_PATTERNS = (
+    ("arrays", re.compile(r"\barrays?\b")),
+    ("strings", re.compile(r"\bstrings?\b")),
+    ("linked_lists", re.compile(r"\blinked ?lists?\b")),
+    ("trees", re.compile(r"\btrees?\b")),
+    ("graphs", re.compile(r"\bgraphs?\b")),
+    ("dynamic_programming", re.compile(r"\bdynamic programming\b|\bdp\b")),
+    ("greedy", re.compile(r"\bgreedy\b")),
+    ("binary_search", re.compile(r"\bbinary search\b")),
+    ("two_pointers", re.compile(r"\btwo pointers?\b")),
+    ("sliding_window", re.compile(r"\bsliding window\b")),
+    ("hash_tables", re.compile(r"\bhash ?(?:tables?|maps?)\b|\bhashing\b")),
+    ("stacks", re.compile(r"\bstacks?\b")),
+    ("queues", re.compile(r"\bqueues?\b")),
+    ("heaps", re.compile(r"\bheaps?\b")),
+    ("tries", re.compile(r"\btries\b|\btrie\b")),
+    ("backtracking", re.compile(r"\bbacktracking\b")),
+    ("bit_manipulation", re.compile(r"\bbit manipulation\b")),
+    ("sorting", re.compile(r"\bsort(?:ing)?\b")),
+    ("recursion", re.compile(r"\brecursion\b"))
+)
+_AMBIGUOUS_CODING_PHRASES = re.compile(r"coding problems|study plan")
+
+# Calendar operations that read events, and the parameters only event creation uses
+_CALENDAR_LIST_OPERATIONS = frozenset({"list", "fetch", "get", "show", "view"})
+_CALENDAR_CREATE_PARAMS = ("summary", "start_time", "end_time", "duration_minutes", "reminders", "attendees", "description")
+
+# Fallback plan rules: (keywords, phrase pattern, task template, id of a task
+# that makes the rule redundant), checked in order against the prompt tokens
+_FALLBACK_RULES = (
+    (
+        frozenset({"email", "emails", "gmail", "inbox"}),
+        None,
+        {
+            "id": "gmail_fetch",
+            "type": "gmail",
+            "description": "Fetch recent emails",
+            "parameters": {"max_results": 10, "time_range": "1d"},
+            "dependencies": [],
+            "priority": 1
+        },
+        None
+    ),
+    (
+        frozenset({"github", "commit", "commits", "repository"}),
+        None,
+        {
+            "id": "github_fetch",
+            "type": "github",
+            "description": "Fetch GitHub data",
+            "parameters": {"time_range": "1d"},
+            "dependencies": [],
+            "priority": 1
+        },
+        None
+    ),
+    (
+        frozenset({"leetcode"}),
+        re.compile(r"study plan|coding problems"),
+        {
+            "id": "leetcode_generate",
+            "type": "leetcode",
+            "description": "Generate LeetCode recommendations",
+            "parameters": {"count": 3, "difficulty_level": "intermediate"},
+            "dependencies": [],
+            "priority": 1
+        },
+        None
+    ),
+    (
+        frozenset({"dsa", "coding", "algorithm", "algorithms", "question", "questions"}),
+        None,
+        {
+            "id": "dsa_generate",
+            "type": "dsa",
+            "description": "Generate coding questions",
+            "parameters": {"count": 2, "difficulty": "medium"},
+            "dependencies": [],
+            "priority": 1
+        },
+        "leetcode_generate"
+    ),
+)
+
+# Times in prompts: "11:47pm", "9am" and 24-hour "23:47"
+_TIME_HHMM_AMPM_RE = re.compile(r'(\d{1,2}):(\d{2})\s*(am|pm)')
+_TIME_H_AMPM_RE = re.compile(r'(\d{1,2})\s*(am|pm)')
+_TIME_24H_RE = re.compile(r'(\d{1,2}):(\d{2})(?!\s*(am|pm))')
+
+# Username in a list-repositories prompt. Each alternative is a lookahead so one
+# scan reports a match at every position; group numbers give the alternative's
+# priority (lower wins)
+_USERNAME_RE = re.compile(
+    r'(?='
+    r'(?:with\s+)?username\s+(\S+)'  # "with username sam-ry" or "username sam-ry"
+    r'|for\s+(?:user\s+)?(\S+)'      # "for sam-ry" or "for user sam-ry"
+    r'|of\s+(?:user\s+)?(\S+)'       # "of sam-ry" or "of user sam-ry"
+    r'|user\s+(\S+)'                  # "user sam-ry"
+    r')'
+)
+
+# Markdown code fence around a JSON plan (```json ... ``` or ``` ... ```)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Numbers (counts, times, dates) must match exactly for a semantic hit
+_NUMBER_RE = re.compile(r"\d+")
+
+
+# (epoch second, ISO timestamp) of the last _iso_now() call
+_iso_now_cache: Tuple[int, str] = (0, "")
+
+
+def _iso_now() -> str:
+    """Current local time as a seconds-precision ISO string, reused within the same second"""
+    global _iso_now_cache
+    
+    second = int(time.time())
+    cached_second, timestamp = _iso_now_cache
+    if second != cached_second:
+        timestamp = datetime.fromtimestamp(second).isoformat(timespec="seconds")
+        _iso_now_cache = (second, timestamp)
+    return timestamp
+
+
+def _canonical_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially reformatted prompts share a cache entry"""
+    return " ".join(prompt.split())
+
+
+def _ampm_to_24(hour: int, minute: int, ampm: str) -> str:
+    """Format a 12-hour clock time as 24-hour "HH:MM" (12am is 00, 12pm is 12)"""
+    return f"{hour % 12 + (12 if ampm == 'pm' else 0):02d}:{minute:02d}"
+
+
+def _parse_iso_naive(value: str) -> datetime:
+    """Parse "YYYY-MM-DDTHH:MM:SS" or "YYYY-MM-DD HH:MM:SS" without strptime"""
+    if len(value) != 19 or value[4] != "-" or value[7] != "-" or value[10] not in "T " or value[13] != ":" or value[16] != ":":
+        raise ValueError(f"Unsupported datetime format: {value!r}")
+    
+    return datetime(
+        int(value[0:4]), int(value[5:7]), int(value[8:10]),
+        int(value[11:13]), int(value[14:16]), int(value[17:19])
+    )
+
+
+def _loads_json(text: Union[str, bytes]) -> Any:
+    """Parse JSON text, using orjson when available"""
+    
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _dumps_json_line(data: Any) -> bytes:
+    """Serialize data as one UTF-8 JSON line, using orjson when available"""
+    
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str) + b"\n"
+    return (json.dumps(data, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class PlannerAgent:
+    """Converts natural language into structured, executable task plans"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = logging.getLogger(f"{__name__}.PlannerAgent")
+        
+        # Initialize LLM client (supports both OpenAI and OpenRouter)
+        self.client = create_llm_client(config)
+        self._async_client = None  # Shared per event loop, fetched by acreate_task_plan
+        self._async_client_loop = None
+        self._async_semaphore = None
+        self._inflight_plans: Dict[str, asyncio.Future] = {}  # Prompt key -> LLM planning task on the bound loop
+        self.concurrency_limit = config.get("agents", {}).get("planner", {}).get("concurrency_limit", CONCURRENCY_LIMIT)
+        
+        # Get appropriate model for this agent
+        self.model = LLMClientFactory.get_model_name(config, "planner")
+        self.temperature = config.get("agents", {}).get("planner", {}).get("temperature", 0.3)
+        # Optional smaller model for short single-agent prompts; defaults to the planner model
+        self.fast_model = config.get("agents", {}).get("planner", {}).get("fast_model") or self.model
+        
+        # Byte-identical message prefix reused by every planning request
+        self._base_messages = self._build_base_messages()
+        
+        # Task defaults resolved once instead of on every task enhancement
+        self._github_default_owner, self._github_default_repository = self._resolve_github_defaults()
+        self._timezone = os.getenv("TIMEZONE") or config.get("timezone") or "Asia/Kolkata"
+        
+        # Exact-match plan cache: key -> (expires_at, plan), least recently used first
+        planner_config = config.get("agents", {}).get("planner", {})
+        self.plan_cache_size = planner_config.get("plan_cache_size", PLAN_CACHE_SIZE)
+        self.plan_cache_ttl = planner_config.get("plan_cache_ttl_seconds", PLAN_CACHE_TTL_SECONDS)
+        self._plan_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._plan_cache_lock = threading.Lock()
+        
+        # Semantic cache for reworded prompts (embedding model loaded on first use)
+        self.use_semantic_cache = planner_config.get("semantic_cache", False)
+        self.semantic_threshold = planner_config.get("semantic_cache_threshold", SEMANTIC_CACHE_THRESHOLD)
+        self.embedding_model = planner_config.get("embedding_model", "all-MiniLM-L6-v2")
+        self.semantic_index_file = os.path.join("memory", "planner_cache.index")
+        self.semantic_plans_file = os.path.join("memory", "planner_cache.json")
+        self._embedder = None
+        self._semantic_index = None
+        self._semantic_entries: Dict[int, Dict[str, Any]] = {}
+        self._next_semantic_id = 0
+        self._semantic_lock = threading.Lock()
+        
+    @retry_on_failure(max_retries=3)
+    def create_task_plan(self, prompt: str) -> Dict[str, Any]:
+        """
+        Convert natural language prompt into structured task plan
+        
+        Args:
+            prompt: Natural language description of what to do
+            
+        Returns:
+            Structured task plan with steps and metadata
+        """
+        
+        plan = self._plan_without_llm(prompt)
+        if plan is not None:
+            return plan
+        
+        try:
+            # Use unified chat completion interface
+            model, max_tokens = self._completion_settings(prompt)
+            plan_text = get_chat_completion(
+                client=self.client,
+                messages=self._build_planning_messages(prompt),
+                model=model,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                **self._completion_options(model)
+            )
+            return self._finish_task_plan(prompt, plan_text)
+            
+        except Exception as e:
+            self.logger.error("Failed to create task plan: %s", e)
+            return self._create_fallback_plan(prompt)
+    
+    async def acreate_task_plan(self, prompt: str) -> Dict[str, Any]:
+        """
+        Asyncio version of create_task_plan
+        
+        Several prompts can be planned concurrently with asyncio.gather.
+        
+        Args:
+            prompt: Natural language description of what to do
+            
+        Returns:
+            Structured task plan with steps and metadata
+        """
+        plan = self._plan_without_llm(prompt)
+        if plan is not None:
+            return plan
+        
+        # Concurrent requests for the same prompt share one LLM call
+        self._get_async_client()
+        key = self._plan_cache_key(prompt)
+        pending = self._inflight_plans.get(key)
+        if pending is not None:
+            self.logger.debug("Joining in-flight plan for identical prompt")
+            return copy.deepcopy(await asyncio.shield(pending))
+        
+        pending = asyncio.ensure_future(self._aplan_with_llm(prompt))
+        self._inflight_plans[key] = pending
+        pending.add_done_callback(lambda _: self._inflight_plans.pop(key, None))
+        
+        # Shielded so a cancelled caller does not cancel the plan for the others
+        return await asyncio.shield(pending)
+    
+    async def stream_task_plan(self, prompt: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Plan a prompt while streaming the LLM response, yielding tasks as they complete
+        
+        Each task is enhanced and yielded as soon as its JSON object is
+        closed in the stream, so callers can start dispatching before the
+        whole plan has been generated. The full plan is cached exactly as
+        acreate_task_plan would cache it.
+        
+        Args:
+            prompt: Natural language description of what to do
+            
+        Yields:
+            Enhanced tasks in plan order (including the final email task)
+            
+        Raises:
+            Exception: The streaming error, when it happens after tasks were yielded
+                (before that, the fallback plan is yielded instead)
+        """
+        plan = self._plan_without_llm(prompt)
+        if plan is not None:
+            for task in plan["tasks"]:
+                yield task
+            return
+        
+        yielded = 0
+        try:
+            chunks = []
+            # Tasks are parsed from the first "{" onwards so a leading markdown fence is skipped
+            parser, parsed_tasks, started = None, None, False
+            if IJSON_AVAILABLE:
+                parsed_tasks = ijson.sendable_list()
+                parser = ijson.items_coro(parsed_tasks, "tasks.item", use_float=True)
+            
+            model, max_tokens = self._completion_settings(prompt)
+            semaphore = self._async_semaphore_for_loop()
+            fragments = astream_chat_completion(
+                client=self._get_async_client(),
+                messages=self._build_planning_messages(prompt),
+                model=model,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                **self._completion_options(model)
+            )
+            try:
+                while True:
+                    # Hold a concurrency slot only while reading, never while the caller handles a yielded task
+                    async with semaphore:
+                        try:
+                            fragment = await fragments.__anext__()
+                        except StopAsyncIteration:
+                            break
+                    
+                    chunks.append(fragment)
+                    if parser is None:
+                        continue
+                    
+                    if not started:
+                        brace = fragment.find("{")
+                        if brace < 0:
+                            continue
+                        fragment, started = fragment[brace:], True
+                    
+                    try:
+                        parser.send(fragment.encode("utf-8"))
+                    except ijson.JSONError:
+                        # Trailing fences or malformed output: finish from the full text instead
+                        parser = None
+                        continue
+                    
+                    for task in parsed_tasks:
+                        yield self._enhance_task(task, yielded)
+                        yielded += 1
+                    del parsed_tasks[:]
+            finally:
+                await fragments.aclose()
+            
+            plan = self._finish_task_plan(prompt, "".join(chunks))
+            
+        except Exception as e:
+            self.logger.error("Failed to stream task plan: %s", e)
+            if yielded:
+                # The tasks already yielded are only part of a plan; let the caller discard them
+                raise
+            plan = self._create_fallback_plan(prompt)
+        
+        # Tasks not streamed yet, such as the email task added during validation
+        for task in plan["tasks"][yielded:]:
+            yield task
+    
+    async def acreate_task_plans(self, prompts: List[str], output_jsonl: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Plan many prompts concurrently, optionally checkpointing to a JSONL file
+        
+        Prompts already recorded in output_jsonl by an earlier (possibly
+        interrupted) run are restored instead of being planned again.
+        
+        Args:
+            prompts: Natural language requests to plan
+            output_jsonl: Optional checkpoint file with one {"hash", "prompt", "plan"} object per line
+            
+        Returns:
+            Task plans in the same order as prompts
+        """
+        keys = [self._plan_cache_key(prompt) for prompt in prompts]
+        plans = self._load_plan_checkpoint(output_jsonl) if output_jsonl else {}
+        
+        # Each distinct prompt is planned once, even if it is repeated in the batch
+        pending: Dict[str, str] = {}
+        for key, prompt in zip(keys, prompts):
+            if key not in plans:
+                pending.setdefault(key, prompt)
+        
+        self.logger.info("Batch planning %d prompts (%d restored from checkpoint)", len(pending), len(plans))
+        
+        checkpoint = open(output_jsonl, "ab") if output_jsonl else None
+        written = 0
+        
+        async def plan_one(key: str, prompt: str) -> None:
+            nonlocal written
+            plan = await self.acreate_task_plan(prompt)
+            plans[key] = plan
+            
+            # Failed plans are left out so a rerun retries them
+            if checkpoint is not None and not plan.get("fallback") and not plan.get("emergency"):
+                checkpoint.write(_dumps_json_line({"hash": key, "prompt": prompt, "plan": plan}))
+                written += 1
+                if written % CHECKPOINT_FSYNC_EVERY == 0:
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
+        
+        try:
+            await asyncio.gather(*(plan_one(key, prompt) for key, prompt in pending.items()))
+        finally:
+            if checkpoint is not None:
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                checkpoint.close()
+        
+        results = []
+        returned = set()
+        for key in keys:
+            # Repeated prompts get their own copy so callers can mutate plans independently
+            results.append(copy.deepcopy(plans[key]) if key in returned else plans[key])
+            returned.add(key)
+        
+        return results
+    
+    def _load_plan_checkpoint(self, path: str) -> Dict[str, Dict[str, Any]]:
+        """Read plans from a JSONL checkpoint, dropping a torn final line"""
+        plans: Dict[str, Dict[str, Any]] = {}
+        
+        if not os.path.exists(path):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            return plans
+        
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # An interrupted run left a partial line; resume after the last complete one
+                f.truncate(end)
+        
+        for line in data[:end].splitlines():
+            try:
+                record = _loads_json(line)
+                plans[record["hash"]] = record["plan"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+        
+        return plans
+    
+    async def aclose(self) -> None:
+        """Close the shared async LLM clients and their connection pools at shutdown"""
+        self._async_client, self._async_client_loop = None, None
+        await aclose_async_llm_clients()
+    
+    def _get_async_client(self):
+        """Return the async client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        
+        # Connection pools and semaphores belong to the loop that created them
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = create_async_llm_client(self.config)
+            self._async_semaphore = asyncio.Semaphore(self.concurrency_limit)
+            self._inflight_plans = {}
+            self._async_client_loop = loop
+        
+        return self._async_client
+    
+    def _async_semaphore_for_loop(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore of the running event loop"""
+        self._get_async_client()
+        return self._async_semaphore
+    
+    async def _aplan_with_llm(self, prompt: str) -> Dict[str, Any]:
+        """Plan a prompt with the async LLM client, falling back on failure"""
+        try:
+            plan_text = await self._acomplete_with_retry(prompt)
+            return self._finish_task_plan(prompt, plan_text)
+            
+        except Exception as e:
+            self.logger.error("Failed to create task plan: %s", e)
+            return self._create_fallback_plan(prompt)
+    
+    async def _acomplete_with_retry(self, prompt: str) -> str:
+        """Run the planning completion, backing off with jitter on transient errors"""
+        client = self._get_async_client()
+        messages = self._build_planning_messages(prompt)
+        model, max_tokens = self._completion_settings(prompt)
+        
+        async def complete() -> str:
+            # Cap in-flight requests to stay under the provider's rate limit
+            async with self._async_semaphore:
+                return await aget_chat_completion(
+                    client=client,
+                    messages=messages,
+                    model=model,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **self._completion_options(model)
+                )
+        
+        if TENACITY_AVAILABLE:
+            async for attempt in AsyncRetrying(
+                wait=wait_random_exponential(min=RETRY_MIN_WAIT_SECONDS, max=RETRY_MAX_WAIT_SECONDS),
+                stop=stop_after_attempt(RETRY_ATTEMPTS),
+                retry=retry_if_exception_type(TRANSIENT_LLM_ERRORS),
+                reraise=True
+            ):
+                with attempt:
+                    return await complete()
+        
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await complete()
+            except TRANSIENT_LLM_ERRORS as e:
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                # Full jitter keeps concurrent plans from retrying in lockstep
+                delay = random.uniform(0, min(RETRY_MAX_WAIT_SECONDS, RETRY_MIN_WAIT_SECONDS * 2 ** attempt))
+                self.logger.warning("Transient LLM error, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+    
+    def _plan_without_llm(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a direct or cached plan when the LLM call can be skipped"""
+        
+        # CRITICAL: Pre-process common patterns that LLM often gets wrong
+        prompt_lower = prompt.lower()
+        tokens = set(_WORD_RE.findall(prompt_lower))
+        
+        # Unambiguous single-agent requests are routed to a fixed plan
+        category = self._classify(prompt, prompt_lower, tokens)
+        if category is not None:
+            self.logger.info("🎯 Detected '%s' pattern - creating direct plan", category)
+            return self._DIRECT_PLAN_BUILDERS[category](self, prompt)
+        
+        # A cached plan for "today" or "this week" would point at the day it was made
+        if tokens & _TIME_RELATIVE_WORDS:
+            return None
+        
+        # Identical prompts reuse the cached plan instead of calling the LLM again
+        cached_plan = self._get_cached_plan(self._plan_cache_key(prompt))
+        if cached_plan is not None:
+            self.logger.info("🎯 Reusing cached task plan for identical prompt")
+            return cached_plan
+        
+        cached_plan = self._get_semantic_plan(prompt)
+        if cached_plan is not None:
+            self.logger.info("🎯 Reusing cached task plan for a similar prompt")
+            return cached_plan
+        
+        return None
+    
+    def _completion_settings(self, prompt: str) -> Tuple[str, int]:
+        """Pick the model and output budget for a prompt, using the fast model for simple prompts"""
+        if self.fast_model != self.model and self._is_simple(prompt):
+            return self.fast_model, SIMPLE_PLAN_MAX_TOKENS
+        return self.model, PLAN_MAX_TOKENS
+    
+    def _is_simple(self, prompt: str) -> bool:
+        """Short prompts that mention a single source agent (optionally summarized) need only a small plan"""
+        if len(prompt.split()) > SIMPLE_PROMPT_MAX_WORDS:
+            return False
+        
+        tokens = set(_WORD_RE.findall(prompt.lower()))
+        sources = [name for name, words in _DOMAIN_WORDS.items() if name != "summarize" and tokens & words]
+        return len(sources) == 1
+    
+    def _completion_options(self, model: Optional[str] = None) -> Dict[str, Any]:
+        """Extra completion parameters supported by the planner model"""
+        if LLMClientFactory.supports_json_mode(model or self.model):
+            # Forces a bare JSON object: no markdown fences, fewer parse failures
+            return {"response_format": {"type": "json_object"}}
+        return {}
+    
+    def _build_base_messages(self) -> Tuple[Dict[str, Any], ...]:
+        """Build the fixed message prefix shared by every planning request"""
+        system_content = self._get_planning_system_prompt()
+        
+        # The system prompt is identical on every call, so let the provider cache it
+        if LLMClientFactory.supports_cache_control(self.model):
+            system_content = [{
+                "type": "text",
+                "text": system_content,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        
+        return ({"role": "system", "content": system_content},)
+    
+    def _build_planning_messages(self, prompt: str) -> List[Dict[str, Any]]:
+        """Build the chat messages sent to the LLM for planning"""
+        return [*self._base_messages, {"role": "user", "content": self._format_user_prompt(prompt)}]
+    
+    def _finish_task_plan(self, prompt: str, plan_text: str) -> Dict[str, Any]:
+        """Parse an LLM response into a plan and cache it"""
+        task_plan = self._parse_plan_response(plan_text)
+        
+        self.logger.info("Created task plan with %d steps", len(task_plan.get("tasks", [])))
+        
+        if not task_plan.get("emergency") and not self._is_time_relative(prompt):
+            self._store_cached_plan(self._plan_cache_key(prompt), task_plan)
+            self._store_semantic_plan(prompt, task_plan)
+        
+        return task_plan
+    
+    def clear_cache(self) -> None:
+        """Drop every cached task plan"""
+        with self._plan_cache_lock:
+            self._plan_cache.clear()
+        
+        with self._semantic_lock:
+            self._semantic_entries = {}
+            if self._semantic_index is not None:
+                self._semantic_index.reset()
+            for cache_file in (self.semantic_index_file, self.semantic_plans_file):
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+    
+    def _is_time_relative(self, prompt: str) -> bool:
+        """Check whether a prompt refers to time relative to now (such plans are not cached)"""
+        return not _TIME_RELATIVE_WORDS.isdisjoint(_WORD_RE.findall(prompt.lower()))
+    
+    def _plan_cache_key(self, prompt: str) -> str:
+        """Build the cache key for a prompt under the current model settings"""
+        key_source = f"{self.model}|{self.temperature}|{_canonical_prompt(prompt)}"
+        return hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _get_cached_plan(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a live cached plan, or None on a miss"""
+        if self.plan_cache_size <= 0 or self.plan_cache_ttl <= 0:
+            return None
+        
+        with self._plan_cache_lock:
+            entry = self._plan_cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._plan_cache[key]
+                return None
+            self._plan_cache.move_to_end(key)
+            plan = entry[1]
+        
+        # Callers mutate plans freely, so never hand out the cached object
+        plan = copy.deepcopy(plan)
+        plan["created_at"] = _iso_now()
+        return plan
+    
+    def _store_cached_plan(self, key: str, plan: Dict[str, Any]) -> None:
+        """Cache a copy of a freshly created plan, evicting the least recently used"""
+        if self.plan_cache_size <= 0 or self.plan_cache_ttl <= 0:
+            return
+        
+        entry = (time.monotonic() + self.plan_cache_ttl, copy.deepcopy(plan))
+        with self._plan_cache_lock:
+            self._plan_cache[key] = entry
+            self._plan_cache.move_to_end(key)
+            while len(self._plan_cache) > self.plan_cache_size:
+                self._plan_cache.popitem(last=False)
+    
+    def _initialize_semantic_cache(self) -> bool:
+        """Load the embedding model and persisted index on first use"""
+        if self._semantic_index is not None:
+            return True
+        
+        if not self.use_semantic_cache:
+            return False
+        
+        if not SEMANTIC_CACHE_AVAILABLE:
+            self.logger.warning("Semantic plan cache requested but faiss/sentence-transformers not installed")
+            self.use_semantic_cache = False
+            return False
+        
+        try:
+            self._embedder = SentenceTransformer(self.embedding_model)
+            dimension = self._embedder.get_sentence_embedding_dimension()
+            
+            entries = load_json_file(self.semantic_plans_file) or {}
+            if os.path.exists(self.semantic_index_file) and entries:
+                index = faiss.read_index(self.semantic_index_file)
+            else:
+                index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+                entries = {}
+            
+            self._semantic_entries = {int(entry_id): entry for entry_id, entry in entries.items()}
+            self._next_semantic_id = max(self._semantic_entries, default=-1) + 1
+            self._semantic_index = index
+            self.logger.info("Loaded semantic plan cache with %d prompts", index.ntotal)
+            return True
+            
+        except Exception as e:
+            self.logger.error("Failed to initialize semantic plan cache: %s", e)
+            self._embedder = None
+            self._semantic_index = None
+            self.use_semantic_cache = False
+            return False
+    
+    def _embed_prompt(self, prompt: str) -> "np.ndarray":
+        """Embed a prompt as a normalized float32 row vector"""
+        vector = self._embedder.encode([prompt], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+    
+    def _get_semantic_plan(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the plan cached for a near-identical prompt, if any"""
+        with self._semantic_lock:
+            if not self._initialize_semantic_cache() or self._semantic_index.ntotal == 0:
+                return None
+            
+            scores, ids = self._semantic_index.search(self._embed_prompt(prompt), 1)
+            score, entry_id = float(scores[0][0]), int(ids[0][0])
+            entry = self._semantic_entries.get(entry_id)
+            if entry is None or score < self.semantic_threshold:
+                return None
+            
+            if entry["expires_at"] <= time.time():
+                self._semantic_index.remove_ids(np.asarray([entry_id], dtype="int64"))
+                del self._semantic_entries[entry_id]
+                return None
+            
+            # Same wording with a different count or time must not share a plan
+            if entry["model_key"] != self._semantic_model_key() or \
+               entry["numbers"] != _NUMBER_RE.findall(prompt):
+                return None
+            
+            plan = entry["plan"]
+        
+        plan = copy.deepcopy(plan)
+        plan["created_at"] = _iso_now()
+        return plan
+    
+    def _store_semantic_plan(self, prompt: str, plan: Dict[str, Any]) -> None:
+        """Index a freshly created plan under its prompt embedding"""
+        with self._semantic_lock:
+            if not self._initialize_semantic_cache():
+                return
+            
+            try:
+                entry_id = self._next_semantic_id
+                self._next_semantic_id += 1
+                self._semantic_index.add_with_ids(self._embed_prompt(prompt), np.asarray([entry_id], dtype="int64"))
+                self._semantic_entries[entry_id] = {
+                    "prompt": prompt,
+                    "model_key": self._semantic_model_key(),
+                    "numbers": _NUMBER_RE.findall(prompt),
+                    "expires_at": time.time() + self.plan_cache_ttl,
+                    "plan": copy.deepcopy(plan)
+                }
+                
+                # Ids grow monotonically, so the smallest ones are the oldest entries
+                overflow = len(self._semantic_entries) - self.plan_cache_size
+                if overflow > 0:
+                    oldest = sorted(self._semantic_entries)[:overflow]
+                    self._semantic_index.remove_ids(np.asarray(oldest, dtype="int64"))
+                    for old_id in oldest:
+                        del self._semantic_entries[old_id]
+                
+                self._save_semantic_cache()
+                
+            except Exception as e:
+                self.logger.error("Failed to update semantic plan cache: %s", e)
+    
+    def _semantic_model_key(self) -> str:
+        """Model settings a cached plan was produced under"""
+        return f"{self.model}|{self.temperature}"
+    
+    def _save_semantic_cache(self) -> None:
+        """Persist the semantic index and its plans for other processes"""
+        try:
+            os.makedirs(os.path.dirname(self.semantic_index_file), exist_ok=True)
+            faiss.write_index(self._semantic_index, self.semantic_index_file)
+            save_json_file(self._semantic_entries, self.semantic_plans_file)
+        except Exception as e:
+            self.logger.error("Failed to save semantic plan cache: %s", e)
+    
+    def _resolve_github_defaults(self) -> Tuple[str, str]:
+        """Return the default GitHub owner and "owner/repo", preferring environment over config"""
+        github_config = self.config.get("github", {})
+        candidates = [
+            (os.getenv("GITHUB_DEFAULT_OWNER"), os.getenv("GITHUB_DEFAULT_REPO")),
+            (github_config.get("default_owner", ""), github_config.get("default_repo", ""))
+        ]
+        
+        # "your-username" is the placeholder shipped in the example config
+        valid = [(owner, repo) for owner, repo in candidates if owner and owner != "your-username"]
+        owner = valid[0][0] if valid else ""
+        repository = next((f"{owner}/{repo}" for owner, repo in valid if repo), "")
+        
+        return owner, repository
+    
+    def _get_planning_system_prompt(self) -> str:
+        """Get the system prompt for task planning"""
+        return _PLANNING_SYSTEM_PROMPT
+    
+    def _format_user_prompt(self, prompt: str) -> str:
+        """Format the user prompt with additional context"""
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Extract and normalize time from prompt for better planning
+        extracted_time = self._extract_time_from_prompt(prompt)
+        time_context = f"\n- Extracted time: {extracted_time}" if extracted_time else ""
+        
+        # Only the small dynamic tail is formatted per call; the static
+        # instructions stay first as part of the provider-cached prefix
+        return f"""{_USER_PROMPT_STATIC}
+
+Context:
+- Current time: {current_time}{time_context}
+- User request: "{prompt}\""""
     
     def _parse_plan_response(self, plan_text: str) -> Dict[str, Any]:
         """Parse the LLM response into a structured plan"""
         try:
-            # Try to extract JSON from the response
             plan_text = plan_text.strip()
             
-            # Find JSON block if wrapped in markdown
-            if "```json" in plan_text:
-                start = plan_text.find("```json") + 7
-                end = plan_text.find("```", start)
-                plan_text = plan_text[start:end].strip()
-            elif "```" in plan_text:
-                start = plan_text.find("```") + 3
-                end = plan_text.find("```", start)
-                plan_text = plan_text[start:end].strip()
-            
-            # Parse JSON
-            task_plan = json.loads(plan_text)
+            # JSON mode responses parse directly; markdown-wrapped ones need unwrapping
+            try:
+                task_plan = _loads_json(plan_text)
+            except json.JSONDecodeError:
+                fence = _FENCE_RE.search(plan_text)
+                if fence is None:
+                    raise
+                
+                plan_text = fence.group(1).strip()
+                task_plan = _loads_json(plan_text)
             
             # Validate and enhance the plan
             task_plan = self._validate_and_enhance_plan(task_plan)
@@ -348,49 +1167,42 @@ Create the most efficient plan possible."""
             return task_plan
             
         except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse plan JSON: {e}")
-            self.logger.debug(f"Raw response: {plan_text}")
+            self.logger.error("Failed to parse plan JSON: %s", e)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Raw response: %s", plan_text)
             return self._create_emergency_plan()
         except Exception as e:
-            self.logger.error(f"Error processing plan: {e}")
+            self.logger.error("Error processing plan: %s", e)
             return self._create_emergency_plan()
     
     def _validate_and_enhance_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and enhance the task plan"""
         
         # Ensure required fields exist
-        if "tasks" not in plan:
-            plan["tasks"] = []
-        
-        if "intent" not in plan:
-            plan["intent"] = "Execute user request"
+        tasks = plan.setdefault("tasks", [])
+        plan.setdefault("intent", "Execute user request")
+        plan.setdefault("schedule", "once")
         
-        if "schedule" not in plan:
-            plan["schedule"] = "once"
-        
-        # Validate and enhance tasks
-        enhanced_tasks = []
-        for i, task in enumerate(plan["tasks"]):
-            enhanced_task = self._enhance_task(task, i)
-            enhanced_tasks.append(enhanced_task)
-        
-        plan["tasks"] = enhanced_tasks
-        
-        # Add metadata
-        plan["created_at"] = datetime.now().isoformat()
-        plan["total_tasks"] = len(plan["tasks"])
+        # Validate and enhance tasks in place, noting whether an email task exists
+        has_email_task = False
+        for i, task in enumerate(tasks):
+            tasks[i] = self._enhance_task(task, i)
+            has_email_task = has_email_task or tasks[i]["type"] == "email"
         
         # Ensure there's an email task at the end
-        if not any(task.get("type") == "email" for task in plan["tasks"]):
-            plan["tasks"].append({
-                "id": f"email_final",
+        if not has_email_task:
+            tasks.append({
+                "id": "email_final",
                 "type": "email",
                 "description": "Send results via email",
                 "parameters": {},
-                "dependencies": [task["id"] for task in plan["tasks"][-2:]] if plan["tasks"] else [],
+                "dependencies": [task["id"] for task in tasks[-2:]],
                 "priority": 1
             })
-            plan["total_tasks"] += 1
+        
+        # Add metadata
+        plan["created_at"] = _iso_now()
+        plan["total_tasks"] = len(tasks)
         
         return plan
     
@@ -398,37 +1210,18 @@ Create the most efficient plan possible."""
         """Enhance individual task with defaults and validation"""
         
         # Ensure required fields
-        if "id" not in task:
-            task["id"] = f"task_{index}"
-        
-        if "type" not in task:
-            task["type"] = "email"
-        
+        task.setdefault("id", f"task_{index}")
+        task_type = task.setdefault("type", "email")
         if "description" not in task:
-            task["description"] = f"Execute {task['type']} task"
-        
-        if "parameters" not in task:
-            task["parameters"] = {}
-        
-        if "dependencies" not in task:
-            task["dependencies"] = []
-        
-        if "priority" not in task:
-            task["priority"] = 2
+            task["description"] = f"Execute {task_type} task"
+        task.setdefault("parameters", {})
+        task.setdefault("dependencies", [])
+        task.setdefault("priority", 2)
         
         # Add type-specific enhancements
-        if task["type"] == "gmail":
-            self._enhance_gmail_task(task)
-        elif task["type"] == "github":
-            self._enhance_github_task(task)
-        elif task["type"] == "dsa":
-            self._enhance_dsa_task(task)
-        elif task["type"] == "leetcode":
-            self._enhance_leetcode_task(task)
-        elif task["type"] == "email":
-            self._enhance_email_task(task)
-        elif task["type"] == "calendar":
-            self._enhance_calendar_task(task)
+        enhancer = self._ENHANCERS.get(task_type)
+        if enhancer is not None:
+            enhancer(self, task)
         
         return task
     
@@ -456,17 +1249,10 @@ Create the most efficient plan possible."""
         if operation == "get_user_repos":
             # Make sure username is present
             if "username" not in params:
-                # Try to get from environment or config
-                env_owner = os.getenv("GITHUB_DEFAULT_OWNER")
-                if env_owner and env_owner != "your-username":
-                    params["username"] = env_owner
-                    self.logger.info(f"Added username '{env_owner}' for get_user_repos operation")
-                else:
-                    # Try config
-                    github_config = self.config.get("github", {})
-                    default_owner = github_config.get("default_owner", "")
-                    if default_owner and default_owner != "your-username":
-                        params["username"] = default_owner
+                # Default owner from environment or config
+                if self._github_default_owner:
+                    params["username"] = self._github_default_owner
+                    self.logger.info("Added username '%s' for get_user_repos operation", self._github_default_owner)
             
             # CRITICAL: Remove "repository" if it exists - get_user_repos ONLY needs username
             if "repository" in params:
@@ -486,28 +1272,15 @@ Create the most efficient plan possible."""
         if "username" in params and "repository" not in params:
             username = params.pop("username")  # Remove username
             params["repository"] = f"{username}/*"  # Will trigger auto-detect for this user
-            self.logger.info(f"Converted username '{username}' to repository pattern for auto-detection")
+            self.logger.info("Converted username '%s' to repository pattern for auto-detection", username)
         
         # Add default repository if not specified
         if "repository" not in params:
-                # Try environment variables first
-                env_owner = os.getenv("GITHUB_DEFAULT_OWNER")
-                env_repo = os.getenv("GITHUB_DEFAULT_REPO")
-                
-                if env_owner and env_repo and env_owner != "your-username":
-                    params["repository"] = f"{env_owner}/{env_repo}"
-                else:
-                    # Try config as fallback
-                    github_config = self.config.get("github", {})
-                    default_owner = github_config.get("default_owner", "")
-                    default_repo = github_config.get("default_repo", "")
-                    
-                    if default_owner and default_repo and default_owner != "your-username":
-                        params["repository"] = f"{default_owner}/{default_repo}"
-                    else:
-                        # Use empty string to trigger auto-detection in GitHub agent
-                        params["repository"] = ""
-                        self.logger.info("No repository specified - will auto-detect from authenticated user")
+                # Default repository from environment or config
+                params["repository"] = self._github_default_repository
+                if not self._github_default_repository:
+                    # Empty string triggers auto-detection in GitHub agent
+                    self.logger.info("No repository specified - will auto-detect from authenticated user")
         
         # Set default operation if not specified
         if "operation" not in params:
@@ -585,23 +1358,17 @@ Create the most efficient plan possible."""
         params = task["parameters"]
 
         # Default timezone from config or environment
-        tz = os.getenv("TIMEZONE") or self.config.get("timezone") or "Asia/Kolkata"
-        params.setdefault("timeZone", tz)
+        params.setdefault("timeZone", self._timezone)
 
         # Check if this is a LIST operation (not CREATE)
         operation = params.get("operation", "").lower()
-        is_list_operation = operation in ["list", "fetch", "get", "show", "view"]
+        is_list_operation = operation in _CALENDAR_LIST_OPERATIONS
         
         # For LIST operations, only keep operation and time_range parameters
         if is_list_operation:
             # Remove CREATE-specific parameters that shouldn't be in LIST operations
-            params.pop("summary", None)
-            params.pop("start_time", None)
-            params.pop("end_time", None)
-            params.pop("duration_minutes", None)
-            params.pop("reminders", None)
-            params.pop("attendees", None)
-            params.pop("description", None)
+            for key in _CALENDAR_CREATE_PARAMS:
+                params.pop(key, None)
             # Keep only: operation, time_range, timeZone
             return
         
@@ -623,13 +1390,10 @@ Create the most efficient plan possible."""
                 duration = 60
             try:
                 # Try parsing naive ISO-like strings
-                from datetime import datetime, timedelta
                 if isinstance(start, str) and len(start) >= 10:
-                    # If date-only or date+time
-                    fmt = "%Y-%m-%dT%H:%M:%S" if "T" in start else "%Y-%m-%d %H:%M:%S"
-                    dt = datetime.strptime(start, fmt)
-                    dt_end = dt + timedelta(minutes=duration)
-                    params["end_time"] = dt_end.strftime(fmt)
+                    # Date and time separated by "T" or a space; the end time keeps the same separator
+                    dt_end = _parse_iso_naive(start) + timedelta(minutes=duration)
+                    params["end_time"] = dt_end.isoformat(sep=start[10], timespec="seconds")
                 else:
                     # Leave as-is; calendar agent will infer end time
                     params["end_time"] = params.get("end_time")
@@ -645,49 +1409,35 @@ Create the most efficient plan possible."""
         if "attendees" not in params:
             params["attendees"] = []
     
+    # Type-specific enhancers, looked up once per task in _enhance_task
+    _ENHANCERS: ClassVar[Dict[str, Callable[["PlannerAgent", Dict[str, Any]], None]]] = {
+        "gmail": _enhance_gmail_task,
+        "github": _enhance_github_task,
+        "dsa": _enhance_dsa_task,
+        "leetcode": _enhance_leetcode_task,
+        "email": _enhance_email_task,
+        "calendar": _enhance_calendar_task
+    }
+    
     def _extract_time_from_prompt(self, text: str) -> Optional[str]:
         """
         Extract time from text in various formats
         Supports: 11:47pm, 11:47 PM, 23:47, 9AM, 2:30pm, etc.
         """
-        import re
-        
-        text_lower = text.lower()
+        text_lower = text if text.islower() else text.lower()
         
         # Pattern 1: HH:MM am/pm or HH:MMam/pm
-        pattern1 = r'(\d{1,2}):(\d{2})\s*(am|pm)'
-        match = re.search(pattern1, text_lower)
+        match = _TIME_HHMM_AMPM_RE.search(text_lower)
         if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            ampm = match.group(3)
-            
-            # Convert to 24-hour format
-            if ampm == 'pm' and hour != 12:
-                hour += 12
-            elif ampm == 'am' and hour == 12:
-                hour = 0
-            
-            return f"{hour:02d}:{minute:02d}"
+            return _ampm_to_24(int(match.group(1)), int(match.group(2)), match.group(3))
         
         # Pattern 2: H am/pm or Ham/pm (e.g., "9am", "2PM")
-        pattern2 = r'(\d{1,2})\s*(am|pm)'
-        match = re.search(pattern2, text_lower)
+        match = _TIME_H_AMPM_RE.search(text_lower)
         if match:
-            hour = int(match.group(1))
-            ampm = match.group(2)
-            
-            # Convert to 24-hour format
-            if ampm == 'pm' and hour != 12:
-                hour += 12
-            elif ampm == 'am' and hour == 12:
-                hour = 0
-            
-            return f"{hour:02d}:00"
+            return _ampm_to_24(int(match.group(1)), 0, match.group(2))
         
         # Pattern 3: 24-hour format HH:MM
-        pattern3 = r'(\d{1,2}):(\d{2})(?!\s*(am|pm))'
-        match = re.search(pattern3, text_lower)
+        match = _TIME_24H_RE.search(text_lower)
         if match:
             hour = int(match.group(1))
             minute = int(match.group(2))
@@ -702,49 +1452,16 @@ Create the most efficient plan possible."""
         
         self.logger.warning("Creating fallback plan due to planning failure")
         
-        # Determine likely task type from prompt keywords
+        # Determine likely task type from prompt keywords (one tokenizing pass)
         prompt_lower = prompt.lower()
+        tokens = set(_WORD_RE.findall(prompt_lower))
         
         tasks = []
-        
-        if any(word in prompt_lower for word in ["email", "gmail", "inbox"]):
-            tasks.append({
-                "id": "gmail_fetch",
-                "type": "gmail",
-                "description": "Fetch recent emails",
-                "parameters": {"max_results": 10, "time_range": "1d"},
-                "dependencies": [],
-                "priority": 1
-            })
-        
-        if any(word in prompt_lower for word in ["github", "commit", "repository"]):
-            tasks.append({
-                "id": "github_fetch",
-                "type": "github", 
-                "description": "Fetch GitHub data",
-                "parameters": {"time_range": "1d"},
-                "dependencies": [],
-                "priority": 1
-            })
-        
-        if any(word in prompt_lower for word in ["leetcode", "leetcode questions", "study plan", "coding problems"]):
-            tasks.append({
-                "id": "leetcode_generate",
-                "type": "leetcode",
-                "description": "Generate LeetCode recommendations",
-                "parameters": {"count": 3, "difficulty_level": "intermediate"},
-                "dependencies": [],
-                "priority": 1
-            })
-        elif any(word in prompt_lower for word in ["dsa", "coding", "algorithm", "question"]):
-            tasks.append({
-                "id": "dsa_generate",
-                "type": "dsa",
-                "description": "Generate coding questions",
-                "parameters": {"count": 2, "difficulty": "medium"},
-                "dependencies": [],
-                "priority": 1
-            })
+        for words, phrases, template, excluded_by in _FALLBACK_RULES:
+            if excluded_by and any(task["id"] == excluded_by for task in tasks):
+                continue
+            if tokens & words or (phrases is not None and phrases.search(prompt_lower)):
+                tasks.append(copy.deepcopy(template))
         
         # Add email task
         tasks.append({
@@ -760,7 +1477,7 @@ Create the most efficient plan possible."""
             "intent": "Execute user request (fallback plan)",
             "schedule": "once",
             "tasks": tasks,
-            "created_at": datetime.now().isoformat(),
+            "created_at": _iso_now(),
             "total_tasks": len(tasks),
             "fallback": True
         }
@@ -778,11 +1495,144 @@ Create the most efficient plan possible."""
                 "dependencies": [],
                 "priority": 1
             }],
-            "created_at": datetime.now().isoformat(),
+            "created_at": _iso_now(),
             "total_tasks": 1,
             "emergency": True
         }
     
+    def _classify(self, prompt: str, prompt_lower: str, tokens: set) -> Optional[str]:
+        """
+        Route a prompt to a direct plan builder, or None when the LLM is needed
+        
+        Only prompts that clearly target a single agent, with no scheduling,
+        timing or filtering details, are routed; everything else is planned
+        by the LLM.
+        """
+        # Pattern 1: List/Show repositories
+        if tokens & _LIST_VERBS and tokens & _REPO_NOUNS:
+            # Check if it's asking for ALL repos (not a specific one)
+            if not (tokens & _REPO_DETAIL_WORDS or _REPO_DETAIL_PHRASES.search(prompt_lower)):
+                return "list_repos"
+        
+        domains = {name for name, words in _DOMAIN_WORDS.items() if tokens & words}
+        if len(domains) != 1 or self._extract_time_from_prompt(prompt_lower) is not None:
+            return None
+        
+        domain = domains.pop()
+        schedule_hits = tokens & _SCHEDULE_WORDS
+        
+        if domain == "calendar":
+            if tokens & _VIEW_VERBS and not tokens & _CALENDAR_CHANGE_VERBS and schedule_hits <= {"tomorrow"}:
+                return "calendar_list"
+            return None
+        
+        if schedule_hits:
+            return None
+        
+        if domain == "gmail" and tokens & _VIEW_VERBS and not tokens & _GMAIL_FILTER_WORDS:
+            return "gmail_fetch"
+        
+        if domain == "leetcode":
+            return "leetcode_only"
+        
+        if domain == "dsa" and tokens & _QUESTION_WORDS and not _AMBIGUOUS_CODING_PHRASES.search(prompt_lower):
+            return "dsa_only"
+        
+        return None
+    
+    def _direct_plan(self, intent: str, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Complete a rule-built plan exactly like an LLM plan"""
+        plan = self._validate_and_enhance_plan({"intent": intent, "schedule": "once", "tasks": tasks})
+        plan["direct_plan"] = True
+        return plan
+    
+    def _prompt_count_and_difficulty(self, prompt: str) -> Tuple[Optional[int], Optional[str]]:
+        """Pull a small item count and a difficulty level out of a prompt"""
+        numbers = [int(number) for number in _NUMBER_RE.findall(prompt)]
+        count = next((number for number in numbers if 1 <= number <= 20), None)
+        
+        tokens = set(_WORD_RE.findall(prompt.lower()))
+        difficulty = next((level for level in _DIFFICULTIES if level in tokens), None)
+        
+        return count, difficulty
+    
+    def _prompt_topics(self, prompt: str) -> List[str]:
+        """Pull the coding topics a prompt names, in the order they are listed"""
+        prompt_lower = prompt.lower()
+        return [topic for topic, pattern in _TOPIC_PATTERNS if pattern.search(prompt_lower)]
+    
+    def _create_gmail_plan(self, prompt: str) -> Dict[str, Any]:
+        """Create a direct plan for fetching emails"""
+        count, _ = self._prompt_count_and_difficulty(prompt)
+        parameters = {"max_results": count} if count else {}
+        
+        return self._direct_plan("Fetch emails", [{
+            "id": "gmail_fetch",
+            "type": "gmail",
+            "description": prompt,
+            "parameters": parameters,
+            "priority": 1
+        }])
+    
+    def _create_leetcode_plan(self, prompt: str) -> Dict[str, Any]:
+        """Create a direct plan for LeetCode problems"""
+        count, difficulty = self._prompt_count_and_difficulty(prompt)
+        parameters = {}
+        if count:
+            parameters["count"] = count
+        if difficulty:
+            parameters["difficulty_level"] = difficulty
+        topics = self._prompt_topics(prompt)
+        if topics:
+            parameters["topics"] = topics
+        
+        return self._direct_plan("Get LeetCode problems", [{
+            "id": "leetcode_generate",
+            "type": "leetcode",
+            "description": prompt,
+            "parameters": parameters,
+            "priority": 1
+        }])
+    
+    def _create_dsa_plan(self, prompt: str) -> Dict[str, Any]:
+        """Create a direct plan for generated coding questions"""
+        count, difficulty = self._prompt_count_and_difficulty(prompt)
+        parameters = {}
+        if count:
+            parameters["count"] = count
+        if difficulty:
+            parameters["difficulty"] = difficulty
+        topics = self._prompt_topics(prompt)
+        if topics:
+            # The DSA agent writes the topic into its question prompt, so use plain words
+            parameters["topics"] = [topic.replace("_", " ") for topic in topics]
+        
+        return self._direct_plan("Generate coding questions", [{
+            "id": "dsa_generate",
+            "type": "dsa",
+            "description": prompt,
+            "parameters": parameters,
+            "priority": 1
+        }])
+    
+    def _create_calendar_list_plan(self, prompt: str) -> Dict[str, Any]:
+        """Create a direct plan for viewing existing calendar events"""
+        tokens = set(_WORD_RE.findall(prompt.lower()))
+        parameters = {"operation": "list"}
+        if "tomorrow" in tokens:
+            parameters["time_range"] = "tomorrow"
+        elif "today" in tokens:
+            parameters["time_range"] = "today"
+        
+        # The calendar agent reads the request wording from the description
+        return self._direct_plan("List calendar events", [{
+            "id": "calendar_list",
+            "type": "calendar",
+            "description": prompt,
+            "parameters": parameters,
+            "priority": 1
+        }])
+    
     def _create_list_repos_plan(self, prompt: str) -> Dict[str, Any]:
         """
         Create a specialized plan for listing GitHub repositories
@@ -791,36 +1641,27 @@ Create the most efficient plan possible."""
         # Extract username if mentioned, otherwise use default
         username = None
         
-        # Try to extract username from prompt
-        import re
+        # Try to extract username from prompt: highest-priority pattern, leftmost match
+        username_match = None
+        for match in _USERNAME_RE.finditer(prompt.lower()):
+            if username_match is None or match.lastindex < username_match.lastindex:
+                username_match = match
+                if match.lastindex == 1:
+                    break
         
-        # Try multiple patterns to extract username
-        patterns = [
-            r'(?:with\s+)?username\s+(\S+)',  # "with username sam-ry" or "username sam-ry"
-            r'for\s+(?:user\s+)?(\S+)',       # "for sam-ry" or "for user sam-ry"
-            r'of\s+(?:user\s+)?(\S+)',        # "of sam-ry" or "of user sam-ry"
-            r'user\s+(\S+)',                   # "user sam-ry"
-        ]
-        
-        for pattern in patterns:
-            username_match = re.search(pattern, prompt.lower())
-            if username_match:
-                username = username_match.group(1)
-                self.logger.info(f"✓ Extracted username from prompt: '{username}'")
-                break
+        if username_match:
+            username = username_match.group(username_match.lastindex)
+            self.logger.info("✓ Extracted username from prompt: '%s'", username)
         
-        # If not found, try environment or config
+        # If not found, use the owner from environment or config
         if not username:
-            username = os.getenv("GITHUB_DEFAULT_OWNER")
-            if not username or username == "your-username":
-                github_config = self.config.get("github", {})
-                username = github_config.get("default_owner", "")
+            username = self._github_default_owner
         
         # Fallback to generic if still not found
-        if not username or username == "your-username":
+        if not username:
             username = "user"  # GitHub agent will use authenticated user
         
-        self.logger.info(f"📋 Creating list repos plan for username: {username}")
+        self.logger.info("📋 Creating list repos plan for username: %s", username)
         
         return {
             "intent": "List all GitHub repositories",
@@ -852,7 +1693,16 @@ Create the most efficient plan possible."""
                 }
             ],
             "estimated_duration": "1 minute",
-            "created_at": datetime.now().isoformat(),
+            "created_at": _iso_now(),
             "total_tasks": 2,
             "direct_plan": True
         }
+    
+    # Direct plan builders for prompts routed by _classify
+    _DIRECT_PLAN_BUILDERS: ClassVar[Dict[str, Callable[["PlannerAgent", str], Dict[str, Any]]]] = {
+        "list_repos": _create_list_repos_plan,
+        "gmail_fetch": _create_gmail_plan,
+        "leetcode_only": _create_leetcode_plan,
+        "dsa_only": _create_dsa_plan,
+        "calendar_list": _create_calendar_list_plan
+    }
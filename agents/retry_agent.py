@@ -2,11 +2,99 @@
 Retry Agent: Handles task failures and retry logic
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
+import random
+import re
 import time
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Distinct error texts whose pattern matches are remembered per agent
+ERROR_MATCH_CACHE_SIZE = 256
+
+# HTTP status code in error text, e.g. "HTTP 503", "HTTP/1.1 502", "status: 429" or "status_code=401".
+# Bare numbers ("after 500 ms") are not status codes
+_STATUS_RE = re.compile(r"\b(?:http(?:/\d(?:\.\d)?)?|status(?:[ _]code)?|code)[\s:=]*([45]\d{2})\b", re.IGNORECASE)
+
+# Server hint for when to come back, e.g. "Retry-After: 30" (seconds)
+_RETRY_AFTER_RE = re.compile(r"retry[-_ ]?after[:\s=]+(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# Status codes that settle a retry decision on their own; anything else falls back to pattern matching
+NON_RETRYABLE_STATUS_CODES = frozenset({400, 401, 403, 404})
+RATE_LIMIT_STATUS_CODE = 429
+
+# Backoff strategy per error type; other types use exponential backoff
+ERROR_TYPE_STRATEGIES = {
+    "rate_limit": "exponential_backoff",
+    "network": "fixed_delay"
+}
+
+# Backoff schedules in seconds per failure kind: brief blips retry fast, rate limits back off hard.
+# The last entry repeats once the schedule runs out; other failures use the exponential strategy
+BACKOFF_SEQUENCES = {
+    "network": (2, 5, 15, 30, 60),
+    "rate_limit": (10, 30, 60, 120, 300),
+    "server_5xx": (5, 15, 30, 60, 120)
+}
+
+# Failure kind of each retryable pattern; the first kind present in this order wins
+BACKOFF_KIND_PATTERNS = (
+    ("rate_limit", frozenset({"rate limit"})),
+    ("server_5xx", frozenset({"temporary", "unavailable"})),
+    ("network", frozenset({"timeout", "connection", "network"}))
+)
+
+# Recommendations triggered by a keyword in the retry reason, checked in order
+REASON_RECOMMENDATIONS = (
+    ("rate limit", ("Reduce request frequency", "Add longer delays between requests")),
+    ("authentication", ("Check API credentials", "Refresh authentication tokens")),
+    ("network", ("Check internet connection", "Try alternative network path"))
+)
+
+# Recommendations for the type of the failing task
+TASK_RECOMMENDATIONS = {
+    "gmail": ("Verify Gmail API permissions", "Check OAuth token validity"),
+    "github": ("Verify GitHub token permissions", "Check repository access rights"),
+    "dsa": ("Verify OpenAI API key", "Check token usage limits")
+}
+
+# Failure signatures whose retry is already scheduled, least recently used evicted first
+RETRY_CACHE_SIZE = 128
+
+# Retry circuit per task type: opens when most recent attempts failed, for a cooldown
+CIRCUIT_WINDOW_SIZE = 50
+CIRCUIT_MIN_ATTEMPTS = 20
+CIRCUIT_FAILURE_RATE = 0.8
+CIRCUIT_COOLDOWN_SECONDS = 120.0
+
+
+def error_message(error: Any) -> str:
+    """
+    Text of a state["errors"] entry
+    
+    Entries are plain messages, or dicts of the form {"message": str, "retryable": bool}
+    when whoever recorded the failure already knows whether retrying can help.
+    
+    Args:
+        error: One entry of state["errors"]
+        
+    Returns:
+        The error message
+    """
+    if isinstance(error, dict):
+        return str(error.get("message", ""))
+    return str(error)
+
 
 class RetryAgent:
     """Agent for handling task failures and implementing retry strategies"""
@@ -20,6 +108,10 @@ class RetryAgent:
         self.base_delay = config.get("retry", {}).get("base_delay", 1.0)
         self.max_delay = config.get("retry", {}).get("max_delay", 60.0)
         self.backoff_multiplier = config.get("retry", {}).get("backoff_multiplier", 2.0)
+        # Fraction of each backoff delay that is randomized: 1.0 is full jitter, 0.0 is deterministic
+        self.jitter_factor = config.get("retry", {}).get("jitter_factor", 1.0)
+        self._random = random.Random()
+        self.backoff_sequences = {**BACKOFF_SEQUENCES, **config.get("retry", {}).get("backoff_sequences", {})}
         
         # Retry strategies
         self.retry_strategies = {
@@ -28,17 +120,22 @@ class RetryAgent:
             "linear_backoff": self._linear_backoff_delay
         }
         
-        # Error patterns that suggest retrying
+        # Task-specific retry strategies
+        self._type_strategies = {
+            "gmail": self._gmail_retry_strategy,
+            "github": self._github_retry_strategy,
+            "dsa": self._dsa_retry_strategy,
+            "email": self._email_retry_strategy
+        }
+        
+        # Error patterns that suggest retrying (HTTP status codes are parsed separately)
         self.retryable_errors = [
             "timeout",
             "rate limit",
             "connection",
             "temporary",
             "unavailable",
-            "network",
-            "502",
-            "503", 
-            "504"
+            "network"
         ]
         
         # Error patterns that suggest NOT retrying
@@ -48,12 +145,24 @@ class RetryAgent:
             "forbidden",
             "not found",
             "invalid",
-            "malformed",
-            "400",
-            "401",
-            "403",
-            "404"
+            "malformed"
         ]
+        
+        # One automaton finds every error pattern in a single pass over the error text
+        self._error_automaton = self._build_error_automaton() if AHOCORASICK_AVAILABLE else None
+        
+        # handle_retry and should_give_up scan the same errors each round; match them once
+        self._match_error_patterns = functools.lru_cache(maxsize=ERROR_MATCH_CACHE_SIZE)(self._scan_error_patterns)
+        
+        # Scheduled retries: (task_type, error signature) -> (monotonic time the probe is due, probing task key).
+        # Other tasks failing on the same constraint retry once that probe is due instead of backing off separately.
+        # Task keys combine the workflow's execution_id with the task id, so separate runs never share an owner
+        self._retry_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        
+        # Recent attempt outcomes per task type, and when each open retry circuit may be probed again
+        self.circuit_cooldown = config.get("retry", {}).get("circuit_cooldown_seconds", CIRCUIT_COOLDOWN_SECONDS)
+        self._outcome_window: Dict[str, deque] = defaultdict(lambda: deque(maxlen=CIRCUIT_WINDOW_SIZE))
+        self._disabled_until: Dict[str, float] = {}
     
     def handle_retry(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -85,8 +194,32 @@ class RetryAgent:
                     "final_failure": True
                 }
             
+            # Retrying is pointless while this task type keeps failing across the board
+            task = self._current_task(state)
+            task_type = task.get("type", "")
+            now = time.monotonic()
+            disabled_until = self._disabled_until.get(task_type, 0.0)
+            if now < disabled_until:
+                return {
+                    "should_retry": False,
+                    "reason": f"Retry circuit open for '{task_type}' tasks after repeated failures",
+                    "circuit_open": True,
+                    "defer_seconds": disabled_until - now
+                }
+            
+            # Errors recorded with a "retryable" flag need no text analysis
+            explicit_analysis = self._explicit_error_analysis(errors)
+            if explicit_analysis is not None and not explicit_analysis["retryable"]:
+                return {
+                    "should_retry": False,
+                    "reason": f"Errors are non-retryable: {explicit_analysis['reason']}",
+                    "final_failure": True,
+                    "error_analysis": explicit_analysis
+                }
+            
             # Analyze errors to determine if retry is worthwhile
-            retry_analysis = self._analyze_errors_for_retry(errors)
+            all_errors = self._join_errors(errors)
+            retry_analysis = explicit_analysis or self._analyze_errors_for_retry(errors, all_errors)
             
             if not retry_analysis["retryable"]:
                 return {
@@ -95,8 +228,23 @@ class RetryAgent:
                     "error_analysis": retry_analysis
                 }
             
-            # Calculate retry delay
-            delay = self._calculate_retry_delay(retry_count, retry_analysis["error_type"])
+            task_key = f"{state.get('execution_id', '')}:{task.get('id', current_step)}"
+            signature = (task_type, self._error_signature(all_errors, retry_analysis))
+            next_probe_at, probe_task_key = self._retry_cache.get(signature, (0.0, task_key))
+            probe_pending = next_probe_at > now and probe_task_key != task_key
+            
+            if probe_pending:
+                # Another task already probes this constraint; retry no earlier than its probe
+                delay = next_probe_at - now
+                self._retry_cache.move_to_end(signature)
+            else:
+                delay = self._calculate_retry_delay(
+                    retry_count, retry_analysis["error_type"], all_errors, retry_analysis.get("backoff_kind")
+                )
+                self._retry_cache[signature] = (now + delay, task_key)
+                self._retry_cache.move_to_end(signature)
+                if len(self._retry_cache) > RETRY_CACHE_SIZE:
+                    self._retry_cache.popitem(last=False)
             
             # Determine retry strategy
             strategy = self._determine_retry_strategy(state, retry_analysis)
@@ -106,7 +254,12 @@ class RetryAgent:
             return {
                 "should_retry": True,
                 "retry_count": retry_count + 1,
+                # No further retry follows this one, so a failure can be surfaced without waiting
+                "is_last_attempt": retry_count + 1 >= self.max_retries,
                 "delay_seconds": delay,
+                "retry_signature": signature,
+                # Set when this retry waits on another task's probe of the same failure
+                "probe_task_key": probe_task_key if probe_pending else None,
                 "strategy": strategy,
                 "reason": retry_analysis["reason"],
                 "error_analysis": retry_analysis,
@@ -120,7 +273,88 @@ class RetryAgent:
                 "reason": f"Retry analysis error: {str(e)}"
             }
     
-    def _analyze_errors_for_retry(self, errors: List[str]) -> Dict[str, Any]:
+    def record_outcome(self, task_type: str, success: bool) -> None:
+        """
+        Record whether an attempt of a task type succeeded, opening or closing its retry circuit
+        
+        The circuit opens for circuit_cooldown seconds when most of the recent
+        attempts failed. Once the cooldown passes, the next retry acts as a probe:
+        another failure reopens the circuit, a success closes it and starts afresh.
+        
+        Args:
+            task_type: Type of the task that was attempted
+            success: Whether the attempt succeeded
+        """
+        window = self._outcome_window[task_type]
+        
+        if success and task_type in self._disabled_until:
+            # The probe after an outage succeeded; judge the service on fresh outcomes
+            del self._disabled_until[task_type]
+            window.clear()
+        window.append(success)
+        
+        if len(window) >= CIRCUIT_MIN_ATTEMPTS:
+            failure_rate = window.count(False) / len(window)
+            if failure_rate > CIRCUIT_FAILURE_RATE:
+                self._disabled_until[task_type] = time.monotonic() + self.circuit_cooldown
+                self.logger.warning(
+                    f"Disabling retries for '{task_type}' tasks for {self.circuit_cooldown}s "
+                    f"({failure_rate:.0%} of the last {len(window)} attempts failed)"
+                )
+    
+    def mark_resolved(self, signature: Tuple[str, str]) -> None:
+        """
+        Forget a scheduled retry once it has succeeded
+        
+        Tasks deferred on the same failure can then retry immediately.
+        
+        Args:
+            signature: The "retry_signature" returned by handle_retry
+        """
+        self._retry_cache.pop(tuple(signature), None)
+    
+    def _current_task(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Task at the current workflow step, or an empty dict when unknown"""
+        tasks = state.get("task_plan", {}).get("tasks", [])
+        current_step = state.get("current_step", 0)
+        return tasks[current_step] if current_step < len(tasks) else {}
+    
+    def _error_signature(self, all_errors: str, retry_analysis: Dict[str, Any]) -> str:
+        """First matched error pattern, or a short hash of the error text when none matched"""
+        patterns = retry_analysis.get("patterns_matched")
+        if patterns:
+            return patterns[0]
+        return hashlib.blake2b(all_errors.encode("utf-8"), digest_size=8).hexdigest()
+    
+    def _join_errors(self, errors: List[Any]) -> str:
+        """Combine errors into the single lowercased text every pattern check scans"""
+        return " ".join(map(error_message, errors)).lower()
+    
+    def _explicit_error_analysis(self, errors: List[Any]) -> Optional[Dict[str, Any]]:
+        """Retry decision from errors recorded with a "retryable" flag, or None when none carry one"""
+        retryable = None
+        for error in errors:
+            if not isinstance(error, dict) or "retryable" not in error:
+                continue
+            if not error["retryable"]:
+                return {
+                    "retryable": False,
+                    "reason": f"Explicitly non-retryable: {error_message(error)}",
+                    "error_type": "permanent"
+                }
+            if retryable is None:
+                retryable = error
+        
+        if retryable is None:
+            return None
+        
+        return {
+            "retryable": True,
+            "reason": f"Explicitly retryable: {error_message(retryable)}",
+            "error_type": "temporary"
+        }
+    
+    def _analyze_errors_for_retry(self, errors: List[Any], all_errors: Optional[str] = None) -> Dict[str, Any]:
         """Analyze errors to determine if retry is appropriate"""
         
         if not errors:
@@ -130,31 +364,37 @@ class RetryAgent:
                 "error_type": "none"
             }
         
-        # Combine all errors for analysis
-        all_errors = " ".join(errors).lower()
+        # Combine all errors for analysis (handle_retry passes the text it already built)
+        if all_errors is None:
+            all_errors = self._join_errors(errors)
+        
+        # An explicit HTTP status decides before any substring heuristics
+        status_analysis = self._analyze_status_code(all_errors)
+        if status_analysis is not None:
+            return status_analysis
+        
+        non_retryable_matches, retryable_matches = self._match_error_patterns(all_errors)
         
         # Check for non-retryable patterns first
-        for pattern in self.non_retryable_errors:
-            if pattern in all_errors:
-                return {
-                    "retryable": False,
-                    "reason": f"Non-retryable error pattern: {pattern}",
-                    "error_type": "permanent",
-                    "pattern_matched": pattern
-                }
+        if non_retryable_matches:
+            pattern = non_retryable_matches[0]
+            return {
+                "retryable": False,
+                "reason": f"Non-retryable error pattern: {pattern}",
+                "error_type": "permanent",
+                "pattern_matched": pattern
+            }
         
         # Check for retryable patterns
-        retryable_matches = []
-        for pattern in self.retryable_errors:
-            if pattern in all_errors:
-                retryable_matches.append(pattern)
-        
         if retryable_matches:
             return {
                 "retryable": True,
                 "reason": f"Retryable error patterns found: {', '.join(retryable_matches)}",
                 "error_type": "temporary",
-                "patterns_matched": retryable_matches
+                "patterns_matched": list(retryable_matches),
+                "backoff_kind": next(
+                    (kind for kind, patterns in BACKOFF_KIND_PATTERNS if patterns.intersection(retryable_matches)), None
+                )
             }
         
         # If no specific patterns matched, analyze error content
@@ -167,6 +407,63 @@ class RetryAgent:
             "confidence": error_analysis["confidence"]
         }
     
+    def _build_error_automaton(self):
+        """Build an Aho-Corasick automaton over the retryable and non-retryable patterns"""
+        automaton = ahocorasick.Automaton()
+        for priority, pattern in enumerate(self.non_retryable_errors):
+            automaton.add_word(pattern, (False, priority, pattern))
+        for priority, pattern in enumerate(self.retryable_errors):
+            automaton.add_word(pattern, (True, priority, pattern))
+        automaton.make_automaton()
+        return automaton
+    
+    def _scan_error_patterns(self, error_text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Return the (non-retryable, retryable) patterns found in lowercased error text, in list order"""
+        if self._error_automaton is None:
+            return (
+                tuple(pattern for pattern in self.non_retryable_errors if pattern in error_text),
+                tuple(pattern for pattern in self.retryable_errors if pattern in error_text)
+            )
+        
+        hits = sorted({match for _, match in self._error_automaton.iter(error_text)})
+        return (
+            tuple(pattern for retryable, _, pattern in hits if not retryable),
+            tuple(pattern for retryable, _, pattern in hits if retryable)
+        )
+    
+    def _analyze_status_code(self, error_text: str) -> Optional[Dict[str, Any]]:
+        """Retry decision from the first HTTP status code in the error text, if it settles one"""
+        match = _STATUS_RE.search(error_text)
+        if match is None:
+            return None
+        
+        code = int(match.group(1))
+        if code in NON_RETRYABLE_STATUS_CODES:
+            return {
+                "retryable": False,
+                "reason": f"Non-retryable HTTP status: {code}",
+                "error_type": "permanent",
+                "status_code": code
+            }
+        if code == RATE_LIMIT_STATUS_CODE:
+            return {
+                "retryable": True,
+                "reason": f"HTTP {code}: rate limit exceeded",
+                "error_type": "rate_limit",
+                "status_code": code,
+                "backoff_kind": "rate_limit"
+            }
+        if code >= 500:
+            return {
+                "retryable": True,
+                "reason": f"Server error HTTP status: {code}",
+                "error_type": "temporary",
+                "status_code": code,
+                "backoff_kind": "server_5xx"
+            }
+        
+        return None
+    
     def _analyze_error_content(self, error_text: str) -> Dict[str, Any]:
         """Analyze error content for retry decision"""
         
@@ -215,16 +512,22 @@ class RetryAgent:
                 "confidence": 0.2
             }
     
-    def _calculate_retry_delay(self, retry_count: int, error_type: str) -> float:
+    def _calculate_retry_delay(self, retry_count: int, error_type: str, all_errors: str = "",
+                               backoff_kind: Optional[str] = None) -> float:
         """Calculate appropriate delay before retry"""
         
-        strategy = "exponential_backoff"
+        # A server-provided Retry-After wins over our own backoff, within our limits
+        retry_after = _RETRY_AFTER_RE.search(all_errors)
+        if retry_after:
+            return min(max(float(retry_after.group(1)), self.base_delay), self.max_delay)
+        
+        # Known failure kinds follow their own schedule, capped like every other delay
+        sequence = self.backoff_sequences.get(backoff_kind)
+        if sequence:
+            return self._jitter(min(float(sequence[min(retry_count, len(sequence) - 1)]), self.max_delay))
         
         # Adjust strategy based on error type
-        if error_type == "rate_limit":
-            strategy = "exponential_backoff"
-        elif error_type == "network":
-            strategy = "fixed_delay"
+        strategy = ERROR_TYPE_STRATEGIES.get(error_type, "exponential_backoff")
         
         delay_func = self.retry_strategies.get(strategy, self._exponential_backoff_delay)
         return delay_func(retry_count)
@@ -232,7 +535,7 @@ class RetryAgent:
     def _exponential_backoff_delay(self, retry_count: int) -> float:
         """Calculate exponential backoff delay"""
         delay = self.base_delay * (self.backoff_multiplier ** retry_count)
-        return min(delay, self.max_delay)
+        return self._jitter(min(delay, self.max_delay))
     
     def _fixed_delay(self, retry_count: int) -> float:
         """Calculate fixed delay"""
@@ -241,7 +544,11 @@ class RetryAgent:
     def _linear_backoff_delay(self, retry_count: int) -> float:
         """Calculate linear backoff delay"""
         delay = self.base_delay * (retry_count + 1)
-        return min(delay, self.max_delay)
+        return self._jitter(min(delay, self.max_delay))
+    
+    def _jitter(self, delay: float) -> float:
+        """Randomize a delay so tasks failing together do not retry in lockstep"""
+        return delay * (1.0 - self.jitter_factor * self._random.random())
     
     def _determine_retry_strategy(self, state: Dict[str, Any], 
                                 error_analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -253,24 +560,10 @@ class RetryAgent:
             "fallback_options": []
         }
         
-        # Analyze current task and errors
-        current_step = state.get("current_step", 0)
-        task_plan = state.get("task_plan", {})
-        tasks = task_plan.get("tasks", [])
-        
-        if current_step < len(tasks):
-            current_task = tasks[current_step]
-            task_type = current_task.get("type", "")
-            
-            # Task-specific retry strategies
-            if task_type == "gmail":
-                strategy = self._gmail_retry_strategy(error_analysis)
-            elif task_type == "github":
-                strategy = self._github_retry_strategy(error_analysis)
-            elif task_type == "dsa":
-                strategy = self._dsa_retry_strategy(error_analysis)
-            elif task_type == "email":
-                strategy = self._email_retry_strategy(error_analysis)
+        # Task-specific retry strategies for the current task
+        type_strategy = self._type_strategies.get(self._current_task(state).get("type", ""))
+        if type_strategy is not None:
+            strategy = type_strategy(error_analysis)
         
         return strategy
     
@@ -355,36 +648,13 @@ class RetryAgent:
         if error_analysis.get("error_type") == "temporary":
             recommendations.append("Wait for service to recover")
         
-        if "rate limit" in error_analysis.get("reason", "").lower():
-            recommendations.append("Reduce request frequency")
-            recommendations.append("Add longer delays between requests")
-        
-        if "authentication" in error_analysis.get("reason", "").lower():
-            recommendations.append("Check API credentials")
-            recommendations.append("Refresh authentication tokens")
-        
-        if "network" in error_analysis.get("reason", "").lower():
-            recommendations.append("Check internet connection")
-            recommendations.append("Try alternative network path")
+        reason_lower = error_analysis.get("reason", "").lower()
+        for keyword, keyword_recommendations in REASON_RECOMMENDATIONS:
+            if keyword in reason_lower:
+                recommendations.extend(keyword_recommendations)
         
         # Task-specific recommendations
-        current_step = state.get("current_step", 0)
-        task_plan = state.get("task_plan", {})
-        tasks = task_plan.get("tasks", [])
-        
-        if current_step < len(tasks):
-            current_task = tasks[current_step]
-            task_type = current_task.get("type", "")
-            
-            if task_type == "gmail":
-                recommendations.append("Verify Gmail API permissions")
-                recommendations.append("Check OAuth token validity")
-            elif task_type == "github":
-                recommendations.append("Verify GitHub token permissions")
-                recommendations.append("Check repository access rights")
-            elif task_type == "dsa":
-                recommendations.append("Verify OpenAI API key")
-                recommendations.append("Check token usage limits")
+        recommendations.extend(TASK_RECOMMENDATIONS.get(self._current_task(state).get("type", ""), ()))
         
         return recommendations
     
@@ -395,6 +665,13 @@ class RetryAgent:
             self.logger.info(f"Waiting {delay_seconds} seconds before retry...")
             time.sleep(delay_seconds)
     
+    async def aexecute_retry_with_delay(self, delay_seconds: float) -> None:
+        """Execute delay before retry without blocking the event loop"""
+        
+        if delay_seconds > 0:
+            self.logger.info(f"Waiting {delay_seconds} seconds before retry...")
+            await asyncio.sleep(delay_seconds)
+    
     def log_retry_attempt(self, retry_info: Dict[str, Any]) -> None:
         """Log retry attempt details"""
         
@@ -404,8 +681,17 @@ class RetryAgent:
             f"Strategy: {retry_info.get('strategy', {}).get('approach', 'default')}"
         )
     
-    def should_give_up(self, state: Dict[str, Any]) -> bool:
-        """Determine if we should give up on retries"""
+    def should_give_up(self, state: Dict[str, Any], all_errors: Optional[str] = None) -> bool:
+        """
+        Determine if we should give up on retries
+        
+        Args:
+            state: Current workflow state with errors
+            all_errors: Combined error text already built for this state, if any
+            
+        Returns:
+            True when retrying cannot help
+        """
         
         retry_count = state.get("retry_count", 0)
         errors = state.get("errors", [])
@@ -416,9 +702,17 @@ class RetryAgent:
         
         # Give up if we detect permanent errors
         if errors:
-            all_errors = " ".join(errors).lower()
-            for pattern in self.non_retryable_errors:
-                if pattern in all_errors:
-                    return True
+            explicit_analysis = self._explicit_error_analysis(errors)
+            if explicit_analysis is not None:
+                return not explicit_analysis["retryable"]
+            
+            all_errors = all_errors or self._join_errors(errors)
+            status_analysis = self._analyze_status_code(all_errors)
+            if status_analysis is not None:
+                return not status_analysis["retryable"]
+            
+            non_retryable_matches, _ = self._match_error_patterns(all_errors)
+            if non_retryable_matches:
+                return True
         
         return False
@@ -108,9 +108,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global scheduler
+    global runner, scheduler
     if scheduler:
         scheduler.stop()
+    if runner:
+        runner.close()
     logger.info("AutoTasker AI API shutdown complete")
 
 # Health check endpoint
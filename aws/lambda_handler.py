@@ -77,8 +77,11 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
         # Initialize AutoTasker with cloud config
         runner = AutoTaskerRunner(config=config)
         
-        # Execute the workflow
-        result = runner.run_workflow(prompt)
+        # Execute the workflow, writing out every log before the invocation returns
+        try:
+            result = runner.run_workflow(prompt)
+        finally:
+            runner.close()
         
         # Store results in DynamoDB
         store_execution_result(task_id, prompt, result, config)
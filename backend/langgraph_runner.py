@@ -6,8 +6,9 @@ Orchestrates multi-agent workflows based on natural language prompts
 import os
 import sys
 import json
+import uuid
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import argparse
 
@@ -27,12 +28,16 @@ from agents.leetcode_agent import LeetCodeAgent
 from agents.summarizer_agent import SummarizerAgent
 from agents.email_agent import EmailAgent
 from agents.logger_agent import LoggerAgent
-from agents.retry_agent import RetryAgent
+from agents.retry_agent import RetryAgent, error_message
 from agents.memory_agent import MemoryAgent
 from agents.calendar_agent import CalendarAgent
 from backend.utils import load_config, setup_logging
 from backend.performance_monitor import PerformanceMonitor, get_global_monitor
 
+# Task exceptions whose retry outcome is known from their type alone
+_RETRYABLE_EXCEPTIONS = (ConnectionError, TimeoutError)
+_NON_RETRYABLE_EXCEPTIONS = (PermissionError, NotImplementedError)
+
 
 class WorkflowState(TypedDict):
     """State shared across all agents in the workflow"""
@@ -47,6 +52,8 @@ class WorkflowState(TypedDict):
     memory_check: Dict[str, Any]
     summarization_completed: bool
     performance_metrics: Dict[str, Any]  # NEW: Performance tracking
+    execution_id: str  # Identifies this run to the retry agent's shared retry schedule
+    retry_signature: Optional[Tuple[str, str]]  # Failure the pending retry was scheduled for
 
 
 class AutoTaskerRunner:
@@ -78,6 +85,11 @@ class AutoTaskerRunner:
         
         # Build the workflow graph
         self.workflow = self._build_workflow()
+    
+    def close(self) -> None:
+        """Write out pending logs and memory, and release the agents' worker threads and open files"""
+        self.logger_agent.close()
+        self.memory_agent.close()
         
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
@@ -207,6 +219,7 @@ class AutoTaskerRunner:
         try:
             current_task = state["task_plan"]["tasks"][state["current_step"]]
             result = self.gmail_agent.execute_task(current_task)
+            self._record_task_outcome(state, result.get("success", True))
             
             state["execution_results"][f"gmail_{state['current_step']}"] = result
             state["current_step"] += 1
@@ -216,7 +229,8 @@ class AutoTaskerRunner:
             
         except Exception as e:
             self.logger.error(f"Gmail task failed: {e}")
-            state["errors"].append(f"Gmail task error: {str(e)}")
+            self._record_task_outcome(state, False)
+            state["errors"].append(self._task_error("Gmail", e))
             state["retry_count"] = state.get("retry_count", 0) + 1
             self.performance_monitor.end_operation(success=False, error=str(e))
             
@@ -250,6 +264,7 @@ class AutoTaskerRunner:
                 # Skip all the repository normalization below
                 current_task["parameters"] = params
                 result = self.github_agent.execute_task(current_task)
+                self._record_task_outcome(state, result.get("success", True))
                 state["execution_results"][f"github_{state['current_step']}"] = result
                 state["current_step"] += 1
                 self.logger.info(f"GitHub task completed: {result}")
@@ -297,6 +312,7 @@ class AutoTaskerRunner:
             current_task["parameters"] = params
             
             result = self.github_agent.execute_task(current_task)
+            self._record_task_outcome(state, result.get("success", True))
             
             state["execution_results"][f"github_{state['current_step']}"] = result
             state["current_step"] += 1
@@ -306,7 +322,8 @@ class AutoTaskerRunner:
             
         except Exception as e:
             self.logger.error(f"GitHub task failed: {e}")
-            state["errors"].append(f"GitHub task error: {str(e)}")
+            self._record_task_outcome(state, False)
+            state["errors"].append(self._task_error("GitHub", e))
             state["retry_count"] = state.get("retry_count", 0) + 1
             self.performance_monitor.end_operation(success=False, error=str(e))
             
@@ -318,6 +335,7 @@ class AutoTaskerRunner:
         try:
             current_task = state["task_plan"]["tasks"][state["current_step"]]
             result = self.dsa_agent.execute_task(current_task)
+            self._record_task_outcome(state, result.get("success", True))
             
             state["execution_results"][f"dsa_{state['current_step']}"] = result
             state["current_step"] += 1
@@ -327,7 +345,8 @@ class AutoTaskerRunner:
             
         except Exception as e:
             self.logger.error(f"DSA task failed: {e}")
-            state["errors"].append(f"DSA task error: {str(e)}")
+            self._record_task_outcome(state, False)
+            state["errors"].append(self._task_error("DSA", e))
             state["retry_count"] = state.get("retry_count", 0) + 1
             self.performance_monitor.end_operation(success=False, error=str(e))
             
@@ -339,6 +358,7 @@ class AutoTaskerRunner:
         try:
             current_task = state["task_plan"]["tasks"][state["current_step"]]
             result = self.leetcode_agent.execute_task(current_task)
+            self._record_task_outcome(state, result.get("success", True))
             
             state["execution_results"][f"leetcode_{state['current_step']}"] = result
             state["current_step"] += 1
@@ -348,7 +368,8 @@ class AutoTaskerRunner:
             
         except Exception as e:
             self.logger.error(f"LeetCode task failed: {e}")
-            state["errors"].append(f"LeetCode task error: {str(e)}")
+            self._record_task_outcome(state, False)
+            state["errors"].append(self._task_error("LeetCode", e))
             state["retry_count"] = state.get("retry_count", 0) + 1
             self.performance_monitor.end_operation(success=False, error=str(e))
             
@@ -360,6 +381,7 @@ class AutoTaskerRunner:
         try:
             current_task = state["task_plan"]["tasks"][state["current_step"]]
             result = self.calendar_agent.execute_task(current_task)
+            self._record_task_outcome(state, result.get("success", True))
             
             state["execution_results"][f"calendar_{state['current_step']}"] = result
             state["current_step"] += 1
@@ -369,12 +391,35 @@ class AutoTaskerRunner:
             
         except Exception as e:
             self.logger.error(f"Calendar task failed: {e}")
-            state["errors"].append(f"Calendar task error: {str(e)}")
+            self._record_task_outcome(state, False)
+            state["errors"].append(self._task_error("Calendar", e))
             state["retry_count"] = state.get("retry_count", 0) + 1
             self.performance_monitor.end_operation(success=False, error=str(e))
             
         return state
     
+    def _record_task_outcome(self, state: WorkflowState, success: bool) -> None:
+        """Report how the current plan task went to the retry agent's per-task-type circuit"""
+        tasks = state["task_plan"].get("tasks", [])
+        if state["current_step"] < len(tasks):
+            task_type = tasks[state["current_step"]].get("type", "")
+            self.retry_agent.record_outcome(task_type, bool(success))
+            
+            # A successful retry clears its failure so tasks waiting on the same constraint stop deferring
+            signature = state.get("retry_signature")
+            if success and signature and signature[0] == task_type:
+                self.retry_agent.mark_resolved(signature)
+                state["retry_signature"] = None
+    
+    def _task_error(self, label: str, error: Exception) -> Any:
+        """Error entry for a failed task, flagged for the retry agent when the exception type settles it"""
+        message = f"{label} task error: {str(error)}"
+        if isinstance(error, _RETRYABLE_EXCEPTIONS):
+            return {"message": message, "retryable": True}
+        if isinstance(error, _NON_RETRYABLE_EXCEPTIONS):
+            return {"message": message, "retryable": False}
+        return message
+    
     def summarizer_task_node(self, state: WorkflowState) -> WorkflowState:
         """Execute summarization tasks"""
         try:
@@ -450,6 +495,7 @@ class AutoTaskerRunner:
                 # Reset current step to retry the failed task
                 state["current_step"] = max(0, state["current_step"] - 1)
                 state["retry_count"] = state.get("retry_count", 0)
+                state["retry_signature"] = retry_result.get("retry_signature")
             else:
                 self.logger.warning(f"Max retries exceeded or retry not recommended")
                 
@@ -494,7 +540,7 @@ class AutoTaskerRunner:
         if state["errors"]:
             body_parts.append("=== ERRORS ===\n")
             for error in state["errors"]:
-                body_parts.append(f"- {error}\n")
+                body_parts.append(f"- {error_message(error)}\n")
         
         return {
             "subject": subject,
@@ -517,7 +563,9 @@ class AutoTaskerRunner:
             logs=[],
             memory_check={},
             summarization_completed=False,
-            performance_metrics={}
+            performance_metrics={},
+            execution_id=uuid.uuid4().hex,
+            retry_signature=None
         )
         
         self.logger.info(f"Starting workflow for prompt: {prompt}")
@@ -559,7 +607,10 @@ def main():
     
     # Initialize and run
     runner = AutoTaskerRunner(args.config)
-    result = runner.run_workflow(args.prompt)
+    try:
+        result = runner.run_workflow(args.prompt)
+    finally:
+        runner.close()
     
     print(f"Workflow result: {json.dumps(result, indent=2, default=str)}")
 
@@ -6,13 +6,50 @@ supporting both OpenAI and OpenRouter APIs seamlessly.
 """
 
 import os
+import asyncio
 import logging
-from typing import Dict, Any, Optional, Union
-from openai import OpenAI
+import functools
+import weakref
+from typing import AsyncIterator, Dict, Any, Optional, Tuple, Union
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError
 from backend.openrouter_client import OpenRouterClient, create_openrouter_client
 
+try:
+    # DefaultAioHttpClient needs the openai[aiohttp] extra (httpx-aiohttp)
+    from openai import DefaultAioHttpClient
+    import httpx_aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    # HTTP/2 support in httpx needs the h2 package
+    import httpx
+    import h2
+    from openai import DefaultAsyncHttpxClient
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection limits for the HTTP/2 pool of each async client
+HTTP2_MAX_CONNECTIONS = 50
+HTTP2_MAX_KEEPALIVE_CONNECTIONS = 20
+
 logger = logging.getLogger(__name__)
 
+# OpenAI model families that accept response_format={"type": "json_object"}
+JSON_MODE_MODEL_PREFIXES = ("gpt-3.5-turbo", "gpt-4-turbo", "gpt-4o", "gpt-4.1", "o1", "o3", "o4")
+
+# Failures worth retrying with backoff; anything else is reported immediately
+TRANSIENT_LLM_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError)
+
+# Number of distinct client configurations kept alive for sharing
+SHARED_CLIENT_CACHE_SIZE = 8
+
+# Async clients shared per event loop (their connection pools are loop-bound)
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, AsyncOpenAI]]" = \
+    weakref.WeakKeyDictionary()
+
 
 class LLMClientFactory:
     """Factory for creating LLM clients based on configuration"""
@@ -59,6 +96,107 @@ class LLMClientFactory:
         """Create OpenRouter client"""
         return create_openrouter_client(config)
     
+    @staticmethod
+    def create_async_client(config: Dict[str, Any]) -> AsyncOpenAI:
+        """
+        Create an asyncio LLM client based on configuration
+        
+        OpenRouter exposes an OpenAI-compatible API, so both providers are
+        served by AsyncOpenAI with the appropriate base URL and headers.
+        
+        Args:
+            config: Application configuration dictionary
+            
+        Returns:
+            AsyncOpenAI client for the configured provider
+        """
+        provider = config.get("llm", {}).get("provider", "openrouter").lower()
+        
+        if provider == "openai":
+            api_key = (
+                config.get("llm", {}).get("api_key") or 
+                config.get("openai_api_key") or
+                os.getenv("OPENAI_API_KEY")
+            )
+            if not api_key:
+                raise ValueError("OpenAI API key not found in config or environment")
+            
+            return AsyncOpenAI(api_key=api_key, **LLMClientFactory._async_transport_kwargs(config))
+        
+        if provider != "openrouter":
+            logger.warning(f"Unknown provider '{provider}', defaulting to OpenRouter")
+        
+        # Reuse the sync client's key resolution and headers
+        openrouter = create_openrouter_client(config)
+        return AsyncOpenAI(
+            api_key=openrouter.api_key,
+            base_url=openrouter.base_url,
+            default_headers={
+                key: value for key, value in openrouter.headers.items()
+                if key not in ("Authorization", "Content-Type")
+            },
+            **LLMClientFactory._async_transport_kwargs(config)
+        )
+    
+    @staticmethod
+    def _async_transport_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick the HTTP transport for async clients (llm.async_transport)"""
+        transport = config.get("llm", {}).get("async_transport", "http2").lower()
+        
+        if transport == "http2":
+            if HTTP2_AVAILABLE:
+                # Concurrent requests multiplex over a few connections instead of one each
+                return {"http_client": DefaultAsyncHttpxClient(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=HTTP2_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP2_MAX_KEEPALIVE_CONNECTIONS
+                    )
+                )}
+            logger.debug("h2 not installed, using the default HTTP/1.1 transport")
+        
+        elif transport == "aiohttp":
+            if AIOHTTP_AVAILABLE:
+                # aiohttp keeps up with many concurrent requests better than httpx's pool
+                return {"http_client": DefaultAioHttpClient()}
+            logger.debug("openai[aiohttp] not installed, using the default httpx transport")
+        
+        return {}
+    
+    @staticmethod
+    def supports_cache_control(model: Optional[str]) -> bool:
+        """
+        Check whether a model needs explicit cache_control markers for prompt caching
+        
+        Anthropic models (directly or through OpenRouter) only cache prompt
+        prefixes that are marked; OpenAI models cache identical prefixes
+        automatically.
+        
+        Args:
+            model: Model name
+            
+        Returns:
+            True if message blocks should carry cache_control markers
+        """
+        model = (model or "").lower()
+        return model.startswith("anthropic/") or model.startswith("claude")
+    
+    @staticmethod
+    def supports_json_mode(model: Optional[str]) -> bool:
+        """
+        Check whether a model accepts the JSON object response format
+        
+        Args:
+            model: Model name, with or without the "openai/" provider prefix
+            
+        Returns:
+            True if response_format={"type": "json_object"} can be requested
+        """
+        model = (model or "").lower()
+        if model.startswith("openai/"):
+            model = model[len("openai/"):]
+        return model.startswith(JSON_MODE_MODEL_PREFIXES)
+    
     @staticmethod
     def get_model_name(config: Dict[str, Any], agent_type: Optional[str] = None) -> str:
         """
@@ -92,17 +230,88 @@ class LLMClientFactory:
             return model
 
 
+def _client_signature(config: Dict[str, Any]) -> Tuple:
+    """Hashable summary of every setting that affects client construction"""
+    llm_config = config.get("llm", {})
+    return (
+        llm_config.get("provider", "openrouter"),
+        llm_config.get("api_key"),
+        llm_config.get("model"),
+        llm_config.get("async_transport", "http2"),
+        config.get("openai_api_key"),
+        config.get("openrouter_api_key"),
+        os.getenv("OPENAI_API_KEY"),
+        os.getenv("OPENROUTER_API_KEY"),
+    )
+
+
+def _signature_config(signature: Tuple) -> Dict[str, Any]:
+    """Rebuild the minimal configuration a client signature stands for"""
+    provider, api_key, model, async_transport, openai_api_key, openrouter_api_key = signature[:6]
+    return {
+        "llm": {
+            "provider": provider,
+            "api_key": api_key,
+            "model": model,
+            "async_transport": async_transport
+        },
+        "openai_api_key": openai_api_key,
+        "openrouter_api_key": openrouter_api_key
+    }
+
+
+@functools.lru_cache(maxsize=SHARED_CLIENT_CACHE_SIZE)
+def _shared_client(signature: Tuple) -> Union[OpenAI, OpenRouterClient]:
+    """Create (once per signature) the sync client shared by all agents"""
+    return LLMClientFactory.create_client(_signature_config(signature))
+
+
 def create_llm_client(config: Dict[str, Any]) -> Union[OpenAI, OpenRouterClient]:
     """
     Convenience function to create LLM client
     
+    Agents configured with the same provider and credentials share one
+    client, and with it one connection pool.
+    
     Args:
         config: Application configuration
         
     Returns:
         Configured LLM client
     """
-    return LLMClientFactory.create_client(config)
+    return _shared_client(_client_signature(config))
+
+
+def create_async_llm_client(config: Dict[str, Any]) -> AsyncOpenAI:
+    """
+    Convenience function to create an asyncio LLM client
+    
+    Inside a running event loop, agents with the same provider and
+    credentials share one client per loop.
+    
+    Args:
+        config: Application configuration
+        
+    Returns:
+        Configured AsyncOpenAI client
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return LLMClientFactory.create_async_client(config)
+    
+    clients = _ASYNC_CLIENTS.setdefault(loop, {})
+    signature = _client_signature(config)
+    if signature not in clients:
+        clients[signature] = LLMClientFactory.create_async_client(_signature_config(signature))
+    return clients[signature]
+
+
+async def aclose_async_llm_clients() -> None:
+    """Close the shared async clients of the running event loop"""
+    clients = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
 
 
 def get_chat_completion(
@@ -152,3 +361,97 @@ def get_chat_completion(
     except Exception as e:
         logger.error(f"Chat completion failed: {e}")
         raise Exception(f"LLM API error: {e}")
+
+
+async def aget_chat_completion(
+    client: AsyncOpenAI,
+    messages: list,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **kwargs
+) -> str:
+    """
+    Asyncio counterpart of get_chat_completion
+    
+    Args:
+        client: AsyncOpenAI client
+        messages: List of message dictionaries
+        model: Model to use (optional)
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens to generate
+        **kwargs: Additional parameters
+        
+    Returns:
+        Generated text content
+    """
+    try:
+        params = {
+            "messages": messages,
+            "temperature": temperature,
+            **kwargs
+        }
+        
+        if model:
+            params["model"] = model
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+        
+        response = await client.chat.completions.create(**params)
+        return response.choices[0].message.content
+        
+    except TRANSIENT_LLM_ERRORS as e:
+        # Raised unchanged so callers can tell them apart and retry
+        logger.warning(f"Async chat completion hit a transient error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Async chat completion failed: {e}")
+        raise Exception(f"LLM API error: {e}")
+
+
+async def astream_chat_completion(
+    client: AsyncOpenAI,
+    messages: list,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion as text fragments
+    
+    Args:
+        client: AsyncOpenAI client
+        messages: List of message dictionaries
+        model: Model to use (optional)
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens to generate
+        **kwargs: Additional parameters
+        
+    Yields:
+        Content fragments in generation order
+    """
+    params = {
+        "messages": messages,
+        "temperature": temperature,
+        "stream": True,
+        **kwargs
+    }
+    
+    if model:
+        params["model"] = model
+    if max_tokens:
+        params["max_tokens"] = max_tokens
+    
+    try:
+        stream = await client.chat.completions.create(**params)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+                
+    except TRANSIENT_LLM_ERRORS as e:
+        logger.warning(f"Streaming chat completion hit a transient error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Streaming chat completion failed: {e}")
+        raise Exception(f"LLM API error: {e}")
@@ -16,6 +16,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 
 from backend.langgraph_runner import AutoTaskerRunner
+from agents.retry_agent import error_message
 from backend.utils import load_config, create_task_id
 
 # Try to import EventBridge scheduler
@@ -49,6 +50,7 @@ class TaskScheduler:
     def _init_local_scheduler(self):
         """Initialize local APScheduler"""
         self.runner = AutoTaskerRunner(config=self.config)
+        self._runner_closed = False
         
         # Configure job store (Memory store to avoid pickle issues)
         from apscheduler.jobstores.memory import MemoryJobStore
@@ -84,6 +86,10 @@ class TaskScheduler:
         if not self.use_cloud:
             if not self.is_running:
                 try:
+                    # stop() closed the previous runner's logger and memory
+                    if self._runner_closed:
+                        self.runner = AutoTaskerRunner(config=self.config)
+                        self._runner_closed = False
                     self.scheduler.start()
                     self.is_running = True
                     logger.info("Local task scheduler started successfully")
@@ -99,6 +105,9 @@ class TaskScheduler:
             if self.is_running:
                 self.scheduler.shutdown()
                 self.is_running = False
+                # Jobs have finished; write out the runner's buffered logs and memory
+                self.runner.close()
+                self._runner_closed = True
                 logger.info("Local task scheduler stopped")
         else:
             logger.info("Cloud scheduler cannot be stopped (always active)")
@@ -323,7 +332,7 @@ class TaskScheduler:
                 # Workflow completed, check for errors in state
                 errors = result.get('errors', []) if isinstance(result, dict) else []
                 success = len(errors) == 0
-                error_msg = '; '.join(errors) if errors else None
+                error_msg = '; '.join(map(error_message, errors)) if errors else None
             
             # Check if we need to remove the job after successful execution
             if job_id in self._limited_job_data:
@@ -381,7 +390,7 @@ class TaskScheduler:
         # Check for errors in state
         errors = result.get('errors', [])
         if errors:
-            return f"Failed: {'; '.join(errors)}"
+            return f"Failed: {'; '.join(map(error_message, errors))}"
         
         # Extract key information from the result
         execution_results = result.get('execution_results', {})
@@ -71,6 +71,15 @@ def clear_all_logs():
             print(f"   ✓ Cleared: {signatures_file}")
             logs_cleared += 1
         
+        # Remove the SQLite memory store, embedding indexes and debug task plan log
+        for name in ["memory.db", "memory.db-wal", "memory.db-shm", "ann.index", "task_plans.ndjson",
+                     "planner_cache.index", "planner_cache.json"]:
+            store_file = os.path.join(memory_dir, name)
+            if os.path.exists(store_file):
+                os.remove(store_file)
+                print(f"   ✓ Removed: {store_file}")
+                logs_cleared += 1
+        
         # Clear LeetCode history if exists
         leetcode_file = os.path.join(memory_dir, "leetcode_history.json")
         if os.path.exists(leetcode_file):
@@ -140,6 +149,11 @@ def clear_all_logs():
         else:
             print(f"   ❌ {len(history)} execution records remain")
     
+    if os.path.exists("memory/memory.db"):
+        print("   ❌ Memory database still exists")
+    else:
+        print("   ✅ Memory database cleared")
+    
     if os.path.exists("memory/prompt_signatures.json"):
         with open("memory/prompt_signatures.json", 'r') as f:
             signatures = json.load(f)
@@ -419,6 +419,9 @@ def execute_task(prompt: str, schedule_type: str, priority: str, schedule_info:
         
         # Handle scheduling vs immediate execution
         if schedule_info and schedule_info['type'] != 'once':
+            # The scheduler runs the task with its own runner
+            runner.close()
+            
             # Schedule the task using the global scheduler
             try:
                 # Initialize global scheduler if not exists
@@ -463,6 +466,8 @@ def execute_task(prompt: str, schedule_type: str, priority: str, schedule_info:
             except Exception as e:
                 st.error(f"❌ Workflow execution failed: {str(e)}")
                 return
+            finally:
+                runner.close()
         
         # Validate result
         if not result:
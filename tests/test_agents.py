@@ -3,19 +3,26 @@ Test suite for AutoTasker AI agents
 """
 
 import pytest
+import asyncio
+import random
+import threading
+import json
+import csv
 import sys
 import os
+from datetime import datetime, timedelta
 
 # Add backend to path for testing
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
 
-from agents.planner_agent import PlannerAgent
+from agents.planner_agent import PlannerAgent, _iso_now
 from agents.dsa_agent import DSAAgent
 from agents.summarizer_agent import SummarizerAgent
 from agents.tool_selector import ToolSelector
-from agents.memory_agent import MemoryAgent
+from agents.memory_agent import MemoryAgent, _normalize_prompt, _normalize_prompt_unicode
 from agents.retry_agent import RetryAgent
+from agents.logger_agent import LoggerAgent
 
 
 class TestPlannerAgent:
@@ -45,6 +52,84 @@ class TestPlannerAgent:
         assert len(plan["tasks"]) > 0
         assert plan["fallback"] is True
     
+    def test_fallback_plan_keyword_rules(self, planner_agent):
+        plan = planner_agent._create_fallback_plan("Email me my LeetCode study plan and recent commits")
+        types = [task["type"] for task in plan["tasks"]]
+        assert types == ["gmail", "github", "leetcode", "email"]
+
+        plan = planner_agent._create_fallback_plan("Send me coding problems")
+        assert [task["type"] for task in plan["tasks"]] == ["leetcode", "email"]
+
+        plan = planner_agent._create_fallback_plan("Generate 2 algorithm questions")
+        assert [task["type"] for task in plan["tasks"]] == ["dsa", "email"]
+        plan["tasks"][0]["parameters"]["count"] = 5
+        assert planner_agent._create_fallback_plan("Generate questions")["tasks"][0]["parameters"]["count"] == 2
+    
+    def test_validate_and_enhance_plan_appends_email_task(self, planner_agent):
+        plan = planner_agent._validate_and_enhance_plan({"tasks": [{"type": "gmail"}, {"type": "dsa"}, {"type": "github"}]})
+
+        assert plan["schedule"] == "once"
+        assert plan["total_tasks"] == 4
+        assert plan["tasks"][-1]["id"] == "email_final"
+        assert plan["tasks"][-1]["dependencies"] == ["task_1", "task_2"]
+
+        plan = planner_agent._validate_and_enhance_plan({"tasks": [{"type": "email"}]})
+        assert plan["total_tasks"] == 1
+    
+    def test_list_repos_prompt_is_planned_directly(self, planner_agent):
+        plan = planner_agent.create_task_plan("Show all my repositories")
+        assert plan.get("direct_plan") is True
+        plan = planner_agent.create_task_plan("List repositories for user Sam-Ry")
+        assert plan["tasks"][0]["parameters"]["username"] == "sam-ry"
+        plan = planner_agent.create_task_plan("Show repos of username bob")
+        assert plan["tasks"][0]["parameters"]["username"] == "bob"
+
+        assert planner_agent._plan_without_llm("Show commits in my repository") is None
+        assert planner_agent._plan_without_llm("Get info about the repository") is None
+        assert planner_agent._plan_without_llm("Forget my repos") is None
+    
+    def test_simple_prompts_get_direct_plans(self, planner_agent):
+        plan = planner_agent._plan_without_llm("Send me 3 hard leetcode problems")
+        assert plan["direct_plan"] is True
+        assert plan["tasks"][0]["parameters"]["count"] == 3
+        assert plan["tasks"][0]["parameters"]["difficulty_level"] == "hard"
+        assert plan["tasks"][-1]["type"] == "email"
+
+        params = planner_agent._plan_without_llm("What's on my calendar tomorrow?")["tasks"][0]["parameters"]
+        assert params["operation"] == "list"
+        assert params["time_range"] == "tomorrow"
+
+        assert planner_agent._plan_without_llm("Generate 2 coding questions")["tasks"][0]["type"] == "dsa"
+        assert planner_agent._plan_without_llm("Check my unread emails")["tasks"][0]["type"] == "gmail"
+
+        # Topics named in the prompt reach the task parameters
+        dsa_params = planner_agent._plan_without_llm("Generate 3 graph coding questions")["tasks"][0]["parameters"]
+        assert dsa_params["topics"] == ["graphs"]
+        leetcode_params = planner_agent._plan_without_llm("Give me 2 dynamic programming leetcode problems")["tasks"][0]["parameters"]
+        assert leetcode_params["topics"] == ["dynamic_programming"]
+        assert leetcode_params["count"] == 2
+
+        # Scheduling, timing, filters or several agents still go to the LLM
+        assert planner_agent._plan_without_llm("Send me 3 leetcode problems every day") is None
+        assert planner_agent._plan_without_llm("Generate 2 coding questions at 9am") is None
+        assert planner_agent._plan_without_llm("Check emails from my manager") is None
+        assert planner_agent._plan_without_llm("Summarize my unread emails") is None
+        assert planner_agent._plan_without_llm("Schedule a meeting on my calendar") is None
+    
+    def test_extract_time_from_prompt(self, planner_agent):
+        assert planner_agent._extract_time_from_prompt("Send at 11:47PM") == "23:47"
+        assert planner_agent._extract_time_from_prompt("every day at 9am") == "09:00"
+        assert planner_agent._extract_time_from_prompt("run at 18:05") == "18:05"
+        assert planner_agent._extract_time_from_prompt("at 12:30am") == "00:30"
+        assert planner_agent._extract_time_from_prompt("at 12pm") == "12:00"
+        assert planner_agent._extract_time_from_prompt("no time here") is None
+    
+    def test_iso_now_seconds_precision(self):
+        timestamp = _iso_now()
+
+        assert datetime.fromisoformat(timestamp).microsecond == 0
+        assert abs((datetime.now() - datetime.fromisoformat(timestamp)).total_seconds()) < 2
+    
     def test_enhance_dsa_task(self, planner_agent):
         task = {"type": "dsa", "description": "Generate questions"}
         enhanced = planner_agent._enhance_task(task, 0)
@@ -53,6 +138,336 @@ class TestPlannerAgent:
         assert "count" in enhanced["parameters"]
         assert enhanced["parameters"]["count"] == 2
 
+    def test_enhance_task_dispatches_by_type(self, planner_agent):
+        gmail = planner_agent._enhance_task({"type": "gmail"}, 0)
+        summarize = planner_agent._enhance_task({"type": "summarize"}, 1)
+
+        assert gmail["parameters"]["query"] == "is:unread"
+        assert summarize["parameters"] == {}
+
+    def test_enhance_calendar_task_computes_end_time(self, planner_agent):
+        def end_time(start, **params):
+            task = {"type": "calendar", "parameters": {"start_time": start, **params}}
+            return planner_agent._enhance_task(task, 0)["parameters"]["end_time"]
+
+        assert end_time("2025-03-01T23:30:00") == "2025-03-02T00:30:00"
+        assert end_time("2025-03-01 09:00:00", duration_minutes=45) == "2025-03-01 09:45:00"
+        assert end_time("2025-03-01T09:00:00+05:30") is None
+        assert end_time("tomorrow at noon") is None
+
+    def test_github_defaults_resolved_once(self, config, monkeypatch):
+        monkeypatch.setenv("GITHUB_DEFAULT_OWNER", "your-username")
+        monkeypatch.setenv("GITHUB_DEFAULT_REPO", "ignored")
+        planner = PlannerAgent({**config, "github": {"default_owner": "octocat", "default_repo": "hello"}})
+        monkeypatch.setenv("GITHUB_DEFAULT_OWNER", "someone-else")
+
+        commits = planner._enhance_task({"type": "github", "parameters": {}}, 0)
+        repos = planner._enhance_task({"type": "github", "parameters": {"operation": "get_user_repos"}}, 1)
+
+        assert commits["parameters"]["repository"] == "octocat/hello"
+        assert repos["parameters"]["username"] == "octocat"
+
+    def test_create_task_plan_uses_cache(self, planner_agent, monkeypatch):
+        calls = []
+
+        def fake_completion(**kwargs):
+            calls.append(kwargs)
+            return json.dumps({"intent": "Fetch emails", "tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.get_chat_completion", fake_completion)
+
+        first = planner_agent.create_task_plan("Summarize my unread emails")
+        first["tasks"].clear()
+        second = planner_agent.create_task_plan("Summarize my unread emails")
+
+        assert len(calls) == 1
+        assert second["tasks"][0]["type"] == "gmail"
+
+        planner_agent.create_task_plan("  Summarize my\n unread   emails ")
+        assert len(calls) == 1
+
+        planner_agent.clear_cache()
+        planner_agent.create_task_plan("Summarize my unread emails")
+        assert len(calls) == 2
+
+    def test_cached_plans_are_dated_when_served(self, planner_agent, monkeypatch):
+        calls = []
+
+        def fake_completion(**kwargs):
+            calls.append(kwargs)
+            return json.dumps({"tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.get_chat_completion", fake_completion)
+
+        monkeypatch.setattr("agents.planner_agent._iso_now", lambda: "2025-01-01T09:00:00")
+        planner_agent.create_task_plan("Summarize my unread emails")
+        monkeypatch.setattr("agents.planner_agent._iso_now", lambda: "2025-01-02T09:00:00")
+        assert planner_agent.create_task_plan("Summarize my unread emails")["created_at"] == "2025-01-02T09:00:00"
+        assert len(calls) == 1
+
+        # Prompts relative to the current date are planned afresh every time
+        planner_agent.create_task_plan("Summarize emails I got today")
+        planner_agent.create_task_plan("Summarize emails I got today")
+        assert len(calls) == 3
+
+    def test_semantic_cache_falls_back_without_faiss(self, config, monkeypatch):
+        monkeypatch.setattr("agents.planner_agent.SEMANTIC_CACHE_AVAILABLE", False)
+        monkeypatch.setattr(
+            "agents.planner_agent.get_chat_completion",
+            lambda **kwargs: json.dumps({"tasks": [{"type": "gmail"}]})
+        )
+        config["agents"]["planner"]["semantic_cache"] = True
+        planner = PlannerAgent(config)
+
+        plan = planner.create_task_plan("Summarize my new emails")
+
+        assert plan["tasks"][0]["type"] == "gmail"
+        assert planner.use_semantic_cache is False
+        assert planner._semantic_index is None
+
+    def test_acreate_task_plans_concurrently(self, planner_agent, monkeypatch):
+        async def fake_completion(**kwargs):
+            await asyncio.sleep(0)
+            prompt = kwargs["messages"][1]["content"]
+            task_type = "github" if "commits" in prompt else "gmail"
+            return json.dumps({"tasks": [{"type": task_type}]})
+
+        monkeypatch.setattr("agents.planner_agent.aget_chat_completion", fake_completion)
+
+        async def plan_both():
+            return await asyncio.gather(
+                planner_agent.acreate_task_plan("Summarize my unread emails"),
+                planner_agent.acreate_task_plan("Show recent commits in my project")
+            )
+
+        email_plan, github_plan = asyncio.run(plan_both())
+
+        assert email_plan["tasks"][0]["type"] == "gmail"
+        assert github_plan["tasks"][0]["type"] == "github"
+        assert planner_agent.create_task_plan("Summarize my unread emails")["tasks"][0]["type"] == "gmail"
+
+    def test_acreate_task_plan_coalesces_identical_prompts(self, planner_agent, monkeypatch):
+        calls = []
+
+        async def fake_completion(**kwargs):
+            calls.append(kwargs["messages"][1]["content"])
+            await asyncio.sleep(0.01)
+            return json.dumps({"tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.aget_chat_completion", fake_completion)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+        planner_agent.plan_cache_size = 0
+
+        async def plan_twice():
+            return await asyncio.gather(
+                planner_agent.acreate_task_plan("Summarize my unread emails"),
+                planner_agent.acreate_task_plan("Summarize  my unread emails")
+            )
+
+        first, second = asyncio.run(plan_twice())
+
+        assert len(calls) == 1
+        assert first == second
+        assert first is not second
+        assert planner_agent._inflight_plans == {}
+
+    def test_acreate_task_plans_resumes_from_checkpoint(self, planner_agent, monkeypatch, tmp_path):
+        calls = []
+
+        async def fake_completion(**kwargs):
+            calls.append(kwargs["messages"][1]["content"])
+            return json.dumps({"tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.aget_chat_completion", fake_completion)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+        checkpoint = tmp_path / "plans.jsonl"
+
+        prompts = ["Summarize my emails", "Summarize my inbox", "Summarize my emails"]
+        plans = asyncio.run(planner_agent.acreate_task_plans(prompts, str(checkpoint)))
+
+        assert len(plans) == 3 and len(calls) == 2
+        assert plans[0] is not plans[2]
+        assert len(checkpoint.read_bytes().splitlines()) == 2
+
+        # A torn final line from an interrupted run is dropped before appending
+        with open(checkpoint, "ab") as f:
+            f.write(b'{"hash": "trunc')
+        planner_agent.clear_cache()
+        plans = asyncio.run(planner_agent.acreate_task_plans(prompts + ["Digest my new mail"], str(checkpoint)))
+
+        assert len(calls) == 3
+        assert plans[3]["tasks"][0]["type"] == "gmail"
+        assert len(checkpoint.read_bytes().splitlines()) == 3
+
+    def test_llm_clients_shared_between_agents(self, config):
+        first = PlannerAgent(config)
+        second = PlannerAgent(config)
+        other = PlannerAgent({"llm": {"api_key": "other_key"}, "agents": config["agents"]})
+
+        assert first.client is second.client
+        assert other.client is not first.client
+
+        async def get_async_clients():
+            return first._get_async_client(), second._get_async_client()
+
+        first_async, second_async = asyncio.run(get_async_clients())
+        assert first_async is second_async
+
+    def test_stream_task_plan_yields_tasks_as_they_complete(self, planner_agent, monkeypatch):
+        fragments = ['```json\n{"intent": "x", "tasks": [{"id": "a", ', '"type": "gmail"},', ' {"id": "b", "type": "dsa"}', ']}\n```']
+        sent = []
+
+        async def fake_stream(**kwargs):
+            for fragment in fragments:
+                sent.append(fragment)
+                yield fragment
+
+        monkeypatch.setattr("agents.planner_agent.astream_chat_completion", fake_stream)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+
+        async def collect():
+            seen = []
+            async for task in planner_agent.stream_task_plan("Summarize my unread emails"):
+                seen.append((task["type"], len(sent)))
+            return seen
+
+        seen = asyncio.run(collect())
+
+        assert [task_type for task_type, _ in seen] == ["gmail", "dsa", "email"]
+        # The gmail task arrived before the rest of the response was generated
+        assert seen[0][1] == 2
+        assert planner_agent.create_task_plan("Summarize my unread emails")["total_tasks"] == 3
+
+    def test_stream_task_plan_frees_its_slot_while_caller_works(self, planner_agent, monkeypatch):
+        async def fake_stream(**kwargs):
+            yield '{"intent": "x", "tasks": [{"id": "a", "type": "gmail"},'
+            yield ' {"id": "b", "type": "dsa"}]}'
+
+        monkeypatch.setattr("agents.planner_agent.astream_chat_completion", fake_stream)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+        planner_agent.concurrency_limit = 1
+
+        async def collect():
+            free_slots = []
+            async for task in planner_agent.stream_task_plan("Summarize my unread emails"):
+                free_slots.append(not planner_agent._async_semaphore.locked())
+            return free_slots
+
+        assert asyncio.run(collect()) == [True, True, True]
+
+    def test_stream_task_plan_fails_rather_than_truncating(self, planner_agent, monkeypatch):
+        async def broken_stream(**kwargs):
+            yield '{"tasks": [{"id": "a", "type": "gmail"},'
+            raise ConnectionError("stream dropped")
+
+        monkeypatch.setattr("agents.planner_agent.astream_chat_completion", broken_stream)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+
+        async def collect():
+            seen = []
+            async for task in planner_agent.stream_task_plan("Summarize my unread emails"):
+                seen.append(task["type"])
+            return seen
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(collect())
+        assert planner_agent._get_cached_plan(planner_agent._plan_cache_key("Summarize my unread emails")) is None
+
+    def test_async_client_is_bound_to_event_loop(self, planner_agent, monkeypatch):
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+
+        async def get_client_twice():
+            return planner_agent._get_async_client(), planner_agent._get_async_client()
+
+        first, same = asyncio.run(get_client_twice())
+        second, _ = asyncio.run(get_client_twice())
+
+        assert first is same
+        assert second is not first
+
+    def test_acreate_task_plan_retries_transient_errors(self, planner_agent, monkeypatch):
+        attempts = []
+
+        async def flaky_completion(**kwargs):
+            attempts.append(kwargs)
+            if len(attempts) < 3:
+                raise TimeoutError("rate limited")
+            return json.dumps({"tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.aget_chat_completion", flaky_completion)
+        monkeypatch.setattr("agents.planner_agent.create_async_llm_client", lambda config: object())
+        monkeypatch.setattr("agents.planner_agent.TRANSIENT_LLM_ERRORS", (TimeoutError,))
+        monkeypatch.setattr("agents.planner_agent.TENACITY_AVAILABLE", False)
+        monkeypatch.setattr("agents.planner_agent.RETRY_MIN_WAIT_SECONDS", 0)
+
+        plan = asyncio.run(planner_agent.acreate_task_plan("Summarize my unread emails"))
+
+        assert len(attempts) == 3
+        assert plan["tasks"][0]["type"] == "gmail"
+
+    def test_planning_messages_mark_cacheable_system_prompt(self, config):
+        config["agents"]["planner"]["model"] = "anthropic/claude-3.5-sonnet"
+        messages = PlannerAgent(config)._build_planning_messages("Summarize my emails")
+
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert messages[1]["role"] == "user"
+
+    def test_planning_messages_reuse_base_prefix(self, planner_agent):
+        first = planner_agent._build_planning_messages("Summarize my emails")
+        second = planner_agent._build_planning_messages("Show my calendar")
+
+        assert first[0] is second[0]
+        assert first[0]["content"] == planner_agent._get_planning_system_prompt()
+
+    def test_json_mode_requested_for_supported_models(self, config):
+        config["agents"]["planner"]["model"] = "openai/gpt-4o-mini"
+        assert PlannerAgent(config)._completion_options() == {"response_format": {"type": "json_object"}}
+
+        config["agents"]["planner"]["model"] = "meta-llama/llama-3.3-70b-instruct"
+        assert PlannerAgent(config)._completion_options() == {}
+
+    def test_simple_prompts_use_fast_model(self, config, monkeypatch):
+        calls = []
+
+        def fake_completion(**kwargs):
+            calls.append((kwargs["model"], kwargs["max_tokens"]))
+            return json.dumps({"tasks": [{"type": "gmail"}]})
+
+        monkeypatch.setattr("agents.planner_agent.get_chat_completion", fake_completion)
+        config["agents"]["planner"]["fast_model"] = "gpt-4o-mini"
+        planner = PlannerAgent(config)
+
+        planner.create_task_plan("Summarize my unread emails")
+        planner.create_task_plan("Summarize my unread emails and my latest github commits")
+
+        assert calls == [("gpt-4o-mini", 500), ("gpt-4", 800)]
+
+    def test_parse_plan_response_handles_bare_and_fenced_json(self, planner_agent):
+        bare = planner_agent._parse_plan_response('{"tasks": [{"type": "gmail"}]}')
+        fenced = planner_agent._parse_plan_response('```json\n{"tasks": [{"type": "github"}]}\n```')
+
+        assert bare["tasks"][0]["type"] == "gmail"
+        assert fenced["tasks"][0]["type"] == "github"
+        prose = planner_agent._parse_plan_response('Here is the plan:\n```\n{"tasks": [{"type": "dsa"}]}\n```\nDone.')
+        assert prose["tasks"][0]["type"] == "dsa"
+        assert planner_agent._parse_plan_response("not json").get("emergency") is True
+
+    def test_parse_plan_response_without_orjson(self, planner_agent, monkeypatch):
+        monkeypatch.setattr("agents.planner_agent.ORJSON_AVAILABLE", False)
+
+        plan = planner_agent._parse_plan_response('{"tasks": [{"type": "dsa"}]}')
+
+        assert plan["tasks"][0]["type"] == "dsa"
+        assert planner_agent._parse_plan_response("{broken").get("emergency") is True
+
+    def test_user_prompt_keeps_static_prefix(self, planner_agent):
+        first = planner_agent._format_user_prompt("Send me 2 coding questions at 9am")
+        second = planner_agent._format_user_prompt("Summarize my unread emails")
+
+        assert first.split("Context:")[0] == second.split("Context:")[0]
+        assert first.endswith('- User request: "Send me 2 coding questions at 9am"')
+        assert "- Extracted time: 09:00" in first
+
 
 class TestDSAAgent:
     """Test cases for DSAAgent"""
@@ -170,7 +585,8 @@ class TestMemoryAgent:
         }
     
     @pytest.fixture
-    def memory_agent(self, config):
+    def memory_agent(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
         return MemoryAgent(config)
     
     def test_memory_initialization(self, memory_agent):
@@ -188,10 +604,314 @@ class TestMemoryAgent:
         # Should generate same signature for similar prompts
         assert sig1 == sig2
     
+    def test_prompt_signature_keeps_words_containing_am_pm(self, memory_agent):
+        sig1 = memory_agent._generate_prompt_signature("Email the team at 5pm")
+        sig2 = memory_agent._generate_prompt_signature("Email the te")
+        sig3 = memory_agent._generate_prompt_signature("email   the team")
+        
+        assert sig1 != sig2
+        assert sig1 == sig3
+    
+    def test_ascii_normalization_matches_unicode_path(self):
+        prompts = [
+            "Send me coding questions EVERY DAY at 9:30 PM",
+            "  Each day at 7am,   summarize\tmy inbox ",
+            "check github at 10:00",
+        ]
+        for prompt in prompts:
+            assert _normalize_prompt(prompt) == _normalize_prompt_unicode(prompt)
+        
+        assert _normalize_prompt("Résumé review every day at 9am") == "résumé review daily".encode()
+    
     def test_check_recent_execution_no_match(self, memory_agent):
         result = memory_agent.check_recent_execution("unique new prompt")
         assert result["should_skip"] is False
         assert result["match_type"] == "none"
+    
+    def test_exact_match_survives_reload(self, memory_agent, config):
+        memory_agent.record_execution({"prompt": "Check my GitHub notifications", "execution_id": "exec_1"})
+        
+        result = memory_agent.check_recent_execution("Check my GitHub notifications")
+        assert result["match_type"] == "exact"
+        
+        memory_agent.flush()
+        reloaded = MemoryAgent(config)
+        result = reloaded.check_recent_execution("Check my GitHub notifications")
+        assert result["match_type"] == "exact"
+        assert result["last_execution"]["execution_id"] == "exec_1"
+    
+    def test_legacy_records_backfilled_and_expired(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        now = datetime.now()
+        legacy = [
+            {"timestamp": now.isoformat(), "prompt": "fresh", "prompt_signature": "a"},
+            {"timestamp": (now - timedelta(days=40)).isoformat(), "prompt": "stale", "prompt_signature": "b"}
+        ]
+        os.makedirs("memory")
+        with open(os.path.join("memory", "execution_history.json"), "w") as f:
+            json.dump(legacy, f)
+        
+        memory_agent = MemoryAgent(config)
+        
+        assert [e["prompt"] for e in memory_agent.recent_executions] == ["fresh"]
+        assert memory_agent._db.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 1
+        assert memory_agent.recent_executions[0]["ts_epoch"] == pytest.approx(now.timestamp())
+    
+    def test_legacy_md5_signatures_migrated(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        legacy_signature = "5d41402abc4b2a76b9719d911017c592"
+        os.makedirs("memory")
+        with open(os.path.join("memory", "execution_history.json"), "w") as f:
+            json.dump([{"timestamp": datetime.now().isoformat(), "prompt": "List my repos",
+                        "prompt_signature": legacy_signature}], f)
+        with open(os.path.join("memory", "prompt_signatures.json"), "w") as f:
+            json.dump({legacy_signature: {"count": 3, "success_count": 2}}, f)
+        
+        memory_agent = MemoryAgent(config)
+        signature = memory_agent._generate_prompt_signature("List my repos")
+        
+        assert memory_agent.prompt_signatures == {signature: {"count": 3, "success_count": 2}}
+        assert memory_agent.check_recent_execution("List my repos")["match_type"] == "exact"
+    
+    def test_saves_are_batched_until_flush(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config["memory"]["background_save"] = True
+        config["memory"]["save_delay_seconds"] = 60
+        memory_agent = MemoryAgent(config)
+        memory_agent.record_execution({"prompt": "first"})
+        memory_agent.record_execution({"prompt": "second"})
+        
+        assert memory_agent._dirty.is_set()
+        assert memory_agent._db.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 0
+        memory_agent.flush()
+        
+        rows = memory_agent._db.execute("SELECT prompt FROM executions ORDER BY ts_epoch DESC").fetchall()
+        assert [prompt for (prompt,) in rows] == ["second", "first"]
+        
+        # close() writes the last batch without waiting out the delay and stops the worker
+        memory_agent.record_execution({"prompt": "third"})
+        save_thread = memory_agent._save_thread
+        memory_agent.close()
+        assert not save_thread.is_alive()
+        assert memory_agent._db is None
+        assert [e["prompt"] for e in MemoryAgent(config).recent_executions] == ["third", "second", "first"]
+    
+    def test_synchronous_save(self, memory_agent):
+        
+        memory_agent.record_execution({"prompt": "saved right away"})
+        
+        rows = memory_agent._db.execute("SELECT prompt FROM executions").fetchall()
+        assert rows == [("saved right away",)]
+    
+    def test_store_drops_evicted_and_cleared_records(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config["memory"]["max_records"] = 3
+        memory_agent = MemoryAgent(config)
+        
+        for i in range(5):
+            memory_agent.record_execution({"prompt": f"task {i}"})
+        memory_agent.flush()
+        
+        reloaded = MemoryAgent(config)
+        assert [e["prompt"] for e in reloaded.recent_executions] == ["task 4", "task 3", "task 2"]
+        assert reloaded._db.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 3
+        
+        reloaded.force_cleanup()
+        assert reloaded._db.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 0
+        assert reloaded._db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0] == 0
+    
+    def test_cleanup_handles_records_without_epoch(self, memory_agent):
+        memory_agent.record_execution({"prompt": "recent task"})
+        memory_agent.recent_executions.append({"prompt": "legacy", "timestamp": (datetime.now() - timedelta(days=35)).isoformat()})
+        memory_agent.recent_executions.append({"prompt": "no timestamp"})
+        
+        memory_agent._cleanup_old_memory_data()
+        
+        assert [e["prompt"] for e in memory_agent.recent_executions] == ["recent task"]
+    
+    def test_check_results_cached_until_next_record(self, memory_agent, monkeypatch):
+        first = memory_agent.check_recent_execution("plan my week")
+        
+        def fail(*args):
+            raise AssertionError("cache miss")
+        monkeypatch.setattr(memory_agent, "_check_recent_execution", fail)
+        cached = memory_agent.check_recent_execution("plan my week")
+        assert cached == first
+        
+        # Callers get their own copy, so editing one result leaves later hits intact
+        cached["should_skip"] = "edited"
+        assert memory_agent.check_recent_execution("plan my week") == first
+        
+        monkeypatch.delattr(memory_agent, "_check_recent_execution")
+        memory_agent.record_execution({"prompt": "plan my week"})
+        assert memory_agent.check_recent_execution("plan my week")["match_type"] == "exact"
+    
+    def test_similar_execution_found(self, memory_agent):
+        memory_agent.record_execution({"prompt": "send me two leetcode questions by email"})
+        
+        assert "send me two leetcode questions by email" in memory_agent._prompt_words
+        
+        result = memory_agent.check_recent_execution("send me three leetcode questions by email")
+        assert result["match_type"] == "below_threshold"
+        assert result["similarity"] == pytest.approx(6 / 8)
+    
+    def test_scan_stops_at_first_match_over_threshold(self, memory_agent):
+        memory_agent.record_execution({"prompt": "send daily leetcode questions"})
+        memory_agent.record_execution({"prompt": "send daily leetcode questions by email"})
+        
+        query_words = frozenset("send daily leetcode questions".split())
+        cutoff_epoch = memory_agent._cutoff_epoch()
+        
+        best, similarity = memory_agent._best_match_by_scan(query_words, cutoff_epoch)
+        assert best["prompt"] == "send daily leetcode questions"
+        assert similarity == 1.0
+        
+        first, similarity = memory_agent._best_match_by_scan(query_words, cutoff_epoch, threshold=0.6)
+        assert first["prompt"] == "send daily leetcode questions by email"
+        assert similarity == pytest.approx(4 / 6)
+    
+    def test_word_matrix_matches_scan(self, memory_agent):
+        topics = ["arrays", "graphs", "trees", "heaps", "tries", "stacks", "queues", "strings"]
+        for i in range(80):
+            memory_agent.record_execution({"prompt": f"send {i % 5} {topics[i % 8]} questions by email"})
+        
+        cutoff_epoch = memory_agent._cutoff_epoch()
+        for query in ["send 3 graphs questions by email", "email me trees", "", "unrelated prompt"]:
+            query_words = frozenset(query.lower().split())
+            scan = memory_agent._best_match_by_scan(query_words, cutoff_epoch)
+            vectorized = memory_agent._best_match_by_word_matrix(query_words, cutoff_epoch)
+            
+            assert vectorized[1] == pytest.approx(scan[1])
+            assert vectorized[0] is scan[0]
+    
+    def test_history_bounded_by_max_records(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config["memory"]["max_records"] = 70
+        memory_agent = MemoryAgent(config)
+        
+        for i in range(200):
+            memory_agent.record_execution({"prompt": f"run report {i} for team {i % 7}"})
+        
+        assert len(memory_agent.recent_executions) == 70
+        assert memory_agent.recent_executions[0]["prompt"] == "run report 199 for team 3"
+        assert memory_agent.check_recent_execution("run report 0 for team 0")["match_type"] != "exact"
+        assert len(memory_agent._matrix_records) - memory_agent._matrix_evicted == 70
+        
+        query_words = frozenset("run report 5 for team 5".split())
+        cutoff_epoch = memory_agent._cutoff_epoch()
+        assert memory_agent._best_match_by_word_matrix(query_words, cutoff_epoch)[0] is \
+            memory_agent._best_match_by_scan(query_words, cutoff_epoch)[0]
+    
+    def test_signature_table_evicts_one_off_prompts_first(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config["memory"]["max_signatures"] = 10
+        memory_agent = MemoryAgent(config)
+        
+        repeated = ["daily standup notes", "weekly github digest"]
+        for prompt in repeated:
+            memory_agent.record_execution({"prompt": prompt})
+            memory_agent.record_execution({"prompt": prompt})
+        for i in range(12):
+            memory_agent.record_execution({"prompt": f"one off task {i}"})
+        
+        assert len(memory_agent.prompt_signatures) <= 10
+        for prompt in repeated:
+            signature = memory_agent._generate_prompt_signature(prompt)
+            assert memory_agent.prompt_signatures[signature]["count"] == 2
+    
+    def test_record_keeps_plan_digest_not_full_plan(self, memory_agent, config):
+        plan = {"tasks": [{"type": "dsa", "parameters": {"count": 3}}, {"type": "email"}]}
+        memory_agent.record_execution({"prompt": "send questions", "task_plan": plan})
+        
+        record = memory_agent.recent_executions[0]
+        assert "task_plan" not in record
+        assert record["task_types"] == ["dsa", "email"]
+        assert len(record["task_plan_hash"]) == 32
+        assert not os.path.exists(memory_agent.task_plans_file)
+        
+        config["app"] = {"debug": True}
+        debug_agent = MemoryAgent(config)
+        debug_agent.record_execution({"prompt": "send questions", "task_plan": plan, "execution_id": "exec_9"})
+        
+        with open(debug_agent.task_plans_file) as f:
+            entry = json.loads(f.readline())
+        assert entry["task_plan"] == plan
+        assert entry["task_plan_hash"] == record["task_plan_hash"]
+    
+    def test_execution_patterns(self, memory_agent):
+        memory_agent.record_execution({"prompt": "Send leetcode questions daily",
+                                       "task_plan": {"tasks": [{"type": "dsa"}, {"type": "email"}]}})
+        memory_agent.record_execution({"prompt": "Send github summary", "errors": ["timeout"],
+                                       "task_plan": {"tasks": [{"type": "github"}, {"type": "email"}]}})
+        
+        result = memory_agent.get_execution_patterns()
+        patterns = result["patterns"]
+        
+        assert result["total_executions"] == 2
+        assert patterns["most_common_agents"]["email"] == 2
+        assert patterns["success_patterns"]["success_rate"] == 50
+        assert sum(patterns["time_patterns"]["executions_by_hour"].values()) == 2
+        assert patterns["prompt_patterns"]["total_words"] == 7
+        assert patterns["prompt_patterns"]["most_common_words"][0] == ("send", 2)
+        assert memory_agent._analyze_agent_usage() == patterns["most_common_agents"]
+    
+    def test_extract_agent_types(self, memory_agent):
+        agent_types = memory_agent._extract_agent_types({
+            "task_plan": {"tasks": [{"type": "calendar"}]},
+            "execution_results": {"gmail_email_summary": {}, "github_repos": {}, "dsa_questions": {}, "weather": {}}
+        })
+        
+        assert sorted(agent_types) == ["calendar", "dsa", "github", "gmail"]
+    
+    def test_lsh_falls_back_to_full_scan(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("agents.memory_agent.DATASKETCH_AVAILABLE", False)
+        config["memory"]["use_lsh"] = True
+        
+        memory_agent = MemoryAgent(config)
+        memory_agent.record_execution({"prompt": "summarize my unread emails"})
+        
+        assert memory_agent._lsh is None
+        assert memory_agent.check_recent_execution("summarize my unread emails today")["should_skip"] is True
+    
+    def test_vector_store_falls_back_to_word_similarity(self, config, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("agents.memory_agent.VECTOR_STORE_AVAILABLE", False)
+        config["memory"]["use_vector_store"] = True
+        
+        memory_agent = MemoryAgent(config)
+        memory_agent.record_execution({"prompt": "summarize my unread emails"})
+        
+        assert memory_agent._ann_index is None
+        result = memory_agent.check_recent_execution("summarize my unread emails today")
+        assert result["should_skip"] is True
+
+    def test_embedding_matches_use_their_own_threshold(self, config, tmp_path, monkeypatch):
+        import numpy as np
+        
+        class FakeIndex:
+            ntotal = 1
+            
+            def search(self, vector, k):
+                return np.array([[0.85]]), np.array([[0]])
+        
+        def check(embedding_threshold):
+            config["memory"]["embedding_similarity_threshold"] = embedding_threshold
+            memory_agent = MemoryAgent(config)
+            memory_agent._ann_index = FakeIndex()
+            memory_agent._ann_records = {0: {"prompt": "summarize my unread emails", "ts_epoch": datetime.now().timestamp()}}
+            memory_agent._embed_prompt = lambda prompt: None
+            result = memory_agent.check_recent_execution("what came in overnight?")
+            memory_agent._ann_index = None
+            return result
+        
+        monkeypatch.chdir(tmp_path)
+        
+        # 0.85 clears the Jaccard threshold (0.8) but not the embedding one
+        below = check(0.9)
+        assert below["should_skip"] is False
+        assert below["match_type"] == "below_threshold"
+        assert check(0.8)["should_skip"] is True
 
 
 class TestRetryAgent:
@@ -201,7 +921,7 @@ class TestRetryAgent:
     def config(self):
         return {
             "app": {"max_retries": 3},
-            "retry": {"base_delay": 1.0, "backoff_multiplier": 2.0}
+            "retry": {"base_delay": 1.0, "backoff_multiplier": 2.0, "jitter_factor": 0.0}
         }
     
     @pytest.fixture
@@ -225,6 +945,157 @@ class TestRetryAgent:
         assert analysis["retryable"] is False
         assert analysis["error_type"] == "permanent"
     
+    def test_error_patterns_match_with_and_without_automaton(self, retry_agent):
+        errors = ["Upstream unavailable", "Connection reset; resource Not Found"]
+        with_automaton = retry_agent._analyze_errors_for_retry(errors)
+
+        retry_agent._error_automaton = None
+        retry_agent._match_error_patterns.cache_clear()
+        without_automaton = retry_agent._analyze_errors_for_retry(errors)
+
+        assert with_automaton == without_automaton
+        assert with_automaton["pattern_matched"] == "not found"
+        assert retry_agent._match_error_patterns("network timeout, connection dropped") == ((), ("timeout", "connection", "network"))
+        assert retry_agent.should_give_up({"errors": errors}) is True
+    
+    def test_http_status_code_decides_first(self, retry_agent):
+        server_error = retry_agent._analyze_errors_for_retry(["HTTP 503: invalid upstream response"])
+        rate_limited = retry_agent._analyze_errors_for_retry(["GitHub API returned status 429"])
+        unauthorized = retry_agent._analyze_errors_for_retry(["Request failed with status code 401"])
+        no_status = retry_agent._analyze_errors_for_retry(["Connection refused on port 5040"])
+
+        assert server_error["retryable"] is True
+        assert server_error["status_code"] == 503
+        assert rate_limited["error_type"] == "rate_limit"
+        assert unauthorized["retryable"] is False
+        assert "status_code" not in no_status
+        assert no_status["patterns_matched"] == ["connection"]
+        assert retry_agent.should_give_up({"errors": ["HTTP 503: invalid upstream response"]}) is False
+        assert retry_agent._analyze_errors_for_retry(["Upstream answered HTTP/1.1 502"])["status_code"] == 502
+    
+    def test_bare_numbers_are_not_status_codes(self, retry_agent):
+        analysis = retry_agent._analyze_errors_for_retry(["Authentication failed after 500 ms"])
+
+        assert "status_code" not in analysis
+        assert analysis["retryable"] is False
+        assert retry_agent.should_give_up({"errors": ["Authentication failed after 500 ms"]}) is True
+    
+    def test_retry_after_header_sets_delay(self, retry_agent):
+        limited = retry_agent.handle_retry({"errors": ["HTTP 429 Too Many Requests, Retry-After: 12"]})
+        too_long = retry_agent._calculate_retry_delay(0, "rate_limit", "retry-after: 3600")
+        too_short = retry_agent._calculate_retry_delay(0, "rate_limit", "retry_after=0")
+
+        assert limited["delay_seconds"] == 12.0
+        assert too_long == retry_agent.max_delay
+        assert too_short == retry_agent.base_delay
+    
+    def test_error_pattern_matches_are_cached(self, retry_agent):
+        errors = ["Rate limit exceeded", "Service temporarily unavailable"]
+        retry_agent.handle_retry({"errors": errors, "retry_count": 0})
+        retry_agent.should_give_up({"errors": errors, "retry_count": 0})
+
+        info = retry_agent._match_error_patterns.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
+    def test_last_retry_attempt_is_flagged(self, retry_agent):
+        errors = ["Connection timeout"]
+        first = retry_agent.handle_retry({"errors": errors, "retry_count": 0})
+        last = retry_agent.handle_retry({"errors": errors, "retry_count": 2})
+        exhausted = retry_agent.handle_retry({"errors": errors, "retry_count": 3})
+
+        assert first["is_last_attempt"] is False
+        assert last["is_last_attempt"] is True
+        assert last["delay_seconds"] > 0
+        assert exhausted["should_retry"] is False
+    
+    def test_tasks_failing_on_same_constraint_share_one_probe(self, retry_agent):
+        plan = {"tasks": [{"id": "gh_1", "type": "github"}, {"id": "gh_2", "type": "github"}]}
+        errors = ["GitHub rate limit exceeded"]
+
+        run_a = {"errors": errors, "task_plan": plan, "execution_id": "run_a"}
+
+        probe = retry_agent.handle_retry({**run_a, "current_step": 0})
+        deferred = retry_agent.handle_retry({**run_a, "current_step": 1})
+        other_run = retry_agent.handle_retry({**run_a, "execution_id": "run_b", "current_step": 0})
+        probe_again = retry_agent.handle_retry({**run_a, "current_step": 0, "retry_count": 1})
+
+        assert probe["should_retry"] is True
+        assert probe["retry_signature"] == ("github", "rate limit")
+        assert probe["probe_task_key"] is None
+        # Deferred tasks still retry, just no earlier than the pending probe
+        assert deferred["should_retry"] is True
+        assert deferred["probe_task_key"] == "run_a:gh_1"
+        assert 0 < deferred["delay_seconds"] <= probe["delay_seconds"]
+        # The same task id in another run is a different task
+        assert other_run["probe_task_key"] == "run_a:gh_1"
+        assert probe_again["probe_task_key"] is None
+
+        retry_agent.mark_resolved(probe["retry_signature"])
+        assert retry_agent.handle_retry({**run_a, "current_step": 1})["probe_task_key"] is None
+    
+    def test_async_retry_delay_does_not_block_loop(self, retry_agent):
+        events = []
+
+        async def delay():
+            await retry_agent.aexecute_retry_with_delay(0.05)
+            events.append("retry")
+
+        async def ticker():
+            for _ in range(3):
+                events.append("tick")
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(delay(), ticker())
+
+        asyncio.run(run())
+        assert events == ["tick", "tick", "tick", "retry"]
+    
+    def test_retry_strategy_dispatches_by_task_type(self, retry_agent):
+        analysis = {"reason": "GitHub rate limit exceeded"}
+        plan = {"tasks": [{"type": "github"}, {"type": "summarize"}]}
+
+        github = retry_agent._determine_retry_strategy({"task_plan": plan, "current_step": 0}, analysis)
+        other = retry_agent._determine_retry_strategy({"task_plan": plan, "current_step": 1}, analysis)
+
+        assert github["approach"] == "github_retry"
+        assert "respect_rate_limits" in github["modifications"]
+        assert other["approach"] == "standard_retry"
+    
+    def test_retry_recommendations(self, retry_agent):
+        state = {"task_plan": {"tasks": [{"type": "gmail"}]}, "current_step": 0}
+        analysis = {"reason": "Retryable error patterns found: rate limit, network", "error_type": "temporary"}
+
+        assert retry_agent._get_retry_recommendations(state, analysis) == [
+            "Wait for service to recover",
+            "Reduce request frequency",
+            "Add longer delays between requests",
+            "Check internet connection",
+            "Try alternative network path",
+            "Verify Gmail API permissions",
+            "Check OAuth token validity"
+        ]
+    
+    def test_retry_circuit_opens_on_sustained_failures(self, retry_agent):
+        state = {"errors": ["Connection timeout"], "task_plan": {"tasks": [{"type": "gmail"}]}, "current_step": 0}
+
+        for _ in range(19):
+            retry_agent.record_outcome("gmail", False)
+        assert retry_agent.handle_retry(state)["should_retry"] is True
+
+        retry_agent.record_outcome("gmail", False)
+        opened = retry_agent.handle_retry(state)
+        assert opened["should_retry"] is False
+        assert opened["circuit_open"] is True
+        assert retry_agent.handle_retry({**state, "task_plan": {"tasks": [{"type": "github"}]}})["should_retry"] is True
+
+        # Cooldown over: the next retry probes, and a success closes the circuit
+        retry_agent._disabled_until["gmail"] = 0.0
+        retry_agent.record_outcome("gmail", True)
+        assert "gmail" not in retry_agent._disabled_until
+        assert list(retry_agent._outcome_window["gmail"]) == [True]
+    
     def test_exponential_backoff(self, retry_agent):
         delay1 = retry_agent._exponential_backoff_delay(0)
         delay2 = retry_agent._exponential_backoff_delay(1)
@@ -233,6 +1104,333 @@ class TestRetryAgent:
         assert delay1 == 1.0
         assert delay2 == 2.0
         assert delay3 == 4.0
+    
+    def test_backoff_schedule_depends_on_failure_kind(self, retry_agent):
+        def delays(error):
+            return [retry_agent.handle_retry({"errors": [error], "retry_count": count})["delay_seconds"] for count in range(3)]
+
+        assert delays("Network timeout") == [2.0, 5.0, 15.0]
+        assert delays("API rate limit exceeded") == [10.0, 30.0, 60.0]
+        assert delays("HTTP 502 Bad Gateway") == [5.0, 15.0, 30.0]
+        assert delays("Something odd happened") == [1.0, 2.0, 4.0]
+        assert retry_agent._calculate_retry_delay(9, "temporary", "", "network") == 60.0
+
+    def test_backoff_schedule_capped_by_max_delay(self, config):
+        config["retry"]["max_delay"] = 20.0
+        retry_agent = RetryAgent(config)
+
+        assert [retry_agent._calculate_retry_delay(count, "rate_limit", "", "rate_limit") for count in range(3)] == [10.0, 20.0, 20.0]
+    
+    def test_flagged_errors_skip_text_analysis(self, retry_agent, monkeypatch):
+        def fail_scan(error_text):
+            raise AssertionError("flagged errors should not be scanned")
+
+        monkeypatch.setattr(retry_agent, "_match_error_patterns", fail_scan)
+
+        fatal = retry_agent.handle_retry({"errors": [
+            "Connection timeout", {"message": "Gmail scope revoked", "retryable": False}
+        ]})
+        transient = retry_agent.handle_retry({"errors": [{"message": "Upstream hiccup", "retryable": True}]})
+
+        assert fatal["should_retry"] is False
+        assert fatal["final_failure"] is True
+        assert transient["should_retry"] is True
+        assert transient["error_analysis"]["reason"] == "Explicitly retryable: Upstream hiccup"
+        assert retry_agent.should_give_up({"errors": [{"message": "bad request", "retryable": False}]}) is True
+        assert json.loads(json.dumps(fatal))["final_failure"] is True
+    
+    def test_backoff_jitter(self, config):
+        config["retry"]["jitter_factor"] = 1.0
+        retry_agent = RetryAgent(config)
+        retry_agent._random = random.Random(7)
+
+        delays = [retry_agent._exponential_backoff_delay(2) for _ in range(20)]
+
+        assert all(0.0 < delay <= 4.0 for delay in delays)
+        assert len(set(delays)) == 20
+        assert 0.0 < retry_agent._linear_backoff_delay(1) <= 2.0
+
+
+class TestLoggerAgent:
+    """Test cases for LoggerAgent"""
+    
+    @pytest.fixture
+    def logger_agent(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        return LoggerAgent({"logging": {"use_local": True}})
+    
+    def test_s3_uploads_run_in_background(self, logger_agent):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        uploaded = []
+        
+        class FakeS3Client:
+            def put_object(self, **kwargs):
+                uploaded.append(kwargs["Key"])
+        
+        logger_agent.use_s3 = True
+        logger_agent.s3_client = FakeS3Client()
+        logger_agent.s3_bucket = "test-bucket"
+        logger_agent._s3_executor = ThreadPoolExecutor(max_workers=2)
+        
+        result = logger_agent.log_execution({"prompt": "test", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        
+        assert "s3" in result["results"]["logged_to"]
+        assert len(uploaded) == 1
+        assert uploaded[0].endswith(f"execution_{result['execution_id']}.json")
+    
+    def test_sheets_rows_appended_in_batches(self, logger_agent):
+        from unittest.mock import MagicMock
+        
+        service = MagicMock()
+        append = service.spreadsheets.return_value.values.return_value.append
+        logger_agent.use_sheets = True
+        logger_agent.sheets_service = service
+        logger_agent.sheets_spreadsheet_id = "sheet-id"
+        logger_agent.sheets_worksheet = "Log"
+        logger_agent._sheets_flush_threshold = 3
+        
+        for i in range(4):
+            logger_agent.log_execution({"prompt": f"prompt {i}", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent._wait_for_queued_logs()
+        
+        assert append.call_count == 1
+        assert len(append.call_args.kwargs["body"]["values"]) == 3
+        
+        logger_agent.flush()
+        assert append.call_count == 2
+        assert append.call_args.kwargs["body"]["values"][0][2] == "prompt 3"
+    
+    def test_log_execution_is_queued_for_background_worker(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        logger_agent = LoggerAgent({"logging": {"use_local": True, "background": True}})
+        entry = {"prompt": "queued", "timestamp": "2024-01-01T09:00:00", "errors": []}
+        
+        result = logger_agent.log_execution(entry)
+        entry["errors"].append("added after logging")
+        
+        assert result["success"] is None
+        assert result["results"]["queued"] is True
+        assert result["results"]["logged_to"] == []
+        assert result["results"]["pending"] == ["local"]
+        
+        logger_agent.close()
+        assert not any(thread.name == "logger-agent" and thread.is_alive() for thread in threading.enumerate())
+        assert logger_agent._csv_fh.closed
+        assert logger_agent.get_detailed_log(result["execution_id"])["errors"] == []
+    
+    def test_synchronous_by_default(self, logger_agent):
+        result = logger_agent.log_execution({"prompt": "sync", "timestamp": "2024-01-01T09:00:00"})
+        
+        assert result["success"] is True
+        assert "queued" not in result["results"]
+        assert logger_agent._log_thread is None
+        assert os.path.exists(os.path.join(logger_agent.detailed_logs_dir, f"execution_{result['execution_id']}.json"))
+    
+    def test_buffered_rows_visible_to_history(self, logger_agent):
+        for i in range(3):
+            logger_agent.log_execution({"prompt": f"prompt {i}", "timestamp": f"2024-01-0{i + 1}T09:00:00"})
+        
+        history = logger_agent.get_execution_history(limit=10)
+        
+        assert [h["prompt"] for h in history] == ["prompt 2", "prompt 1", "prompt 0"]
+    
+    def test_csv_quoting_round_trip(self, logger_agent):
+        prompt = 'Email "Bob", then\nsummarize'
+        logger_agent.log_execution({"prompt": prompt, "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        logger_agent._history_cache = None
+        
+        assert logger_agent.get_execution_history()[0]["prompt"] == prompt
+    
+    def test_csv_rows_reach_disk_per_execution(self, logger_agent, tmp_path):
+        def rows_on_disk():
+            with open(logger_agent.execution_log_file, newline='') as fh:
+                return [row["prompt"] for row in csv.DictReader(fh)]
+        
+        logger_agent.log_execution({"prompt": "first", "timestamp": "2024-01-01T09:00:00"})
+        assert rows_on_disk() == ["first"]
+        
+        batched = LoggerAgent({"logging": {"use_local": True, "csv_flush_rows": 2}})
+        batched.log_execution({"prompt": "second", "timestamp": "2024-01-01T10:00:00"})
+        assert rows_on_disk() == ["first"]
+        batched.log_execution({"prompt": "third", "timestamp": "2024-01-01T11:00:00"})
+        assert rows_on_disk() == ["first", "second", "third"]
+        batched.close()
+    
+    def test_unclosed_agents_are_not_kept_alive(self, tmp_path, monkeypatch):
+        import gc
+        import weakref
+        monkeypatch.chdir(tmp_path)
+        
+        agent = LoggerAgent({"logging": {"use_local": True}})
+        agent.log_execution({"prompt": "dropped", "timestamp": "2024-01-01T09:00:00"})
+        agent_ref = weakref.ref(agent)
+        del agent
+        gc.collect()
+        
+        assert agent_ref() is None
+        assert "dropped" in open(os.path.join("data", "logs", "execution_log.csv")).read()
+    
+    def test_history_cache_tracks_new_rows(self, logger_agent):
+        logger_agent.log_execution({"prompt": "first", "timestamp": "2024-01-01T09:00:00"})
+        assert len(logger_agent.get_execution_history()) == 1
+        
+        logger_agent.log_execution({"prompt": "second", "timestamp": "2024-01-02T09:00:00"})
+        history = logger_agent.get_execution_history()
+        
+        assert [h["prompt"] for h in history] == ["second", "first"]
+        assert history[0]["success"] == "True"
+        assert logger_agent._history_cache_key == logger_agent._csv_stat_key()
+    
+    def test_detailed_log_round_trip(self, logger_agent):
+        entry = {"prompt": "résumé", "timestamp": "2024-01-01T09:00:00", "task_plan": {"tasks": [{"id": 1}]}}
+        result = logger_agent.log_execution(entry)
+        
+        detailed = logger_agent.get_detailed_log(result["execution_id"])
+        
+        assert detailed["prompt"] == "résumé"
+        assert detailed["task_plan"] == {"tasks": [{"id": 1}]}
+        assert logger_agent.get_detailed_log("missing") is None
+    
+    @pytest.mark.parametrize("use_zstd", [True, False])
+    def test_rotate_daily_archives_previous_days(self, logger_agent, monkeypatch, use_zstd):
+        import agents.logger_agent as logger_module
+        
+        if use_zstd:
+            pytest.importorskip("zstandard")
+        monkeypatch.setattr(logger_module, "ZSTD_AVAILABLE", use_zstd)
+        
+        old = logger_agent.log_execution({"prompt": "yesterday", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        old_log = os.path.join(logger_agent.detailed_logs_dir, f"execution_{old['execution_id']}.json")
+        yesterday = (datetime.now() - timedelta(days=1)).timestamp()
+        os.utime(old_log, (yesterday, yesterday))
+        new = logger_agent.log_execution({"prompt": "today", "timestamp": "2024-01-02T09:00:00"})
+        
+        rotation = logger_agent.rotate_daily()
+        
+        assert rotation["archived_files"] == 1
+        assert not os.path.exists(old_log)
+        assert logger_agent.get_detailed_log(old["execution_id"])["prompt"] == "yesterday"
+        assert logger_agent.get_detailed_log(new["execution_id"])["prompt"] == "today"
+        
+        # Archives past the retention window are removed by cleanup
+        assert logger_agent.cleanup_old_logs(days_to_keep=0)["cleaned_files"] >= 1
+        assert logger_agent.get_detailed_log(old["execution_id"]) is None
+
+    def test_rotation_runs_at_startup_not_per_log(self, logger_agent, monkeypatch):
+        import agents.logger_agent as logger_module
+        
+        old = logger_agent.log_execution({"prompt": "yesterday", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        old_log = os.path.join(logger_agent.detailed_logs_dir, f"execution_{old['execution_id']}.json")
+        yesterday = (datetime.now() - timedelta(days=1)).timestamp()
+        os.utime(old_log, (yesterday, yesterday))
+
+        logger_agent.log_execution({"prompt": "today", "timestamp": "2024-01-02T09:00:00"})
+        logger_agent.flush()
+        assert os.path.exists(old_log)
+
+        # Later agents in the same process skip the scan; a new process rotates at startup
+        LoggerAgent({"logging": {"use_local": True}})
+        assert os.path.exists(old_log)
+        
+        monkeypatch.setattr(logger_module, "_ROTATED_ON", {})
+        LoggerAgent({"logging": {"use_local": True}})
+        assert not os.path.exists(old_log)
+    
+    def test_archive_writes_never_clobber_or_leave_temp_files(self, logger_agent):
+        from types import SimpleNamespace
+        
+        log_dir = logger_agent.detailed_logs_dir
+        log_path = os.path.join(log_dir, "execution_a.json")
+        with open(log_path, "w") as fh:
+            fh.write("{}")
+        claimed = logger_agent._write_archive("2024-01-01", [SimpleNamespace(path=log_path, name="execution_a.json")])
+        
+        second = logger_agent._write_archive("2024-01-01", [SimpleNamespace(path=log_path, name="execution_a.json")])
+        assert second != claimed
+        assert os.path.getsize(claimed) > 0
+        
+        missing = SimpleNamespace(path=os.path.join(log_dir, "execution_gone.json"), name="execution_gone.json")
+        with pytest.raises(OSError):
+            logger_agent._write_archive("2024-01-02", [missing])
+        assert not [name for name in os.listdir(log_dir) if "2024-01-02" in name]
+
+    def test_cleanup_old_logs(self, logger_agent):
+        result = logger_agent.log_execution({"prompt": "old", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        old_log = os.path.join(logger_agent.detailed_logs_dir, f"execution_{result['execution_id']}.json")
+        os.utime(old_log, (0, 0))
+        logger_agent.log_execution({"prompt": "new", "timestamp": "2024-01-02T09:00:00"})
+        
+        cleanup = logger_agent.cleanup_old_logs(days_to_keep=7)
+        
+        assert cleanup["cleaned_files"] == 1
+        assert not os.path.exists(old_log)
+        assert len(os.listdir(logger_agent.detailed_logs_dir)) == 1
+    
+    def test_export_logs_with_date_filter(self, logger_agent):
+        import json
+        
+        for day in range(1, 4):
+            logger_agent.log_execution({"prompt": f"day {day}", "timestamp": f"2024-01-0{day}T09:00:00"})
+        
+        json_path = logger_agent.export_logs("json", start_date="2024-01-02T00:00:00")
+        with open(json_path, encoding="utf-8") as f:
+            exported = json.load(f)
+        assert [r["prompt"] for r in exported] == ["day 2", "day 3"]
+        
+        csv_path = logger_agent.export_logs("csv", end_date="2024-01-01T23:59:59")
+        with open(csv_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 2
+        assert "day 1" in lines[1]
+        
+        with pytest.raises(ValueError):
+            logger_agent.export_logs("xml")
+
+    def test_export_logs_streams_without_cache(self, logger_agent):
+        import json
+
+        for day in range(1, 4):
+            logger_agent.log_execution({"prompt": f"day {day}", "timestamp": f"2024-01-0{day}T09:00:00"})
+        logger_agent.flush()
+        logger_agent._history_cache = None
+
+        with open(logger_agent.export_logs("json"), encoding="utf-8") as f:
+            assert [r["prompt"] for r in json.load(f)] == ["day 1", "day 2", "day 3"]
+        with open(logger_agent.export_logs("json", end_date="2024-01-02T23:59:59"), encoding="utf-8") as f:
+            assert [r["prompt"] for r in json.load(f)] == ["day 1", "day 2"]
+        assert logger_agent._history_cache is None
+
+    def test_history_tail_read_without_cache(self, logger_agent):
+        for i in range(200):
+            logger_agent.log_execution({"prompt": f"prompt {i},\nline two", "timestamp": "2024-01-01T09:00:00"})
+        logger_agent.flush()
+        logger_agent._history_cache = None
+        
+        history = logger_agent.get_execution_history(limit=5)
+        
+        assert [h["prompt"] for h in history] == [f"prompt {i},\nline two" for i in range(199, 194, -1)]
+        assert logger_agent._history_cache is None
+    
+    def test_statistics(self, logger_agent):
+        logger_agent.log_execution({"prompt": "ok", "timestamp": "2024-01-01T09:00:00",
+                                    "task_plan": {"tasks": [{}, {}]}})
+        logger_agent.log_execution({"prompt": "failed", "timestamp": "2024-01-02T09:00:00",
+                                    "task_plan": {"tasks": [{}]}, "errors": ["boom"]})
+        
+        stats = logger_agent.get_statistics()
+        
+        assert stats["total_executions"] == 2
+        assert stats["successful_executions"] == 1
+        assert stats["success_rate"] == 50
+        assert stats["average_tasks"] == 1.5
+        assert stats["most_recent"]["prompt"] == "failed"
+        assert stats["date_range"]["oldest"] == "2024-01-01T09:00:00"
 
 
 # Integration tests
@@ -265,6 +1463,85 @@ class TestIntegration:
             assert len(agents) > 0
             assert "logger_agent" in agents
 
+    def test_runner_task_outcomes_drive_retry_circuit(self, config):
+        import logging
+        AutoTaskerRunner = pytest.importorskip("backend.langgraph_runner").AutoTaskerRunner
+        from backend.performance_monitor import PerformanceMonitor
+
+        class FlakyGmailAgent:
+            available = False
+
+            def execute_task(self, task):
+                if not self.available:
+                    raise ConnectionError("Gmail API unavailable")
+                return {"success": True, "content": "2 unread"}
+
+        runner = AutoTaskerRunner.__new__(AutoTaskerRunner)
+        runner.logger = logging.getLogger("test-runner")
+        runner.performance_monitor = PerformanceMonitor()
+        runner.retry_agent = RetryAgent(config)
+        runner.gmail_agent = FlakyGmailAgent()
+
+        state = {"task_plan": {"tasks": [{"id": "task_1", "type": "gmail"}]}, "current_step": 0,
+                 "execution_results": {}, "errors": [], "retry_count": 0}
+        for _ in range(20):
+            runner.gmail_task_node(state)
+        state["retry_count"] = 0
+
+        assert runner.retry_agent.handle_retry(state)["circuit_open"] is True
+
+        # Once the cooldown is over, a successful attempt closes the circuit
+        runner.retry_agent._disabled_until["gmail"] = 0.0
+        runner.gmail_agent.available = True
+        runner.gmail_task_node(state)
+
+        assert "gmail" not in runner.retry_agent._disabled_until
+        assert state["current_step"] == 1
+
+    def test_runner_flags_task_errors_by_exception_type(self, config):
+        AutoTaskerRunner = pytest.importorskip("backend.langgraph_runner").AutoTaskerRunner
+        runner = AutoTaskerRunner.__new__(AutoTaskerRunner)
+
+        assert runner._task_error("Gmail", TimeoutError("read timed out")) == {
+            "message": "Gmail task error: read timed out", "retryable": True
+        }
+        assert runner._task_error("GitHub", PermissionError("token lacks repo scope"))["retryable"] is False
+        assert runner._task_error("DSA", ValueError("bad response")) == "DSA task error: bad response"
+    
+    def test_runner_resolves_retry_after_successful_attempt(self, config):
+        import logging
+        AutoTaskerRunner = pytest.importorskip("backend.langgraph_runner").AutoTaskerRunner
+        from backend.performance_monitor import PerformanceMonitor
+
+        class FlakyGmailAgent:
+            available = False
+
+            def execute_task(self, task):
+                if not self.available:
+                    raise ConnectionError("Gmail API unavailable")
+                return {"success": True, "content": "2 unread"}
+
+        runner = AutoTaskerRunner.__new__(AutoTaskerRunner)
+        runner.logger = logging.getLogger("test-runner")
+        runner.performance_monitor = PerformanceMonitor()
+        runner.retry_agent = RetryAgent(config)
+        runner.gmail_agent = FlakyGmailAgent()
+
+        state = {"task_plan": {"tasks": [{"id": "task_1", "type": "gmail"}]}, "current_step": 0,
+                 "execution_results": {}, "errors": [], "retry_count": 0,
+                 "execution_id": "run_a", "retry_signature": None}
+        runner.gmail_task_node(state)
+        runner.retry_handler_node(state)
+
+        signature = state["retry_signature"]
+        assert signature in runner.retry_agent._retry_cache
+
+        runner.gmail_agent.available = True
+        runner.gmail_task_node(state)
+
+        assert state["retry_signature"] is None
+        assert signature not in runner.retry_agent._retry_cache
+
 
 if __name__ == "__main__":
     pytest.main([__file__])